@@ -1,3 +1,14 @@
+import sys
+
 from .app import PyCountdownApp
 
+cmd = sys.argv[1:2]
+if cmd == ['stream']:
+    from .stream import main_stream
+    sys.exit(main_stream())
+
+elif cmd == ['serve']:
+    from .server import main_serve
+    sys.exit(main_serve())
+
 PyCountdownApp.run_cmdline()
@@ -1,12 +1,12 @@
 from pathlib import Path
 
 from pyrandyos import PyRandyOSApp
-from pyrandyos.utils.json import load_jsonc, save_json
+from pyrandyos.utils.json import load_jsonc
 from pyrandyos.config.keys import LOCAL_CONFIG_FILE_KEY
 
-from .logging import log_func_call
+from .logging import log_func_call, log_warning
 from .lib.clocks.json import parse_clocks_jsonc, export_clocks_jsonc
-from .lib.fileio import safe_file_io, safe_file_io_retry
+from .lib.fileio import safe_file_io, JsonWriteBehind
 
 HERE = Path(__file__).parent
 
@@ -15,10 +15,19 @@ CLOCKS_MTIME_KEY = '__clocks_mtime'
 CLOCKS_SCHEMA_KEY = '__clocks_schema'
 SCHEMA_KEY = 'json_schema'
 CLOCKS_FILE_CHECK_SEC_KEY = 'clocks_file_check_sec'
+# longest the GUI waits for a pending save before reading the file back
+CLOCKS_FLUSH_TIMEOUT_SEC = 5
 SHOW_HIDDEN_KEY = 'show_hidden'
 LOCAL_SHOW_HIDDEN_KEY = f'local.{SHOW_HIDDEN_KEY}'
 MUTE_ALERTS_KEY = 'mute_alerts'
 LOCAL_MUTE_ALERTS_KEY = f'local.{MUTE_ALERTS_KEY}'
+ALERT_VOLUME_KEY = 'alert_volume_pct'
+LOCAL_ALERT_VOLUME_KEY = f'local.{ALERT_VOLUME_KEY}'
+ALERT_DISK_CACHE_KEY = 'alert_disk_cache'
+LOCAL_ALERT_DISK_CACHE_KEY = f'local.{ALERT_DISK_CACHE_KEY}'
+ALERT_CACHE_DIRNAME = 'alert_cache'
+CLOCKS_URL_KEY = 'clocks_url'
+CLIENT_CMD = 'client'
 
 
 class PyCountdownApp(PyRandyOSApp):
@@ -31,6 +40,7 @@ class PyCountdownApp(PyRandyOSApp):
         CLOCKS_MTIME_KEY: None,
         CLOCKS_FILE_CHECK_SEC_KEY: 10,
         CLOCKS_SCHEMA_KEY: None,
+        CLOCKS_URL_KEY: None,
         LOCAL_CONFIG_FILE_KEY: "~/pycountdown/.pycountdown_local_config.jsonc",
     }
     APP_LOCAL_DEFAULTS = {
@@ -42,8 +52,15 @@ class PyCountdownApp(PyRandyOSApp):
         "default_height": 450,
         "always_on_top": True,
         "always_on_top_opacity": 0.5,
-        "alert_volume_pct": 50
+        ALERT_VOLUME_KEY: 50,
+        ALERT_DISK_CACHE_KEY: True,
     }
+    client_url: str = None
+    "clock publisher URL given on the command line"
+    clocks_writer: JsonWriteBehind = None
+    "saves the clocks file in the background"
+    clocks_check_deferred = False
+    "a clocks file check was skipped while our own save was pending"
 
     @classmethod
     @log_func_call
@@ -51,6 +68,9 @@ class PyCountdownApp(PyRandyOSApp):
              **kwargs):
         global_config_arg = input_data
         cls.init_main(input_data, True, **kwargs)
+        if cls.client_url:
+            cls.set(CLOCKS_URL_KEY, cls.client_url)
+
         if isinstance(global_config_arg, str):
             global_config_arg = Path(global_config_arg)
 
@@ -64,6 +84,14 @@ class PyCountdownApp(PyRandyOSApp):
     @classmethod
     @log_func_call
     def preprocess_args(cls, args: list[str]):
+        if args[:1] == [CLIENT_CMD]:
+            if len(args) < 2:
+                raise ValueError(f'usage: pycountdown {CLIENT_CMD} URL '
+                                 '[config]')
+
+            cls.client_url = args[1]
+            args = args[2:]
+
         return args
 
     @classmethod
@@ -78,6 +106,11 @@ class PyCountdownApp(PyRandyOSApp):
 
         return clocks_file
 
+    @classmethod
+    def get_clocks_url(cls):
+        "publisher to follow instead of the clocks file, if any"
+        return cls.get(CLOCKS_URL_KEY, None)
+
     @classmethod
     def set_clocks_file_path(cls, path: Path | str = None,
                              clear: bool = False):
@@ -92,7 +125,28 @@ class PyCountdownApp(PyRandyOSApp):
 
     @classmethod
     def check_clocks_file(cls, force: bool = False):
+        """
+        Reload the clocks file if it changed (or if `force`).  Returns True
+        if the pools were replaced outright, or a `PoolMerge` if external
+        changes were merged into the live pools.
+        """
         clocks_file = cls.get_clocks_file_path()
+        writer = cls.clocks_writer
+        if clocks_file and writer and writer.is_pending(clocks_file):
+            if not force:
+                # our own save is still being written; check again once it
+                # is done, in case someone else changed the file meanwhile
+                cls.clocks_check_deferred = True
+                return
+
+            if not writer.flush(CLOCKS_FLUSH_TIMEOUT_SEC):
+                log_warning(f'Clocks file {clocks_file} is still being '
+                            'saved, reloading what it holds now')
+
+        cls.clocks_check_deferred = False
+        # an mtime that is neither the last one read nor the one we wrote
+        # means the file was changed by someone else
+        cls.apply_clocks_saves()
         old_mtime: float = cls[CLOCKS_MTIME_KEY]
         mtime = None
         with safe_file_io(clocks_file):
@@ -100,11 +154,7 @@ class PyCountdownApp(PyRandyOSApp):
                 mtime = clocks_file.stat().st_mtime
 
         if force or mtime != old_mtime:
-            from .lib.clocks.displayclocks import DisplayClock
-            from .lib.clocks.fmt import ThresholdSet
             cls.set(CLOCKS_MTIME_KEY, mtime)
-            clk_pool = list()
-            thresh_pool = dict()
             clocks_jsonc = None
             if clocks_file:
                 with safe_file_io(clocks_file):
@@ -112,20 +162,93 @@ class PyCountdownApp(PyRandyOSApp):
 
                 if not clocks_jsonc:
                     return
-                clk_pool, thresh_pool = parse_clocks_jsonc(clocks_jsonc)
 
-            DisplayClock.pool = clk_pool
-            ThresholdSet.pool = thresh_pool
+            return cls.load_clocks_jsonc(clocks_jsonc, force)
+
+    @classmethod
+    def load_clocks_jsonc(cls, clocks_jsonc: dict | None,
+                          force: bool = False):
+        """
+        Replace the pools with parsed clocks file contents, or merge them
+        into the live pools unless `force`.  Returns True if the pools were
+        replaced outright, otherwise a `PoolMerge`.
+        """
+        from .lib.clocks.displayclocks import DisplayClock
+        from .lib.clocks.fmt import ThresholdSet
+        from .lib.tones.seq import AlertSequence
+        clk_pool = list()
+        thresh_pool = dict()
+        alert_seqs = dict()
+        if clocks_jsonc:
+            clk_pool, thresh_pool, alert_seqs = parse_clocks_jsonc(
+                clocks_jsonc)
+
+        # sequences carry no runtime state, so they are always replaced
+        AlertSequence.pool = alert_seqs or dict()
+
+        if force or not DisplayClock.pool:
+            DisplayClock.set_pool(clk_pool)
+            ThresholdSet.pool = thresh_pool or dict()
             return True
 
+        # patch the live pools so unchanged clocks keep their state
+        from .lib.clocks.merge import merge_clock_pools
+        merge = merge_clock_pools(DisplayClock.pool, clk_pool,
+                                  ThresholdSet.pool, thresh_pool)
+        DisplayClock.set_pool(merge.pool)
+        ThresholdSet.pool = merge.thresh_sets
+        return merge
+
     @classmethod
     def export_clocks_file(cls, clocks_file: Path | str = None):
+        """
+        Snapshot the pools and save them to `clocks_file` (the current clocks
+        file by default) in the background.  Returns the snapshot.
+        """
         clocks_file = clocks_file or cls.get_clocks_file_path()
         from .lib.clocks.displayclocks import DisplayClock
         from .lib.clocks.fmt import ThresholdSet
-        data = export_clocks_jsonc(DisplayClock.pool, ThresholdSet.pool)
-        with safe_file_io_retry(clocks_file):
-            save_json(clocks_file, data)
+        from .lib.tones.seq import AlertSequence
+        data = export_clocks_jsonc(DisplayClock.pool, ThresholdSet.pool,
+                                   AlertSequence.pool)
+        if clocks_file:
+            cls.get_clocks_writer().save(clocks_file, data)
+
+        return data
+
+    @classmethod
+    def get_clocks_writer(cls):
+        writer = cls.clocks_writer
+        if writer is None:
+            writer = JsonWriteBehind()
+            cls.clocks_writer = writer
+
+        return writer
+
+    @classmethod
+    def apply_clocks_saves(cls):
+        """
+        Take note of the mtimes of the clocks file saves the writer finished,
+        so that our own writes do not look like external edits.
+        """
+        writer = cls.clocks_writer
+        if not writer:
+            return
+
+        current = cls.get_clocks_file_path()
+        for file, mtime in writer.pop_saved().items():
+            if current and file == Path(current):
+                cls.set(CLOCKS_MTIME_KEY, mtime)
+
+    @classmethod
+    def get_alert_cache_dir(cls):
+        "directory for rendered alert audio next to the local config, if any"
+        if not cls.get(LOCAL_ALERT_DISK_CACHE_KEY, True):
+            return
+
+        local_cfg_path = cls.get(LOCAL_CONFIG_FILE_KEY)
+        if local_cfg_path:
+            return Path(local_cfg_path).expanduser().parent/ALERT_CACHE_DIRNAME
 
     @classmethod
     def is_muted(cls):
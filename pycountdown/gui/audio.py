@@ -1,75 +1,139 @@
-from PySide2.QtCore import QBuffer, QIODevice, QByteArray
+from PySide2.QtCore import QIODevice
 from PySide2.QtMultimedia import QAudioOutput, QAudioFormat, QAudio
 
 from ..lib.tones.constants import ALERT_SEQ
-from ..lib.tones.gen import generate_tone, BITRATE
-from ..app import PyCountdownApp
-
-
-class AudioPlayer:
-    def __init__(self, audio_data: bytes, audio_format: QAudioFormat):
-        # Store as instance attributes to prevent garbage collection
-        self.byte_array = QByteArray(audio_data)  # this needs to stay alive
-        self.buffer = QBuffer(self.byte_array)  # this is a pointer to buffer
-        self.buffer.open(QIODevice.ReadOnly)
+from ..lib.tones.gen import BITRATE
+from ..lib.tones.cache import WaveformCache
+from ..lib.tones.seq import AlertSequence
+from ..lib.tones.mix import ToneMixer, SAMPLE_BYTES
+from ..app import PyCountdownApp, LOCAL_ALERT_VOLUME_KEY
+
+OUTPUT_BUFFER_SEC = 0.1
+OUTPUT_NOTIFY_MS = 100
+
+
+class AlertMixerDevice(QIODevice):
+    "read-only device that QAudioOutput pulls the mixed alert stream from"
+    def __init__(self, mixer: ToneMixer, buffer_bytes: int):
+        super().__init__()
+        self.mixer = mixer
+        self.buffer_bytes = buffer_bytes
+
+    def readData(self, maxlen: int):
+        return self.mixer.mix(maxlen)
+
+    def writeData(self, data):
+        return -1
+
+    def bytesAvailable(self):
+        return self.buffer_bytes + super().bytesAvailable()
+
+    def isSequential(self):
+        return True
+
+
+class AlertOutput:
+    """
+    One long-lived audio output per sample rate, fed by a `ToneMixer` so that
+    overlapping alerts are summed instead of each opening the device.  The
+    stream is suspended once the last alert has drained out of the buffer.
+    """
+    def __init__(self, audio_format: QAudioFormat):
+        self.buffer_bytes = (int(audio_format.sampleRate()*OUTPUT_BUFFER_SEC)
+                             * SAMPLE_BYTES)
+        self.mixer = ToneMixer()
+        self.device = AlertMixerDevice(self.mixer, self.buffer_bytes)
+        self.device.open(QIODevice.ReadOnly)
         self.audio_output = QAudioOutput(audio_format)
+        self.audio_output.setBufferSize(self.buffer_bytes)
+        self.audio_output.notify.connect(self._on_notify)
+        self.audio_output.setNotifyInterval(OUTPUT_NOTIFY_MS)
+        self.started = False
 
-        # Connect to state changes to clean up when playback finishes
-        self.audio_output.stateChanged.connect(self._on_state_changed)
+    def play(self, audio_data: bytes):
+        if not self.mixer.add(audio_data):
+            return
 
-    def start(self):
-        self.audio_output.start(self.buffer)
+        audio_output = self.audio_output
+        if not self.started:
+            audio_output.start(self.device)
+            self.started = True
+
+        elif audio_output.state() == QAudio.SuspendedState:
+            audio_output.resume()
 
     def stop(self):
-        self.audio_output.stop()
-
-    def _on_state_changed(self, state):
-        "Remove from active set when playback finishes."
-        if state == QAudio.IdleState:
-            _active_players.discard(self)
-
-
-# Keep references to active audio players to prevent garbage collection
-_active_players: set[AudioPlayer] = set()
-TONE_DATA = None
-CACHED_SAMPLE_RATE_HZ = None
-CACHED_AUDIO_FORMAT = None
-
-
-def get_cached_tone_data(sample_rate_hz: int = 48000):
-    global TONE_DATA
-    global CACHED_SAMPLE_RATE_HZ
-    global CACHED_AUDIO_FORMAT
-    if (not TONE_DATA or not CACHED_AUDIO_FORMAT
-            or sample_rate_hz != CACHED_SAMPLE_RATE_HZ):
-        user_vol = PyCountdownApp.get('local.alert_volume_pct', 50)/100
-        data = b''.join(generate_tone(freq_hz, dur_s, sample_rate_hz,
-                                      user_vol*vol)
-                        for freq_hz, dur_s, vol in ALERT_SEQ)
-        TONE_DATA = data
-        CACHED_SAMPLE_RATE_HZ = sample_rate_hz
+        self.mixer.clear()
+
+    def _on_notify(self):
+        "suspend the stream once the mixer has run dry"
+        audio_output = self.audio_output
+        mixer = self.mixer
+        if (mixer.idle and mixer.silence >= self.buffer_bytes
+                and audio_output.state() == QAudio.ActiveState):
+            audio_output.suspend()
+
+
+# Keep the outputs alive for the life of the app
+_alert_outputs: dict[int, AlertOutput] = dict()
+WAVEFORM_CACHE: WaveformCache = None
+AUDIO_FORMATS: dict[int, QAudioFormat] = dict()
+
+
+def get_waveform_cache():
+    global WAVEFORM_CACHE
+    if WAVEFORM_CACHE is None:
+        WAVEFORM_CACHE = WaveformCache(
+            cache_dir=PyCountdownApp.get_alert_cache_dir())
+    return WAVEFORM_CACHE
 
+
+def get_audio_format(sample_rate_hz: int = 48000):
+    audio_format = AUDIO_FORMATS.get(sample_rate_hz)
+    if audio_format is None:
         audio_format = QAudioFormat()
-        audio_format.setSampleRate(CACHED_SAMPLE_RATE_HZ)
+        audio_format.setSampleRate(sample_rate_hz)
         audio_format.setChannelCount(1)
         audio_format.setSampleSize(BITRATE)
         audio_format.setCodec("audio/pcm")
         audio_format.setByteOrder(QAudioFormat.LittleEndian)
         audio_format.setSampleType(QAudioFormat.SignedInt)
-        CACHED_AUDIO_FORMAT = audio_format
+        AUDIO_FORMATS[sample_rate_hz] = audio_format
+
+    return audio_format
+
+
+def get_cached_tone_data(sample_rate_hz: int = 48000, seq=ALERT_SEQ):
+    "rendered `seq` at the current alert volume, and its audio format"
+    user_vol = PyCountdownApp.get(LOCAL_ALERT_VOLUME_KEY, 50)/100
+    data = get_waveform_cache().get(seq, sample_rate_hz, user_vol)
+    return data, get_audio_format(sample_rate_hz)
+
+
+def prepare_alert_tones(sample_rate_hz: int = 48000):
+    "render the default and all named alert sequences ahead of time"
+    for seq in AlertSequence.get_all_notes():
+        get_cached_tone_data(sample_rate_hz, seq)
+
 
-    return TONE_DATA, CACHED_AUDIO_FORMAT
+def get_alert_output(sample_rate_hz: int = 48000):
+    output = _alert_outputs.get(sample_rate_hz)
+    if output is None:
+        output = AlertOutput(get_audio_format(sample_rate_hz))
+        _alert_outputs[sample_rate_hz] = output
+    return output
 
 
-def play_alert_tones(sample_rate_hz: int = 48000):
-    "Play alert tone sequence. Uses main thread event loop for playback."
-    # Create player and keep reference alive until playback completes
-    player = AudioPlayer(*get_cached_tone_data())
-    _active_players.add(player)
-    player.start()
+def play_alert_tones(sample_rate_hz: int = 48000, seq=ALERT_SEQ):
+    """
+    Play alert tone sequence through the shared output for `sample_rate_hz`.
+    Identical alerts started on the same tick are only played once.
+    """
+    data, _ = get_cached_tone_data(sample_rate_hz, seq)
+    get_alert_output(sample_rate_hz).play(data)
 
 
 def stop_all_alerts():
     "Stop all currently playing alert tones."
-    for player in _active_players:
-        player.stop()
+    for output in _alert_outputs.values():
+        output.stop()
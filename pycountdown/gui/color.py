@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+from pyrandyos.gui.qt import QColor
+
+from ..lib.clocks.color import RGBColor
+
+
+@lru_cache(maxsize=None)
+def to_qcolor(color: RGBColor):
+    "QColor for a library color; cached since there are only a few in use"
+    return QColor(*color.rgba)
+
+
+def from_qcolor(qcolor: QColor):
+    return RGBColor(qcolor.red(), qcolor.green(), qcolor.blue(),
+                    qcolor.alpha())
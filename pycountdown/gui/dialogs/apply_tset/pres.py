@@ -48,7 +48,7 @@ class ApplyTSetDialog(GuiDialog[ApplyTSetDialogView]):
         if mw.set_save_path_if_unset():
             self.save_selected_tset()
             PyCountdownApp.export_clocks_file()
-            mw.refresh_clocks_file(True)
+            mw.refresh_clocks([dc for _, dc in self.r_dclks])
 
         if btn is buttons.button(QDialogButtonBox.Ok):
             self.gui_view.qtobj.accept()
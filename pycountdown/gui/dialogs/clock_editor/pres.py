@@ -2,7 +2,9 @@ from typing import TYPE_CHECKING
 
 from pyrandyos.gui.widgets import GuiWindowLikeParentType
 from pyrandyos.gui.dialogs import GuiDialog
-from pyrandyos.gui.qt import QAbstractButton, QDialogButtonBox, Qt
+from pyrandyos.gui.qt import (
+    QAbstractButton, QDialogButtonBox, QMessageBox, Qt,
+)
 from pyrandyos.utils.time.fmt import TimeFormat
 from pyrandyos.utils.time.rate import BaseClockRate
 
@@ -12,6 +14,7 @@ from ....lib.clocks.displayclocks import DisplayClock
 from ....lib.clocks.clock import Clock, DEFAULT_CLOCKS
 from ....lib.clocks.fmt import ClockFormatter
 from ....lib.clocks.epoch import Epoch
+from ....lib.clocks.graph import depends_on
 
 from .view import (
     ClockEditorDialogView, TIMER_HEIGHT, CLOCK_HEIGHT, BLANK_HEIGHT,
@@ -34,6 +37,9 @@ class ClockEditorDialog(GuiDialog[ClockEditorDialogView]):
             ClockFormatter()
         )
         self.idx = DisplayClock.pool.index(dclk) if dclk else -1
+        # this clock and the clocks downstream of it cannot be referenced
+        self.exclude_ids = {x.clk_id for x
+                            in DisplayClock.graph.get_affected([dclk])}
         self.timer = timer
         title = ("Edit Clock" if dclk
                  else ("New Timer" if timer else "New Clock"))
@@ -53,11 +59,19 @@ class ClockEditorDialog(GuiDialog[ClockEditorDialogView]):
         if btn is buttons.button(QDialogButtonBox.Cancel):
             self.gui_view.qtobj.reject()
             return
+        if self.creates_cycle():
+            QMessageBox.warning(dlgview.qtobj, "Circular Clock Reference",
+                                "A clock cannot follow or count from itself "
+                                "or a clock that depends on it.")
+            return
+
         mw: 'MainWindow' = self.gui_parent
         if mw.set_save_path_if_unset():
+            was_hidden = self.dclk.hidden
             self.save_clock()
             PyCountdownApp.export_clocks_file()
-            mw.refresh_clocks_file(True)
+            mw.refresh_clocks([self.dclk],
+                              self.new or self.dclk.hidden != was_hidden)
             if self.new:
                 mw.select_and_notify_added_clock()
 
@@ -67,6 +81,22 @@ class ClockEditorDialog(GuiDialog[ClockEditorDialogView]):
         if btn is buttons.button(QDialogButtonBox.Ok):
             self.gui_view.qtobj.accept()
 
+    def creates_cycle(self):
+        "whether the edited clock would end up depending on itself"
+        view = self.gui_view
+        blank_chk = view.blank_chk
+        clock = self.dclk.clock
+        if self.new or not clock or (blank_chk and blank_chk.isChecked()):
+            return False
+
+        epoch = view.epoch.get_epoch()
+        ref = view.ref.get_epoch() if view.ref else None
+        follow_chk = view.follow_chk
+        follow = (view.follow.get_clock()
+                  if follow_chk and follow_chk.isChecked() else None)
+        return depends_on((epoch.clock if epoch else None,
+                           ref.clock if ref else None, follow), clock)
+
     @log_func_call
     def click_delete(self):
         mw: 'MainWindow' = self.gui_parent
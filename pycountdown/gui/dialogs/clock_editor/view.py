@@ -133,12 +133,14 @@ class ClockEditorDialogView(GuiDialogView['ClockEditorDialog']):
 
     def create_epoch_editor(self):
         pres = self.gui_pres
-        epoch = EpochWidget(self, "Epoch:", pres.timer, True)
+        epoch = EpochWidget(self, "Epoch:", pres.timer, True,
+                            exclude_ids=pres.exclude_ids)
         self.epoch = epoch
         self.layout.addWidget(epoch.qtobj)
 
     def create_ref_editor(self):
-        ref = EpochWidget(self, "Real-time reference:")
+        ref = EpochWidget(self, "Real-time reference:",
+                          exclude_ids=self.gui_pres.exclude_ids)
         self.ref = ref
         self.layout.addWidget(ref.qtobj)
 
@@ -291,7 +293,7 @@ class ClockEditorDialogView(GuiDialogView['ClockEditorDialog']):
         self.layout.addLayout(hbox_rate)
 
     def create_follow(self):
-        follow = ClockListWidget(self)
+        follow = ClockListWidget(self, exclude_ids=self.gui_pres.exclude_ids)
         self.follow = follow
 
         follow_chk = QCheckBox("Follow clock:")
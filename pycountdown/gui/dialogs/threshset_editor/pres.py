@@ -43,7 +43,11 @@ class ThreshSetEditorDialog(GuiDialog[ThreshSetEditorDialogView]):
         epoch = view.epoch_widget.get_epoch()
         thresh.epoch = epoch
         thresh.color = view.color_widget.get_color()
-        thresh.play_alert = view.alert_chk.isChecked()
+        # keep a named alert sequence unless the alert was turned off
+        play_alert = view.alert_chk.isChecked()
+        if not play_alert or not thresh.play_alert:
+            thresh.play_alert = play_alert
+        tset.invalidate()
         view.thresh_list.item(idx).setText(self.get_thresh_text(thresh))
 
     def save_and_reset_tset(self):
@@ -81,7 +85,10 @@ class ThreshSetEditorDialog(GuiDialog[ThreshSetEditorDialogView]):
         else:
             txt = '(start)'
 
-        if thresh.play_alert:
+        play_alert = thresh.play_alert
+        if isinstance(play_alert, str):
+            txt += f' <alert: {play_alert}>'
+        elif play_alert:
             txt += ' <alert>'
 
         return txt
@@ -132,7 +139,7 @@ class ThreshSetEditorDialog(GuiDialog[ThreshSetEditorDialogView]):
         epoch_widget.qtobj.setVisible(True)
         epoch_widget.set_values(thresh.epoch)
         view.color_widget.set_color(thresh.color)
-        view.alert_chk.setChecked(thresh.play_alert)
+        view.alert_chk.setChecked(bool(thresh.play_alert))
 
     @log_func_call
     def add_rename_tset(self, new: bool = False):
@@ -212,6 +219,7 @@ class ThreshSetEditorDialog(GuiDialog[ThreshSetEditorDialogView]):
         tlist = tset.thresh_list
         new_index = len(tlist)
         tlist.append(new)
+        tset.invalidate()
         view = self.gui_view
         gui_threshlist = view.thresh_list
         gui_threshlist.addItem("(new)")
@@ -232,6 +240,7 @@ class ThreshSetEditorDialog(GuiDialog[ThreshSetEditorDialogView]):
         if reply == QMessageBox.Yes:
             self.save_and_reset_threshlist()
             del tset.thresh_list[idx]
+            tset.invalidate()
             view.thresh_list.takeItem(idx)
 
     @log_func_call
@@ -245,8 +254,7 @@ class ThreshSetEditorDialog(GuiDialog[ThreshSetEditorDialogView]):
         if mw.set_save_path_if_unset():
             self.save_current_thresh()
             ThresholdSet.pool = self.pool
-            PyCountdownApp.export_clocks_file()
-            mw.refresh_clocks_file(True)
+            mw.reload_saved_clocks(PyCountdownApp.export_clocks_file())
 
         if btn is buttons.button(QDialogButtonBox.Ok):
             self.gui_view.qtobj.accept()
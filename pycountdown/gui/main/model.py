@@ -0,0 +1,156 @@
+from PySide2.QtCore import QAbstractTableModel
+
+from pyrandyos.gui.qt import Qt, QModelIndex, QFont
+
+from ...lib.clocks.displayclocks import DisplayClock
+from ...lib.clocks.color import RGBColor
+from ..color import to_qcolor
+
+LABEL_COL = 0
+TIME_COL = 1
+HEADERS = ('Clock', 'Current Time')
+
+DisplayRole = Qt.DisplayRole
+ForegroundRole = Qt.ForegroundRole
+FontRole = Qt.FontRole
+TextAlignmentRole = Qt.TextAlignmentRole
+UserRole = Qt.UserRole
+TIME_ALIGN = int(Qt.AlignRight | Qt.AlignVCenter)
+
+
+class ClockTableModel(QAbstractTableModel):
+    """
+    Table model over the shown display clocks.  The last rendered time string
+    and color of every row are kept here so that a tick only emits
+    `dataChanged` for the cells whose content actually changed.
+    """
+    def __init__(self, font: QFont = None, parent=None):
+        super().__init__(parent)
+        self.font = font
+        self.dclks: list[DisplayClock | None] = list()
+        self.texts: list[str] = list()
+        self.colors: list[RGBColor | None] = list()
+
+    def set_dclks(self, dclks: list[DisplayClock | None]):
+        self.beginResetModel()
+        self.dclks = list(dclks)
+        self.texts = ["Loading..." if dc and dc.clock else ""
+                      for dc in self.dclks]
+        self.colors = [None]*len(self.dclks)
+        self.endResetModel()
+
+    def get_dclk(self, row: int):
+        return self.dclks[row]
+
+    def get_text(self, row: int, col: int = TIME_COL):
+        if col == TIME_COL:
+            return self.texts[row]
+
+        dclk = self.dclks[row]
+        return dclk.label or '' if dclk else ''
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()):
+        return 0 if parent.isValid() else len(self.dclks)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index: QModelIndex, role: int = DisplayRole):
+        if not index.isValid():
+            return
+
+        row = index.row()
+        col = index.column()
+        if role == DisplayRole:
+            return self.get_text(row, col)
+
+        elif role == ForegroundRole:
+            color = self.colors[row]
+            if color is not None:
+                return to_qcolor(color)
+
+        elif role == FontRole:
+            return self.font
+
+        elif role == TextAlignmentRole:
+            if col == TIME_COL:
+                return TIME_ALIGN
+
+        elif role == UserRole:
+            return self.dclks[row]
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = DisplayRole):
+        if role != DisplayRole:
+            return
+
+        if orientation == Qt.Horizontal:
+            return HEADERS[section]
+
+        return section + 1
+
+    def flags(self, index: QModelIndex):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def set_row(self, row: int, text: str, color: RGBColor | None = None):
+        """
+        Store the rendered state of a row, notifying views only of the cells
+        that changed.  A color of None leaves the current color alone.
+        """
+        if color is not None and color != self.colors[row]:
+            self.colors[row] = color
+            self.texts[row] = text
+            self.dataChanged.emit(self.index(row, LABEL_COL),
+                                  self.index(row, TIME_COL),
+                                  [DisplayRole, ForegroundRole])
+
+        elif text != self.texts[row]:
+            self.texts[row] = text
+            idx = self.index(row, TIME_COL)
+            self.dataChanged.emit(idx, idx, [DisplayRole])
+
+    def move_rows(self, rows: list[int], dest: int):
+        """
+        Move the sorted `rows` into one block starting at row `dest` of the
+        result.  A contiguous block is announced as a row move, anything else
+        as a layout change that carries persistent indexes (and so the
+        selection) along.
+        """
+        nrows = len(self.dclks)
+        moving = set(rows)
+        order = [x for x in range(nrows) if x not in moving]
+        order[dest:dest] = rows
+        if not rows or order == list(range(nrows)):
+            return
+
+        first = rows[0]
+        last = rows[-1]
+        contiguous = last - first + 1 == len(rows)
+        if contiguous:
+            # the destination is given in row numbers from before the move
+            self.beginMoveRows(QModelIndex(), first, last, QModelIndex(),
+                               dest if dest < first else dest + len(rows))
+        else:
+            self.layoutAboutToBeChanged.emit()
+
+        for name in ('dclks', 'texts', 'colors'):
+            old = getattr(self, name)
+            setattr(self, name, [old[x] for x in order])
+
+        if contiguous:
+            self.endMoveRows()
+            return
+
+        new_rows = [0]*nrows
+        for new, old in enumerate(order):
+            new_rows[old] = new
+
+        old_idxs = self.persistentIndexList()
+        self.changePersistentIndexList(
+            old_idxs, [self.index(new_rows[x.row()], x.column())
+                       for x in old_idxs])
+        self.layoutChanged.emit()
+
+    def label_changed(self, row: int):
+        idx = self.index(row, LABEL_COL)
+        self.dataChanged.emit(idx, idx, [DisplayRole])
@@ -1,23 +1,35 @@
 from pathlib import Path
 from threading import Lock
+from math import ceil
 
 from pyrandyos.gui.qt import QTimer, Qt, QFileDialog, QMessageBox
 from pyrandyos.gui.callback import qt_callback
 from pyrandyos.gui.window import GuiWindow
 # from pyrandyos.gui.dialogs.config import ConfigTreeDialog
 from pyrandyos.utils.time.now import now_tai_sec
+from pyrandyos.utils.json import jdumps, jloads
 
 from ...version import __version__
 from ...logging import (
     log_func_call, DEBUGLOW2, log_info, log_debuglow,
-    log_warning,
+    log_warning, log_error,
 )
 from ...app import (
     PyCountdownApp, CLOCKS_FILE_CHECK_SEC_KEY, LOCAL_SHOW_HIDDEN_KEY,
-    LOCAL_MUTE_ALERTS_KEY,
+    LOCAL_MUTE_ALERTS_KEY, CLOCKS_FLUSH_TIMEOUT_SEC,
 )
 # from ...lib.clocks import DEFAULT_CLOCKS, Clock
 from ...lib.clocks.displayclocks import DisplayClock
+from ...lib.clocks.sched import ThresholdScheduler
+from ...lib.clocks.batch import ClockBatch
+from ...lib.clocks.tick import TickScheduler, RefreshScheduler
+from ...lib.clocks.merge import PoolMerge
+from ...lib.clocks.graph import has_cycle
+from ...lib.tones.seq import AlertSequence
+from ...lib.clocks.json import parse_alert_seqs
+from ...lib.clocks.fmt import ClockFormatter
+from ...lib.clocks.color import parse_color
+from ...lib.clocks.rows import RowType
 # from ...lib.clocks.fmt import ClockFormatter
 
 from ..dialogs.clocks_config import ClocksConfigDialog
@@ -25,21 +37,44 @@ from ..dialogs.clock_editor import ClockEditorDialog
 from ..dialogs.threshset_editor import ThreshSetEditorDialog
 from ..dialogs.config import ConfigTreeDialog
 from ..dialogs.apply_tset import ApplyTSetDialog
-from ..audio import play_alert_tones, stop_all_alerts
+from ..audio import play_alert_tones, stop_all_alerts, prepare_alert_tones
+from ..watcher import ClocksFileWatcher
+from ..remote import RemoteClocksSubscriber
 
 from .view import MainWindowView
 
-UserRole = Qt.UserRole
+TICK_LATE_SEC = 0.05
+# edits that come in quick succession (holding Ctrl+Down) are saved once
+SAVE_DELAY_MS = 500
+# how often the save status in the status bar is refreshed
+SAVE_STATUS_MS = 500
 
 
 class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call
     def __init__(self):
         self._update_lock = Lock()
+        self.threshold_scheduler = ThresholdScheduler()
+        self.clock_batch = ClockBatch()
+        self.tick_scheduler = TickScheduler()
+        self.refresh_scheduler = RefreshScheduler()
+        # only these rows of the table are drawn on every tick
+        self.visible_rows = range(0)
+        self.visible_update_queued = False
+        # what update_save_status has already logged
+        self.save_retrying: Path = None
+        self.save_errors: dict[Path, Exception] = dict()
+        # client mode: rows come pre-rendered from a clock publisher
+        self.clocks_url = PyCountdownApp.get_clocks_url()
+        self.remote_subscriber: RemoteClocksSubscriber = None
+        self.remote_threshs: list[dict | None] = list()
         super().__init__(f'{PyCountdownApp.APP_NAME} v{__version__}')
-        self.refresh_clocks_file()
-        self.clock_tick()
         self.create_timers()
+        if self.clocks_url:
+            self.start_client()
+        else:
+            self.refresh_clocks_file()
+            self.clock_tick()
 
         # in order to set the initial action states correctly
         self.toggle_show_hidden(PyCountdownApp.get(LOCAL_SHOW_HIDDEN_KEY, False))  # noqa: E501
@@ -53,17 +88,38 @@ class MainWindow(GuiWindow[MainWindowView]):
     def create_timers(self):
         qtobj = self.gui_view.qtobj
 
+        # re-armed for the next change of any shown clock on every tick
         master_timer = QTimer(qtobj)
-        # master_timer.setSingleShot(True)
-        master_timer.setInterval(1000)
-        master_timer.timeout.connect(qt_callback(self.clock_tick))
-        master_timer.start()
+        master_timer.setSingleShot(True)
+        master_timer.setTimerType(Qt.PreciseTimer)
+        master_timer.timeout.connect(qt_callback(self.on_tick_timer))
         self.master_timer = master_timer
 
+        alert_timer = QTimer(qtobj)
+        alert_timer.setSingleShot(True)
+        alert_timer.setTimerType(Qt.PreciseTimer)
+        alert_timer.timeout.connect(qt_callback(self.fire_alerts))
+        self.alert_timer = alert_timer
+
+        save_timer = QTimer(qtobj)
+        save_timer.setSingleShot(True)
+        save_timer.setInterval(SAVE_DELAY_MS)
+        save_timer.timeout.connect(qt_callback(self.flush_clocks_save))
+        self.save_timer = save_timer
+
+        save_status_timer = QTimer(qtobj)
+        save_status_timer.setInterval(SAVE_STATUS_MS)
+        save_status_timer.timeout.connect(qt_callback(self.update_save_status))
+        save_status_timer.start()
+        self.save_status_timer = save_status_timer
+
+        self.clocks_file_watcher = ClocksFileWatcher(self.refresh_clocks_file,
+                                                     qtobj)
+
+        # only started if the clocks file cannot be watched
         clocks_file_timer = QTimer(qtobj)
         clocks_file_timer.setInterval(PyCountdownApp[CLOCKS_FILE_CHECK_SEC_KEY]*1000)  # noqa: E501
         clocks_file_timer.timeout.connect(qt_callback(self.refresh_clocks_file))  # noqa: E501
-        clocks_file_timer.start()
         self.clocks_file_timer = clocks_file_timer
 
     @log_func_call
@@ -110,63 +166,367 @@ class MainWindow(GuiWindow[MainWindowView]):
             default_dir, "*.jsonc"
         )
         if open_pathstr:
+            self.flush_clocks_save()
             PyCountdownApp.set_clocks_file_path(open_pathstr)
             self.refresh_clocks_file(True)
 
     @log_func_call
     def click_new(self):
+        self.flush_clocks_save()
         PyCountdownApp.set_clocks_file_path(clear=True)
         self.refresh_clocks_file(True)
 
+    def arm_tick_timer(self):
+        "single shot for the next change of any shown clock's text"
+        timer = self.master_timer
+        timer.stop()
+        next_tai = self.refresh_scheduler.next_tai()
+        if next_tai is not None:
+            wait_ms = self.tick_scheduler.arm(next_tai, now_tai_sec())
+            timer.start(min(wait_ms, 2**31 - 1))
+
     @log_func_call(DEBUGLOW2)
-    def clock_tick(self):
+    def on_tick_timer(self):
+        sched = self.tick_scheduler
+        now = sched.tick(now_tai_sec())
+        try:
+            self.clock_tick(now, self.refresh_scheduler.pop_due(now))
+            late = sched.lateness[-1] if sched.lateness else 0
+            if late > TICK_LATE_SEC:
+                log_debuglow(f'clock tick {late*1000:.0f} ms late')
+
+        finally:
+            # a single shot timer that is not re-armed stops every clock
+            self.arm_tick_timer()
+
+    @log_func_call(DEBUGLOW2)
+    def clock_tick(self, now: float = None, rows: list[int] = None):
+        """
+        Render `rows` (every visible row if None) at `now` and queue their
+        next change.  Rows outside the table viewport are skipped and keep
+        their last text until they are scrolled back into view; threshold
+        crossings and alerts are tracked for every row regardless.
+        """
         # timestr = sec_to_ymdhms_str(unix_to_central(now_unix_sec()))
         # log_info(f"tock: {timestr}")
+        if now is None:
+            now = now_tai_sec()
+
+        with self._update_lock:
+            if rows is None:
+                self.visible_rows = self.gui_view.get_visible_rows()
+                rows = self.visible_rows
+            else:
+                visible = self.visible_rows
+                rows = [x for x in rows if x in visible]
+
+            values = None
+            try:
+                # evaluate the due rows from the same instant, converting
+                # once per rate
+                values = self.clock_batch.evaluate(now, rows)
+            except Exception as e:
+                # evaluate row by row so only the bad rows fail
+                log_debuglow(f'batch evaluation failed: {e!r}')
+
+            sched = self.refresh_scheduler
+            for j, i in enumerate(rows):
+                try:
+                    t = self.render_row(i, now, values[j] if values else None)
+                except Exception as e:
+                    log_debuglow(f'row {i} could not be rendered: {e!r}')
+                    sched.retry(i, now)
+                    continue
+
+                sched.reschedule(i, t, now)
+
+    def queue_visible_rows_update(self):
+        """
+        Called by the scroll bar signals, which also fire while the table is
+        repopulated under the update lock, so the new rows are rendered once
+        control is back in the event loop instead of from inside the signal.
+        """
+        if not self.visible_update_queued:
+            self.visible_update_queued = True
+            QTimer.singleShot(0, qt_callback(self.update_visible_rows))
+
+    def update_visible_rows(self):
+        "render the rows just scrolled into view and keep them ticking"
+        self.visible_update_queued = False
+        if self.clocks_url or not self.refresh_scheduler.dclks:
+            # client mode, or the table is not set up yet
+            return
+
+        old = self.visible_rows
+        self.visible_rows = self.gui_view.get_visible_rows()
+        rows = [x for x in self.visible_rows if x not in old]
+        if rows:
+            self.clock_tick(rows=rows)
+            self.arm_tick_timer()
+
+    def render_row(self, row: int, now: float, t: float = None):
+        model = self.gui_view.clock_model
+        clk = model.get_dclk(row)
+        txt = ''
+        color = None
+        if clk:
+            clock = clk.clock
+            if t is None and clock:
+                t = clock.plan.evaluate(now)
+
+            txt = clk.display_sec(t)
+            color, thresh = clk.formatter.get_formatting(clk, now, t)
+
+        model.set_row(row, txt, color)
+        return t
+
+    def get_row_for_dclk(self, dclk: DisplayClock):
+        "table row showing `dclk`, or None if it is not shown"
+        pool = DisplayClock.pool
+        if dclk not in pool:
+            return
+
+        row = DisplayClock.get_visible_idx_for_idx(pool.index(dclk))
+        model = self.gui_view.clock_model
+        if (row is not None and row < model.rowCount()
+                and model.get_dclk(row) is dclk):
+            return row
+
+    def get_table_dclks(self):
+        return list(self.gui_view.clock_model.dclks)
+
+    def arm_alert_timer(self):
+        "single shot for the next threshold crossing of any shown clock"
+        timer = self.alert_timer
+        timer.stop()
+        next_tai = self.threshold_scheduler.next_tai()
+        if next_tai is not None:
+            wait_ms = ceil((next_tai - now_tai_sec())*1000)
+            timer.start(min(max(wait_ms, 0), 2**31 - 1))
+
+    @log_func_call(DEBUGLOW2)
+    def fire_alerts(self):
         now = now_tai_sec()
+        try:
+            crossed = self.threshold_scheduler.pop_due(now)
+            muted = PyCountdownApp.is_muted()
+            with self._update_lock:
+                for dclk, thresh in crossed.items():
+                    if thresh and thresh.play_alert and not muted:
+                        play_alert_tones(
+                            seq=AlertSequence.get_notes(thresh.play_alert))
+
+                    # flip the colors right at the crossing
+                    row = self.get_row_for_dclk(dclk)
+                    if row is not None and row in self.visible_rows:
+                        self.render_row(row, now)
+
+        finally:
+            self.arm_alert_timer()
 
-        table = self.gui_view.clock_table
+    @log_func_call
+    def refresh_clocks(self, dclks: list[DisplayClock],
+                       repopulate: bool = False):
+        """
+        Re-render the given display clocks and everything downstream of them
+        after an in-memory edit, without reparsing the clocks file.  Set
+        `repopulate` if rows were added or shown/hidden.
+        """
+        for dclk in dclks:
+            DisplayClock.update(dclk)
+            if has_cycle(dclk.clock):
+                # its rows fail to render instead of recursing forever
+                log_error(f'Clock {dclk.clk_id!r} follows or counts from '
+                          'itself')
+
+        affected = DisplayClock.graph.get_affected(dclks)
+        for dclk in affected:
+            clock = dclk.clock
+            if clock:
+                clock.invalidate()
+
+        self.clock_batch.invalidate()
+        if repopulate:
+            self.update_table()
+            return
+
+        now = now_tai_sec()
+        model = self.gui_view.clock_model
+        sched = self.threshold_scheduler
         with self._update_lock:
-            for i in range(table.rowCount()):
-                labelitem = table.item(i, 0)
-                item = table.item(i, 1)
-                clk: DisplayClock = item.data(UserRole)
-                txt = ''
-                if clk:
-                    txt = clk.display(now)
-                    color, thresh = clk.formatter.get_formatting(clk, now)
-                    item.setTextColor(color)
-                    labelitem.setTextColor(color)
-                    cache = clk._cache
-                    if cache:
-                        cache_t, cache_thresh = cache
-                        if cache_thresh is not thresh:
-                            # crossed a threshold
-                            muted = PyCountdownApp.is_muted()
-                            if thresh.play_alert and not muted:
-                                play_alert_tones()
-
-                    clk._cache = (now, thresh)
-
-                item.setText(txt)
+            for dclk in affected:
+                row = self.get_row_for_dclk(dclk)
+                if row is None:
+                    sched.remove(dclk)
+                    continue
+
+                # edits do not count as threshold crossings
+                sched.schedule(dclk, now)
+                model.label_changed(row)
+
+        self.arm_alert_timer()
+        self.rebuild_refresh_schedule()
 
     @log_func_call(DEBUGLOW2)
     def refresh_clocks_file(self, force: bool = False):
         logfunc = log_info if force else log_debuglow
         logfunc('checking clocks file')
-        if PyCountdownApp.check_clocks_file(force):
+        self.apply_clocks_reload(PyCountdownApp.check_clocks_file(force))
+        self.watch_clocks_file()
+
+    def apply_clocks_reload(self, reload: bool | PoolMerge | None):
+        if isinstance(reload, PoolMerge):
+            self.apply_clocks_merge(reload)
+            log_info('clocks file changes applied')
+
+        elif reload:
             self.update_table()
             log_info('clocks file reloaded')
 
+        if reload:
+            # so that firing an alert does not have to synthesize it
+            prepare_alert_tones()
+
+    def reload_saved_clocks(self, clocks_jsonc: dict):
+        """
+        Rebuild the pools from a snapshot just handed to the clocks file
+        writer, like a forced reload of the file would, without waiting for
+        the save to finish or reading the file back.
+        """
+        # the round trip turns the snapshot into what the file will hold
+        clocks_jsonc = jloads(jdumps(clocks_jsonc))
+        self.apply_clocks_reload(
+            PyCountdownApp.load_clocks_jsonc(clocks_jsonc, True))
+
+    def watch_clocks_file(self):
+        "watch the current clocks file, polling it only if that fails"
+        watching = self.clocks_file_watcher.watch(
+            PyCountdownApp.get_clocks_file_path())
+        timer = self.clocks_file_timer
+        if watching:
+            timer.stop()
+        elif not timer.isActive():
+            log_debuglow('clocks file cannot be watched, polling instead')
+            timer.start()
+
+    @log_func_call
+    def start_client(self):
+        "follow a clock publisher instead of evaluating the clocks file"
+        log_info(f'Client mode, following {self.clocks_url}')
+        view = self.gui_view
+        view.set_client_mode()
+        subscriber = RemoteClocksSubscriber(self.clocks_url,
+                                            self.apply_remote_snapshot,
+                                            self.apply_remote_delta,
+                                            view.qtobj)
+        self.remote_subscriber = subscriber
+        subscriber.start()
+
+    @log_func_call
+    def apply_remote_snapshot(self, rows: list[RowType],
+                              alert_seqs: dict[str, list] = None):
+        # the rows name the publisher's alert sequences
+        AlertSequence.pool = parse_alert_seqs(alert_seqs) or dict()
+        prepare_alert_tones()
+
+        view = self.gui_view
+        model = view.clock_model
+        selected = view.get_selected_rows()
+        with self._update_lock:
+            # label-only stand-ins, so the table and copy work as usual
+            model.set_dclks([DisplayClock(x['id'], x['label'], None,
+                                          ClockFormatter())
+                             for x in rows])
+            self.remote_threshs = [x['thresh'] for x in rows]
+            for row, state in enumerate(rows):
+                self.apply_remote_row(row, state)
+
+        self.select_rows(selected)
+
+    @log_func_call(DEBUGLOW2)
+    def apply_remote_delta(self, changed: list[tuple[int, RowType]]):
+        muted = PyCountdownApp.is_muted()
+        threshs = self.remote_threshs
+        with self._update_lock:
+            for row, state in changed:
+                if not 0 <= row < len(threshs):
+                    continue
+
+                self.apply_remote_row(row, state)
+                thresh = state['thresh']
+                crossed = thresh is not None and thresh != threshs[row]
+                threshs[row] = thresh
+                if crossed and thresh['alert'] and not muted:
+                    play_alert_tones(
+                        seq=AlertSequence.get_notes(thresh['alert']))
+
+    def apply_remote_row(self, row: int, state: RowType):
+        model = self.gui_view.clock_model
+        dclk = model.get_dclk(row)
+        if dclk.label != state['label']:
+            dclk.label = state['label']
+            model.label_changed(row)
+
+        model.set_row(row, state['text'], parse_color(state['color']))
+
+    @log_func_call
+    def apply_clocks_merge(self, merge: PoolMerge):
+        """
+        Update the table after external changes were merged into the live
+        pools, keeping the selection and the scheduled crossings of the
+        clocks that did not change.
+        """
+        if merge.relayout:
+            view = self.gui_view
+            model = view.clock_model
+            selected = [dclk for dclk in map(model.get_dclk,
+                                             view.get_selected_rows())
+                        if dclk]
+            old_dclks = set(self.get_table_dclks())
+            with self._update_lock:
+                view.populate_clock_table()
+                dclks = self.get_table_dclks()
+                self.clock_batch.set_dclks(dclks)
+                sched = self.threshold_scheduler
+                now = now_tai_sec()
+                for dclk in old_dclks.difference(dclks):
+                    sched.remove(dclk)
+
+                for dclk in set(dclks).difference(old_dclks):
+                    sched.schedule(dclk, now)
+
+            self.select_rows([row for row in map(self.get_row_for_dclk,
+                                                 selected)
+                              if row is not None])
+
+        self.refresh_clocks(list(merge.changed))
+        if merge.relayout:
+            self.clock_tick()
+
     @log_func_call(DEBUGLOW2)
     def update_table(self):
+        if self.clocks_url:
+            # the publisher decides which rows are shown
+            return
+
         with self._update_lock:
             view = self.gui_view
             view.populate_clock_table()
-            table = view.clock_table
-            if table.rowCount():
+            if view.clock_model.rowCount():
                 view.clock_table.selectRow(0)
 
+            dclks = self.get_table_dclks()
+            self.clock_batch.set_dclks(dclks)
+            self.threshold_scheduler.rebuild(dclks, now_tai_sec())
+
+        self.arm_alert_timer()
+        self.rebuild_refresh_schedule()
+
+    def rebuild_refresh_schedule(self):
+        "redraw the visible rows and queue their next change"
+        self.refresh_scheduler.reset(self.get_table_dclks())
         self.clock_tick()
+        self.arm_tick_timer()
 
     @log_func_call
     def row_header_clicked(self, row: int, col: int = None):
@@ -174,8 +534,10 @@ class MainWindow(GuiWindow[MainWindowView]):
         Called when a row header is clicked. Opens the clock editor
         for that row.
         """
-        table = self.gui_view.clock_table
-        dclk = table.item(row, 1).data(UserRole)
+        if self.clocks_url:
+            return
+
+        dclk = self.gui_view.clock_model.get_dclk(row)
 
         dlg = ClockEditorDialog(self, dclk)
         dlg.show()
@@ -186,8 +548,8 @@ class MainWindow(GuiWindow[MainWindowView]):
         Called when Enter is pressed. Opens the clock editor for the
         selected clock if exactly one row is selected.
         """
-        table = self.gui_view.clock_table
-        rows = list({item.row() for item in table.selectedItems()})
+        view = self.gui_view
+        rows = view.get_selected_rows()
 
         if len(rows) == 0:
             return
@@ -196,7 +558,7 @@ class MainWindow(GuiWindow[MainWindowView]):
             return
 
         row = rows[0]
-        dclk = table.item(row, 1).data(UserRole)
+        dclk = view.clock_model.get_dclk(row)
         dlg = ClockEditorDialog(self, dclk)
         dlg.show()
 
@@ -209,12 +571,12 @@ class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call
     def copy_clock(self):
         view = self.gui_view
-        table = view.clock_table
-        rows = list({item.row() for item in table.selectedItems()})
+        model = view.clock_model
+        rows = view.get_selected_rows()
         if not rows:
             return
         clk_txt = '\n'.join([
-            f'{table.item(r, 0).text()}: {table.item(r, 1).text()}'
+            f'{model.get_text(r, 0)}: {model.get_text(r)}'
             for r in rows
         ])
         self.qt_app.clipboard().setText(clk_txt)
@@ -231,15 +593,15 @@ class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call
     def remove_clock(self, rows: int | list[int] = None):
         view = self.gui_view
-        table = view.clock_table
+        model = view.clock_model
         if rows is None:
-            rows = list({item.row() for item in table.selectedItems()})
+            rows = view.get_selected_rows()
 
         elif isinstance(rows, int):
             rows = [rows]
 
         r_dclks: list[tuple[int, DisplayClock]] = [
-            (r, table.item(r, 1).data(UserRole)) for r in rows
+            (r, model.get_dclk(r)) for r in rows
         ]
         if r_dclks:
             msg = "Are you sure you want to remove the selected clock(s)?\n"
@@ -256,8 +618,7 @@ class MainWindow(GuiWindow[MainWindowView]):
             log_info(f"Removing clock {dc.label!r} at row {r + 1}")
             pool.remove(dc)
 
-        PyCountdownApp.export_clocks_file()
-        self.refresh_clocks_file(True)
+        self.reload_saved_clocks(PyCountdownApp.export_clocks_file())
         if pool:
             self.gui_view.clock_table.selectRow(0)
         return True
@@ -265,19 +626,17 @@ class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call
     def duplicate(self, rows: int | list[int] = None):
         view = self.gui_view
-        table = view.clock_table
+        model = view.clock_model
         if rows is None:
-            rows = list({item.row() for item in table.selectedItems()})
+            rows = view.get_selected_rows()
 
         elif isinstance(rows, int):
             rows = [rows]
 
         if not rows:
             return
-        DisplayClock.duplicate_subpool([table.item(r, 1).data(UserRole)
-                                        for r in rows])
-        PyCountdownApp.export_clocks_file()
-        self.refresh_clocks_file(True)
+        DisplayClock.duplicate_subpool([model.get_dclk(r) for r in rows])
+        self.reload_saved_clocks(PyCountdownApp.export_clocks_file())
         self.gui_view.clock_table.selectRow(min(rows))
         log_info(f"Row(s) {', '.join(map(str, rows))} duplicated")
 
@@ -302,57 +661,119 @@ class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call
     def move_up(self, rows: int | list[int] = None):
         view = self.gui_view
-        table = view.clock_table
+        model = view.clock_model
         if rows is None:
-            rows = list({item.row() for item in table.selectedItems()})
+            rows = view.get_selected_rows()
 
         elif isinstance(rows, int):
             rows = [rows]
 
         if not rows:
             return
-        moved = DisplayClock.move_up([table.item(r, 1).data(UserRole)
-                                      for r in rows])
-        PyCountdownApp.export_clocks_file()
-        self.refresh_clocks_file(True)
+        moved = DisplayClock.move_up([model.get_dclk(r) for r in rows])
         before_rows, after_rows = moved
-        self.select_rows(after_rows)
+        self.apply_row_move(before_rows, after_rows)
         log_info(f"Row(s) {', '.join(map(str, before_rows))} "
                  f"moved up to {', '.join(map(str, after_rows))}")
 
     @log_func_call
     def move_down(self, rows: int | list[int] = None):
         view = self.gui_view
-        table = view.clock_table
+        model = view.clock_model
         if rows is None:
-            rows = list({item.row() for item in table.selectedItems()})
+            rows = view.get_selected_rows()
 
         elif isinstance(rows, int):
             rows = [rows]
 
         if not rows:
             return
-        moved = DisplayClock.move_down([table.item(r, 1).data(UserRole)
-                                        for r in rows])
-        PyCountdownApp.export_clocks_file()
-        self.refresh_clocks_file(True)
+        moved = DisplayClock.move_down([model.get_dclk(r) for r in rows])
         before_rows, after_rows = moved
-        self.select_rows(after_rows)
+        self.apply_row_move(before_rows, after_rows)
         log_info(f"Row(s) {', '.join(map(str, before_rows))} "
                  f"moved down to {', '.join(map(str, after_rows))}")
 
+    def apply_row_move(self, before_rows: list[int], after_rows: list[int]):
+        "move table rows to match a reordered pool, without a reload"
+        if not after_rows:
+            return
+
+        with self._update_lock:
+            self.gui_view.clock_model.move_rows(sorted(before_rows),
+                                                min(after_rows))
+            self.clock_batch.set_dclks(self.get_table_dclks())
+
+        self.rebuild_refresh_schedule()
+        self.select_rows(after_rows)
+        self.schedule_clocks_save()
+
+    def schedule_clocks_save(self):
+        """
+        Save the clocks file once edits stop coming in.  Without a clocks
+        file the edits stay in memory until the clocks are saved as one.
+        """
+        if PyCountdownApp.get_clocks_file_path():
+            self.save_timer.start()
+
+    def flush_clocks_save(self):
+        "save now if a save is pending"
+        timer = self.save_timer
+        if timer.isActive():
+            timer.stop()
+            PyCountdownApp.export_clocks_file()
+
+    def finish_clocks_saves(self):
+        "write out every pending save before the app exits"
+        self.flush_clocks_save()
+        writer = PyCountdownApp.clocks_writer
+        if writer and not writer.flush(CLOCKS_FLUSH_TIMEOUT_SEC):
+            log_warning('Exiting with unsaved clock changes')
+
+    def update_save_status(self):
+        """
+        Report the clocks file writer's retries and failures, which it cannot
+        log itself from its thread, and take note of its finished saves.
+        """
+        writer = PyCountdownApp.clocks_writer
+        if not writer:
+            return
+
+        PyCountdownApp.apply_clocks_saves()
+        if PyCountdownApp.clocks_check_deferred:
+            self.refresh_clocks_file()
+
+        retrying, retry_sec, errors = writer.get_status()
+        if retrying and retrying != self.save_retrying:
+            log_warning(f'Clocks file {retrying} unreachable, will keep '
+                        'retrying the save')
+        self.save_retrying = retrying
+
+        reported = self.save_errors
+        for file, e in errors.items():
+            if reported.get(file) is not e:
+                log_error(f'Clocks file {file} could not be saved: {e}')
+        self.save_errors = errors
+
+        text = ''
+        if retrying:
+            text = f'Save pending, retrying in {ceil(retry_sec)} s'
+        elif errors:
+            text = 'Clock changes not saved'
+        self.gui_view.set_save_status(text)
+
     @log_func_call
     def click_apply_tset(self, rows: int | list[int] = None):
         view = self.gui_view
-        table = view.clock_table
+        model = view.clock_model
         if rows is None:
-            rows = list({item.row() for item in table.selectedItems()})
+            rows = view.get_selected_rows()
 
         elif isinstance(rows, int):
             rows = [rows]
 
         r_dclks: list[tuple[int, DisplayClock]] = [
-            (r, table.item(r, 1).data(UserRole)) for r in rows
+            (r, model.get_dclk(r)) for r in rows
         ]
         if r_dclks:
             dlg = ApplyTSetDialog(self, r_dclks)
@@ -361,10 +782,11 @@ class MainWindow(GuiWindow[MainWindowView]):
     @log_func_call
     def select_rows(self, rows: list[int]):
         "Select the specified rows in the clock table."
-        table = self.gui_view.clock_table
+        view = self.gui_view
+        table = view.clock_table
         table.clearSelection()
         for row in rows:
-            if 0 <= row < table.rowCount():
+            if 0 <= row < view.clock_model.rowCount():
                 table.selectRow(row)
 
     def toggle_mute_alerts(self, checked: bool = None):
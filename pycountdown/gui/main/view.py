@@ -1,11 +1,12 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
 from functools import partial
 
+from PySide2.QtWidgets import QTableView
 from pyrandyos.gui.qt import (
-    QVBoxLayout, Qt, QToolBar, QTableWidget, QTableWidgetItem, QHeaderView,
+    QVBoxLayout, Qt, QToolBar, QHeaderView,
     QObject, QEvent, QMainWindow, QShortcut, QKeySequence, QDialog,
     QStyledItemDelegate, QPalette, QStyleOptionViewItem, QModelIndex,
-    QKeyEvent,
+    QKeyEvent, QLabel,
 )
 from pyrandyos.gui.callback import qt_callback
 from pyrandyos.gui.window import GuiWindowView
@@ -16,9 +17,10 @@ from pyrandyos.gui.utils import (
     create_action, create_toolbar_expanding_spacer,  # show_toolbtn_icon_and_text,  # noqa: E501
 )
 
-from ...app import PyCountdownApp, LOCAL_SHOW_HIDDEN_KEY
+from ...app import PyCountdownApp
 from ...logging import log_func_call
 from ...lib.clocks.displayclocks import DisplayClock
+from .model import ClockTableModel
 from ..gui_icons import (
     ConfigIcon, AddClockIcon, RemoveClockIcon, RefreshIcon, ClocksJsonIcon,
     SaveAsIcon, TimerIcon, OpenIcon, NewIcon, ShowHiddenIcon, ThresholdSetIcon,
@@ -27,8 +29,6 @@ from ..gui_icons import (
 if TYPE_CHECKING:
     from .pres import MainWindow
 
-UserRole = Qt.UserRole
-
 TABLE_TPAD = 2  # one sided
 TABLE_LPAD = 4  # one sided
 TABLE_VPAD = TABLE_TPAD*2  # two sided
@@ -36,7 +36,7 @@ TABLE_HPAD = TABLE_LPAD*2  # two sided
 TABLE_CELL_PADDING = f'padding: {TABLE_TPAD}px {TABLE_LPAD}px;'
 # TABLE_CELL_DEFAULT_STYLE = 'background-color: black; color: white;'
 TABLE_CELL_DEFAULT_STYLE = 'background-color: black;'
-TABLE_STYLE = f"QTableWidget {{ background-color: black; }} QTableWidget::item {{ {TABLE_CELL_PADDING} {TABLE_CELL_DEFAULT_STYLE}  }} QTableWidget::item:selected {{ background-color: #1a1a1a; }}"  # noqa: E501
+TABLE_STYLE = f"QTableView {{ background-color: black; }} QTableView::item {{ {TABLE_CELL_PADDING} {TABLE_CELL_DEFAULT_STYLE}  }} QTableView::item:selected {{ background-color: #1a1a1a; }}"  # noqa: E501
 
 
 class ColorPreservingDelegate(QStyledItemDelegate):
@@ -61,6 +61,10 @@ class ColorPreservingDelegate(QStyledItemDelegate):
 
 
 class MainWindowEventFilter(QObject):
+    def __init__(self, parent: QMainWindow, on_close: Callable[[], None]):
+        super().__init__(parent)
+        self.on_close = on_close
+
     def eventFilter(self, qtobj: QMainWindow, event: QEvent):
         if event.type() == QEvent.Type.WindowActivate:
             qtobj.setWindowOpacity(1)
@@ -76,6 +80,8 @@ class MainWindowEventFilter(QObject):
             for child in qtobj.findChildren(QDialog):
                 child.close()
 
+            self.on_close()
+
         return False  # Continue standard event processing
 
 
@@ -89,7 +95,8 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         qtobj.setWindowFlag(Qt.WindowStaysOnTopHint,
                             PyCountdownApp.get("local.always_on_top", False))
 
-        focus_filter = MainWindowEventFilter(qtobj)
+        focus_filter = MainWindowEventFilter(
+            qtobj, qt_callback(self.gui_pres.finish_clocks_saves))
         qtobj.installEventFilter(focus_filter)
         self.focus_filter = focus_filter
 
@@ -98,12 +105,22 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         self.basewidget.qtobj.setLayout(layout)
 
         self.status_bar = LoggingStatusBarWidget(self)
+        save_status_lbl = QLabel()
+        save_status_lbl.hide()
+        self.status_bar.status_bar.addPermanentWidget(save_status_lbl)
+        self.save_status_lbl = save_status_lbl
 
         self.create_toolbars()
         self.create_clock_table()
         # self.center_window_in_current_screen()
         self.create_shortcuts()
 
+    def set_save_status(self, text: str):
+        "show `text` at the right of the status bar, or hide it if empty"
+        lbl = self.save_status_lbl
+        lbl.setText(text)
+        lbl.setVisible(bool(text))
+
     def create_shortcuts(self):
         qtobj = self.qtobj
         pres = self.gui_pres
@@ -222,9 +239,10 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         toolbar.addWidget(create_toolbar_expanding_spacer())
 
         toolbar.addSeparator()
-        toolbar.addAction(create_action(qtobj, "Program config",
-                                        ConfigIcon.icon(),
-                                        pres.click_config))
+        config_action = create_action(qtobj, "Program config",
+                                      ConfigIcon.icon(), pres.click_config)
+        toolbar.addAction(config_action)
+        self.config_action = config_action
         toolbar.addAction(create_action(qtobj, "Clocks config",
                                         ClocksJsonIcon.icon(),
                                         pres.click_clocks_config))
@@ -235,6 +253,21 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         toolbar.addAction(mute_action)
         self.mute_action = mute_action
 
+    @log_func_call
+    def set_client_mode(self):
+        "disable everything that edits or loads local clocks"
+        keep = (self.config_action, self.mute_action)
+        for action in self.name_toolbar.actions():
+            if action not in keep:
+                action.setEnabled(False)
+
+        for shortcut in (self.dup_shortcut, self.add_shortcut,
+                         self.delete_shortcut, self.move_up_shortcut,
+                         self.move_down_shortcut, self.timer_shortcut,
+                         self.hide_shortcut, self.edit_shortcut,
+                         self.edit_shortcut2):
+            shortcut.setEnabled(False)
+
     @log_func_call
     def create_basewidget(self):
         return GuiViewBaseFrame(self)
@@ -243,7 +276,12 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
     def create_clock_table(self):
         layout = self.layout
 
-        clock_table = QTableWidget()
+        clock_model = ClockTableModel(self.gui_app.get_monofont(),
+                                      self.qtobj)
+        self.clock_model = clock_model
+
+        clock_table = QTableView()
+        clock_table.setModel(clock_model)
         layout.addWidget(clock_table)
         self.clock_table = clock_table
         self.setup_clock_table()
@@ -255,11 +293,6 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         table = self.clock_table
 
         header = table.horizontalHeader()
-
-        table.setColumnCount(2)
-        table.setHorizontalHeaderItem(0, QTableWidgetItem('Clock'))
-        table.setHorizontalHeaderItem(1, QTableWidgetItem('Current Time'))
-
         header.setSectionResizeMode(QHeaderView.ResizeToContents)
         # header.setStretchLastSection(True)
 
@@ -268,15 +301,23 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         # Use delegate to preserve per-item colors when selected/hovered
         table.setItemDelegate(ColorPreservingDelegate(table))
         table.setSortingEnabled(False)
-        table.setSelectionBehavior(QTableWidget.SelectRows)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)  # Make readonly
-        table.setVerticalScrollMode(QTableWidget.ScrollPerPixel)
-        table.setHorizontalScrollMode(QTableWidget.ScrollPerPixel)
+        table.setSelectionBehavior(QTableView.SelectRows)
+        table.setEditTriggers(QTableView.NoEditTriggers)  # Make readonly
+        table.setVerticalScrollMode(QTableView.ScrollPerPixel)
+        table.setHorizontalScrollMode(QTableView.ScrollPerPixel)
 
         vheader = table.verticalHeader()
         vheader.setSectionResizeMode(QHeaderView.ResizeToContents)
         vheader.sectionClicked.connect(qt_callback(pres.row_header_clicked))
-        table.cellDoubleClicked.connect(qt_callback(pres.row_header_clicked))
+        table.doubleClicked.connect(qt_callback(
+            lambda index: pres.row_header_clicked(index.row())))
+
+        # scrolling, resizing and row height changes all move the range
+        vscroll = table.verticalScrollBar()
+        visible_cb = qt_callback(
+            lambda *args: pres.queue_visible_rows_update())
+        vscroll.valueChanged.connect(visible_cb)
+        vscroll.rangeChanged.connect(visible_cb)
 
         key_callback = self.table_handle_key_press
 
@@ -294,15 +335,15 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
         table.installEventFilter(table_filter)
         self.table_filter = table_filter
 
-    def table_handle_key_press(self, table: QTableWidget,
+    def table_handle_key_press(self, table: QTableView,
                                event: QKeyEvent) -> bool:
         key = event.key()
-        row_count = table.rowCount()
+        row_count = self.clock_model.rowCount()
 
         if row_count == 0:
             return False
 
-        current_row = table.currentRow()
+        current_row = table.currentIndex().row()
         if key == Qt.Key_Up and current_row == 0:
             table.selectRow(row_count - 1)
             return True
@@ -313,22 +354,20 @@ class MainWindowView(GuiWindowView['MainWindow', GuiViewBaseFrame]):
 
     @log_func_call
     def populate_clock_table(self):
-        show_hidden = PyCountdownApp.get(LOCAL_SHOW_HIDDEN_KEY)
+        self.clock_model.set_dclks(DisplayClock.get_shown_dclks())
+
+    def get_visible_rows(self):
+        "range of the table rows at least partly inside the viewport"
         table = self.clock_table
-        clocks = [x for x in DisplayClock.pool
-                  if x is None or not x.hidden or show_hidden]
-        rowcount = len(clocks)
-        table.clearContents()
-        table.setRowCount(rowcount)
-        font = self.gui_app.get_monofont()
-        for i, row in enumerate(clocks):
-            item = QTableWidgetItem(row.label if row else '')
-            item.setFont(font)
-            table.setItem(i, 0, item)
-
-            clk = row.clock if row else None
-            item = QTableWidgetItem("Loading..." if clk else "")
-            item.setData(UserRole, row)
-            item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            item.setFont(font)
-            table.setItem(i, 1, item)
+        row_count = self.clock_model.rowCount()
+        first = table.rowAt(0)
+        if not row_count or first < 0:
+            return range(0)
+
+        last = table.rowAt(table.viewport().height() - 1)
+        return range(first, (last if last >= 0 else row_count - 1) + 1)
+
+    def get_selected_rows(self):
+        "sorted rows of the clock table with a selected cell"
+        selmodel = self.clock_table.selectionModel()
+        return sorted({idx.row() for idx in selmodel.selectedIndexes()})
@@ -0,0 +1,120 @@
+from typing import Callable
+from urllib.parse import urlsplit, urlunsplit
+
+from PySide2.QtCore import QUrl
+from PySide2.QtNetwork import (
+    QNetworkAccessManager, QNetworkRequest, QNetworkReply,
+)
+from pyrandyos.gui.qt import QTimer, QObject
+from pyrandyos.gui.callback import qt_callback
+
+from ..logging import log_func_call, log_info, log_warning, log_debuglow
+from ..lib.clocks.rows import RowType
+from ..lib.sse import SSEParser, EVENTS_PATH
+
+RECONNECT_MIN_MS = 1000
+RECONNECT_MAX_MS = 30000
+
+
+def get_events_url(url: str):
+    "accepts the bare address of a clock publisher as well as its event URL"
+    parts = urlsplit(url if '://' in url else f'http://{url}')
+    path = parts.path if parts.path.strip('/') else EVENTS_PATH
+    return urlunsplit(parts._replace(path=path))
+
+
+class RemoteClocksSubscriber:
+    """
+    Follows the event stream of a clock publisher (`pycountdown serve`).
+    `on_snapshot` is called with every row and the publisher's named alert
+    sequences when (re)connected or when the publisher reloads its clocks,
+    and `on_delta` with `[row, state]` pairs
+    of the rows that changed.  The connection is retried with backoff for as
+    long as the subscriber is running.
+    """
+    def __init__(self, url: str,
+                 on_snapshot: Callable[[list[RowType], dict[str, list]],
+                                       None],
+                 on_delta: Callable[[list[tuple[int, RowType]]], None],
+                 parent: QObject = None):
+        self.url = get_events_url(url)
+        self.on_snapshot = on_snapshot
+        self.on_delta = on_delta
+        self.parser = SSEParser()
+        self.seq: int = None
+        self.reply: QNetworkReply = None
+        self.running = False
+        self.manager = QNetworkAccessManager(parent)
+
+        reconnect_timer = QTimer(parent)
+        reconnect_timer.setSingleShot(True)
+        reconnect_timer.timeout.connect(qt_callback(self.connect))
+        self.reconnect_timer = reconnect_timer
+        self.reconnect_ms = RECONNECT_MIN_MS
+
+    @log_func_call
+    def start(self):
+        self.running = True
+        self.connect()
+
+    @log_func_call
+    def stop(self):
+        self.running = False
+        self.reconnect_timer.stop()
+        self.disconnect()
+
+    def connect(self):
+        self.disconnect()
+        log_debuglow(f'connecting to clock publisher {self.url}')
+        self.parser.reset()
+        self.seq = None
+        request = QNetworkRequest(QUrl(self.url))
+        request.setRawHeader(b'Accept', b'text/event-stream')
+        reply = self.manager.get(request)
+        reply.readyRead.connect(qt_callback(self.read))
+        reply.finished.connect(qt_callback(self.on_finished))
+        self.reply = reply
+
+    def disconnect(self):
+        reply = self.reply
+        self.reply = None
+        if reply:
+            reply.finished.disconnect()
+            reply.abort()
+            reply.deleteLater()
+
+    def read(self):
+        reply = self.reply
+        if not reply:
+            return
+
+        for event, data in self.parser.feed(bytes(reply.readAll())):
+            seq = data.get('seq')
+            if event == 'snapshot':
+                if self.seq is None:
+                    log_info(f'Connected to clock publisher {self.url}')
+                self.reconnect_ms = RECONNECT_MIN_MS
+                self.seq = seq
+                self.on_snapshot(data['rows'],
+                                 data.get('alert_sequences'))
+
+            elif event == 'delta' and self.seq is not None:
+                if seq != self.seq + 1:
+                    log_warning('Missed clock updates, resubscribing')
+                    self.connect()
+                    return
+
+                self.seq = seq
+                self.on_delta(data['rows'])
+
+    def on_finished(self):
+        reply = self.reply
+        if reply and reply.error() != QNetworkReply.NoError:
+            log_warning(f'Clock publisher connection lost: '
+                        f'{reply.errorString()}')
+
+        self.disconnect()
+        if self.running:
+            delay = self.reconnect_ms
+            self.reconnect_ms = min(2*delay, RECONNECT_MAX_MS)
+            self.reconnect_timer.start(delay)
@@ -0,0 +1,84 @@
+from pathlib import Path
+from typing import Callable
+
+from PySide2.QtCore import QFileSystemWatcher
+from pyrandyos.gui.qt import QTimer, QObject
+from pyrandyos.gui.callback import qt_callback
+
+from ..logging import log_func_call, log_debuglow
+
+DEBOUNCE_MS = 50
+
+
+class ClocksFileWatcher:
+    """
+    Calls `callback` shortly after the watched file changes on disk.  The
+    parent directory is watched too, because editors that save by writing a
+    temp file and renaming it over the original drop the file watch; the file
+    is re-added whenever it reappears.  Bursts of events are debounced into a
+    single callback.
+    """
+    def __init__(self, callback: Callable[[], None], parent: QObject = None,
+                 debounce_ms: int = DEBOUNCE_MS):
+        self.path: Path = None
+        watcher = QFileSystemWatcher(parent)
+        watcher.fileChanged.connect(qt_callback(self.on_change))
+        watcher.directoryChanged.connect(qt_callback(self.on_change))
+        self.watcher = watcher
+
+        debounce = QTimer(parent)
+        debounce.setSingleShot(True)
+        debounce.setInterval(debounce_ms)
+        debounce.timeout.connect(qt_callback(self.fire))
+        self.debounce = debounce
+        self.callback = callback
+
+    @log_func_call
+    def watch(self, path: Path | str | None):
+        """
+        Watch `path` instead of whatever was watched before.  Returns False
+        if the file could not be watched and must be polled instead.
+        """
+        path = Path(path) if path else None
+        if path == self.path and self.is_watching():
+            return True
+
+        self.unwatch()
+        self.path = path
+        if not path:
+            return True
+
+        watcher = self.watcher
+        parent = path.parent
+        if parent.is_dir():
+            watcher.addPath(parent.as_posix())
+
+        self.rewatch_file()
+        return self.is_watching()
+
+    def unwatch(self):
+        watcher = self.watcher
+        paths = watcher.files() + watcher.directories()
+        if paths:
+            watcher.removePaths(paths)
+
+        self.debounce.stop()
+        self.path = None
+
+    def is_watching(self):
+        path = self.path
+        return bool(path) and path.as_posix() in self.watcher.files()
+
+    def rewatch_file(self):
+        path = self.path
+        if path and path.exists() and not self.is_watching():
+            self.watcher.addPath(path.as_posix())
+
+    def on_change(self, changed: str):
+        log_debuglow(f'clocks file watcher event: {changed}')
+        self.debounce.start()
+
+    def fire(self):
+        # an atomic rename replaces the inode, so the file watch is gone
+        self.rewatch_file()
+        self.callback()
@@ -1,3 +1,5 @@
+from typing import Iterable
+
 from pyrandyos.gui.qt import QComboBox
 from pyrandyos.gui.widgets import QtWidgetWrapper, GuiWidgetParentType
 
@@ -8,8 +10,11 @@ from ...lib.clocks.clock import Clock
 
 class ClockListWidget(QtWidgetWrapper[QComboBox]):
     def __init__(self, gui_parent: GuiWidgetParentType, show_now: bool = False,
+                 exclude_ids: Iterable[str] = (),
                  *qtobj_args, **qtobj_kwargs):
         self.show_now = show_now
+        # clocks that must not be offered, e.g. to avoid circular references
+        self.exclude_ids = set(exclude_ids)
         super().__init__(gui_parent, *qtobj_args, **qtobj_kwargs)
 
     @log_func_call
@@ -20,8 +25,10 @@ class ClockListWidget(QtWidgetWrapper[QComboBox]):
         if self.show_now:
             qtobj.addItem("(now)", NOW_ID)
 
+        exclude_ids = self.exclude_ids
         for name, clk_id in DisplayClock.get_valid_dclock_name_id_full_list():
-            qtobj.addItem(name, clk_id)
+            if clk_id not in exclude_ids:
+                qtobj.addItem(name, clk_id)
 
         return qtobj
 
@@ -1,12 +1,14 @@
 from PySide2.QtWidgets import QColorDialog
 
-from pyrandyos.gui.qt import QPushButton, QColor
+from pyrandyos.gui.qt import QPushButton
 from pyrandyos.gui.widgets import QtWidgetWrapper, GuiWidgetParentType
 from pyrandyos.gui.callback import qt_callback
 # from pyrandyos.utils.time.fmt import
 
 from ...logging import log_func_call
 from ...lib.clocks.fmt import DEFAULT_COLOR
+from ...lib.clocks.color import RGBColor
+from ..color import to_qcolor, from_qcolor
 
 
 class ColorButtonWidget(QtWidgetWrapper[QPushButton]):
@@ -27,15 +29,15 @@ class ColorButtonWidget(QtWidgetWrapper[QPushButton]):
     def get_color(self):
         return self.color
 
-    def set_color(self, color: QColor):
-        self.color = color
+    def set_color(self, color: RGBColor | None):
+        self.color = color or DEFAULT_COLOR
         self.qtobj.setStyleSheet(self.color_btn_style(self.color))
 
-    def color_btn_style(self, color: QColor):
+    def color_btn_style(self, color: RGBColor):
         return f'QPushButton {{ background-color: black; color: {color.name()}; }}'  # noqa: E501
 
     def open_color_dialog(self):
         color_btn = self.qtobj
-        color = QColorDialog.getColor(self.color, color_btn)
+        color = QColorDialog.getColor(to_qcolor(self.color), color_btn)
         if color.isValid():
-            self.set_color(color)
+            self.set_color(from_qcolor(color))
@@ -1,3 +1,4 @@
+from typing import Iterable
 from functools import partial
 from PySide2.QtWidgets import QCheckBox, QRadioButton
 
@@ -27,6 +28,7 @@ class EpochWidget(QtWidgetWrapper[QFrame]):
     def __init__(self, gui_parent: GuiWidgetParentType, label: str = 'Epoch:',
                  timer: bool = False, keybd_shortcuts: bool = False,
                  show_clocklist: bool = True,
+                 exclude_ids: Iterable[str] = (),
                  *qtobj_args, **qtobj_kwargs):
         self.label = label
         self.timer = timer
@@ -35,6 +37,7 @@ class EpochWidget(QtWidgetWrapper[QFrame]):
         self.input_fmt = TimeFormat.DHMS
         self.last_clock_id = None
         self.show_clocklist = show_clocklist
+        self.exclude_ids = exclude_ids
         super().__init__(gui_parent, *qtobj_args, **qtobj_kwargs)
         self.create_widget()
 
@@ -79,7 +82,7 @@ class EpochWidget(QtWidgetWrapper[QFrame]):
         self.convert = None
         show_clocklist = self.show_clocklist
         if show_clocklist:
-            clocklist = ClockListWidget(self, True)
+            clocklist = ClockListWidget(self, True, self.exclude_ids)
             self.clocklist = clocklist
             convert = self.create_convert_chk()
 
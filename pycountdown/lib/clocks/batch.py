@@ -0,0 +1,159 @@
+from typing import Iterable
+
+from pyrandyos.utils.time.rate import BaseClockRate
+
+from .clock import ClockPlan
+from .epoch import tai_to_rate
+from .displayclocks import DisplayClock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_TAI_RATE = BaseClockRate.TAI
+# how each row of a batch is evaluated
+_REL = 'rel'
+_ABS = 'abs'
+_OTHER = 'other'
+
+AbsKeyType = tuple[BaseClockRate, float]
+
+
+class ClockGroups:
+    """
+    The display clocks of a batch sorted by how they are evaluated, both as
+    row lists and as one entry per row for evaluating only some rows.
+    """
+    def __init__(self, dclks: list[DisplayClock]):
+        self.rel_rows: list[int] = list()
+        self.rel_offsets: list[float] = list()
+        self.rel_epochs: list[float] = list()
+        self.abs_groups: dict[AbsKeyType, list[int]] = dict()
+        self.other: list[tuple[int, ClockPlan]] = list()
+        self.none_rows: list[int] = list()
+        self.entries: list[tuple[str, object] | None] = list()
+        for i, dclk in enumerate(dclks):
+            self.entries.append(self.add(i, dclk))
+
+        self.arrays = None
+        if np is not None:
+            self.arrays = (np.array(self.rel_rows, dtype=np.intp),
+                           np.array(self.rel_offsets, dtype=np.float64),
+                           np.array(self.rel_epochs, dtype=np.float64),
+                           {k: np.array(v, dtype=np.intp)
+                            for k, v in self.abs_groups.items()})
+
+    def add(self, i: int, dclk: DisplayClock | None):
+        clock = dclk.clock if dclk else None
+        if not clock:
+            self.none_rows.append(i)
+            return
+
+        plan = clock.plan
+        if plan.is_relative():
+            if plan.rate is not _TAI_RATE:
+                # let the plan raise for what it cannot evaluate
+                self.other.append((i, plan))
+                return _OTHER, plan
+
+            self.rel_rows.append(i)
+            self.rel_offsets.append(plan.offset_sec)
+            self.rel_epochs.append(plan.epoch_tai)
+            return _REL, (plan.offset_sec, plan.epoch_tai)
+
+        key = (plan.rate, plan.offset_sec)
+        self.abs_groups.setdefault(key, list()).append(i)
+        return _ABS, key
+
+
+class ClockBatch:
+    """
+    Evaluates a list of display clocks from a single TAI time.  Absolute
+    clocks sharing a base rate and offset are converted once per group, and
+    relative TAI clocks reduce to the TAI time plus a per-clock offset.
+    Call `invalidate` whenever any of the clocks' plans may have changed.
+
+    Evaluating every clock uses NumPy, when it is installed, for the relative
+    clocks (one array operation) and to fan out each absolute group (one
+    assignment per group).  The DST and leap second conversions themselves
+    are scalar pyrandyos functions, so the grouping is what saves the most.
+    The values are the same as those of each clock's plan, operation for
+    operation, with or without NumPy.
+    """
+    def __init__(self, dclks: Iterable[DisplayClock] = ()):
+        self.dclks: list[DisplayClock] = list()
+        self._groups: ClockGroups = None
+        self.set_dclks(dclks)
+
+    def set_dclks(self, dclks: Iterable[DisplayClock]):
+        self.dclks = list(dclks)
+        self.invalidate()
+
+    def invalidate(self):
+        self._groups = None
+
+    def compile(self):
+        return ClockGroups(self.dclks)
+
+    @property
+    def groups(self):
+        groups = self._groups
+        if groups is None:
+            groups = self.compile()
+            self._groups = groups
+        return groups
+
+    def evaluate(self, now_tai: float, rows: Iterable[int] = None):
+        """
+        Clock time of each of `rows` (every display clock if None), or None
+        for rows without a clock.
+        """
+        if rows is None:
+            return self.evaluate_all(now_tai)
+        return self.evaluate_rows(now_tai, rows)
+
+    def evaluate_all(self, now_tai: float):
+        groups = self.groups
+        arrays = groups.arrays
+        if arrays is None:
+            return self.evaluate_rows(now_tai, range(len(self.dclks)))
+
+        rel_rows, rel_offsets, rel_epochs, abs_groups = arrays
+        values = np.empty(len(self.dclks))
+        values[rel_rows] = rel_offsets + now_tai - rel_epochs
+        for (rate, offset), rows in abs_groups.items():
+            values[rows] = tai_to_rate(offset + now_tai, rate)
+
+        out: list[float | None] = values.tolist()
+        for i, plan in groups.other:
+            out[i] = plan.evaluate(now_tai)
+        for i in groups.none_rows:
+            out[i] = None
+        return out
+
+    def evaluate_rows(self, now_tai: float, rows: Iterable[int]):
+        entries = self.groups.entries
+        converted: dict[AbsKeyType, float] = dict()
+        out: list[float | None] = list()
+        for i in rows:
+            entry = entries[i]
+            if entry is None:
+                out.append(None)
+                continue
+
+            kind, arg = entry
+            if kind is _REL:
+                offset, epoch_tai = arg
+                out.append(offset + now_tai - epoch_tai)
+            elif kind is _ABS:
+                t = converted.get(arg)
+                if t is None:
+                    rate, offset = arg
+                    t = tai_to_rate(offset + now_tai, rate)
+                    converted[arg] = t
+                out.append(t)
+            else:
+                out.append(arg.evaluate(now_tai))
+
+        return out
@@ -1,12 +1,77 @@
+from weakref import WeakSet
+
 from pyrandyos.utils.time.base_convert import GPST_EPOCH_TAI, UNIX_UTC_SEC
-from pyrandyos.utils.time.rate import BaseClockRate, tai_to_rate
+from pyrandyos.utils.time.rate import BaseClockRate
 from pyrandyos.utils.time.fmt import TimeFormatter
 
-from .epoch import Epoch
+from .epoch import (
+    Epoch, tai_to_rate, rate_to_tai_folded, next_rate_jump_tai,
+)
 
 _TAI_RATE = BaseClockRate.TAI
 
 
+class ClockCycleError(ValueError):
+    "a clock follows or counts from itself, directly or through others"
+
+
+class ClockPlan:
+    """
+    Flattened evaluation of a clock's follow/epoch/ref chain, reducing it to
+    a constant TAI offset, a base rate, and (for relative clocks) the TAI
+    epoch that clock time counts from.
+    """
+    def __init__(self, offset_sec: float, rate: BaseClockRate,
+                 is_abs: bool, epoch_tai: float = None):
+        self.offset_sec = offset_sec
+        self.rate = rate
+        self.is_abs = is_abs
+        self.epoch_tai = epoch_tai
+
+    def is_relative(self):
+        return not self.is_abs and self.epoch_tai is not None
+
+    def evaluate(self, tai: float):
+        eff_tai = self.offset_sec + tai
+        if self.is_relative():
+            if self.rate is not _TAI_RATE:
+                raise NotImplementedError
+            return eff_tai - self.epoch_tai
+        return tai_to_rate(eff_tai, self.rate)
+
+    def clock_to_tai(self, t: float, after_tai: float = None):
+        """
+        Inverse of `evaluate`: the TAI time at which this clock reads `t`.
+        Local times in the repeated hour after a DST fall back are read
+        twice; the first reading after `after_tai` is returned (the first of
+        both if `after_tai` is None).
+        """
+        offset = self.offset_sec
+        if self.is_relative():
+            return t + self.epoch_tai - offset
+
+        rate = self.rate
+        tai = rate_to_tai_folded(t, rate) - offset
+        if after_tai is not None and tai <= after_tai:
+            # the second reading, in standard time (if there is one)
+            tai = rate_to_tai_folded(t, rate, True) - offset
+        return tai
+
+    def next_jump_tai(self, after_tai: float, until_tai: float):
+        """
+        TAI time after `after_tai` and no later than `until_tai` at which
+        this clock jumps forward or back (when DST starts or ends), if any.
+        """
+        if self.is_relative():
+            return
+
+        offset = self.offset_sec
+        tai = next_rate_jump_tai(after_tai + offset, until_tai + offset,
+                                 self.rate)
+        if tai is not None:
+            return tai - offset
+
+
 class Clock:
     def __init__(self,
                  epoch: Epoch = None, ref: Epoch = None,
@@ -14,6 +79,11 @@ class Clock:
                  rate: BaseClockRate = _TAI_RATE,
                  offset_sec: float = None,
                  _abs: bool = False):
+        # compiled evaluation plan and the clocks that compiled against it
+        self._plan: ClockPlan = None
+        self._dependents: WeakSet[Clock] = WeakSet()
+        self._compiling = False
+
         # internal properties
         self._abs = _abs
         self._offset_sec = offset_sec
@@ -31,55 +101,134 @@ class Clock:
                      ref.copy() if ref else None,
                      self.follow, self.rate, self._offset_sec, self._abs)
 
-    def is_abs(self):
+    @property
+    def epoch(self):
+        return self._epoch
+
+    @epoch.setter
+    def epoch(self, value: Epoch):
+        self._epoch = value
+        self.invalidate()
+
+    @property
+    def ref(self):
+        return self._ref
+
+    @ref.setter
+    def ref(self, value: Epoch):
+        self._ref = value
+        self.invalidate()
+
+    @property
+    def follow(self):
+        return self._follow
+
+    @follow.setter
+    def follow(self, value: 'Clock'):
+        self._follow = value
+        self.invalidate()
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: BaseClockRate):
+        self._rate = value
+        self.invalidate()
+
+    @property
+    def plan(self):
+        plan = self._plan
+        if plan is None:
+            plan = self.compile()
+            self._plan = plan
+        return plan
+
+    def compile(self):
+        "walk the follow/epoch/ref chain once and flatten it into a plan"
+        if self._compiling:
+            # reached this clock again while compiling its upstream clocks
+            raise ClockCycleError('circular clock reference')
+
+        self._compiling = True
+        try:
+            return self._compile()
+        finally:
+            self._compiling = False
+
+    def _compile(self):
+        epoch = self.epoch
+        ref = self.ref
         follow = self.follow
-        return (
+        follow_plan = follow.plan if follow else None
+
+        is_abs = (
             self._abs
-            or (follow is not None and follow.is_abs())
-            or (self.epoch is None and follow is None)
-            or (self.epoch is not None and self.ref is not None)
+            or (follow_plan is not None and follow_plan.is_abs)
+            or (epoch is None and follow is None)
+            or (epoch is not None and ref is not None)
         )
 
-    def is_offset(self):
-        return bool(self.offset_sec)
-
-    @property
-    def offset_sec(self):
         tmp = self._offset_sec
         no_offset = tmp is None
         offset = tmp or 0
-        epoch = self.epoch
-        ref = self.ref
-        follow = self.follow
         if epoch:
             if no_offset and ref:
                 offset = epoch.to_tai().epoch_sec - ref.to_tai().epoch_sec
             else:
-                offset += epoch.clock.offset_sec
+                offset += epoch.clock.plan.offset_sec
+
+        if follow_plan:
+            offset += follow_plan.offset_sec
 
-        if follow:
-            offset += follow.offset_sec
+        epoch_tai = None
+        if epoch and not is_abs:
+            epoch_tai = epoch.to_tai().epoch_sec
 
-        return offset
+        # register with upstream clocks so their changes invalidate this plan
+        for upstream in (follow, epoch.clock if epoch else None,
+                         ref.clock if ref else None):
+            if upstream is not None:
+                upstream._dependents.add(self)
+
+        return ClockPlan(offset, self.rate, is_abs, epoch_tai)
+
+    def invalidate(self):
+        "drop the compiled plan of this clock and every clock downstream"
+        stack: list[Clock] = [self]
+        seen: set[Clock] = set()
+        while stack:
+            clk = stack.pop()
+            if clk in seen:
+                continue
+
+            seen.add(clk)
+            clk._plan = None
+            dependents = clk._dependents
+            stack.extend(dependents)
+            dependents.clear()
+
+    def is_abs(self):
+        return self.plan.is_abs
+
+    def is_offset(self):
+        return bool(self.offset_sec)
+
+    @property
+    def offset_sec(self):
+        return self.plan.offset_sec
 
     @offset_sec.setter
     def offset_sec(self, value: float):
         self._offset_sec = value
+        self.invalidate()
 
     def tai_to_clock_time(self, tai: float):
-        offset = self.offset_sec
-        epoch = self.epoch
-        rate = self.rate
-        eff_tai = offset + tai
-        if epoch and not self.is_abs():
-            if rate is not _TAI_RATE:
-                raise NotImplementedError
-            return Epoch(self, eff_tai - epoch.to_tai().epoch_sec)
-        return Epoch(self, tai_to_rate(eff_tai, rate))
+        return Epoch(self, self.plan.evaluate(tai))
 
     def display(self, now_tai: float, fmtr: TimeFormatter):
-        t = self.tai_to_clock_time(now_tai)
-        return t.as_fmt_str(fmtr)
+        return fmtr.sec_as_fmt_str(self.plan.evaluate(now_tai))
 
 
 TAI_CLOCK = Clock(None, rate=_TAI_RATE)
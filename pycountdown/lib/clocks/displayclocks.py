@@ -1,21 +1,29 @@
 from pyrandyos.utils.time.now import now_tai_sec
 from pyrandyos.utils.time.fmt import TimeFormat
-from pyrandyos.utils.casesafe import (
-    casesafe_dict_get, casesafe_key_in_dict,
-    casesafe_value_in_container, casesafe_is_equal,
-)
+from pyrandyos.utils.casesafe import casesafe_dict_get, casesafe_key_in_dict
 
 from .epoch import Epoch
 from .clock import Clock, DEFAULT_CLOCKS
-from .fmt import ClockFormatter, ClockThreshold
+from .fmt import ClockFormatter
+from .graph import ClockGraph
+from .registry import ClockRegistry, is_shown
 
 JsonEpochType = float | int | list[float | int]
 
 NOW_ID = '__now'
 
 
+def get_show_hidden(show_hidden: bool = None):
+    "the app's show hidden setting unless `show_hidden` is given"
+    if show_hidden is None:
+        from ...app import PyCountdownApp, LOCAL_SHOW_HIDDEN_KEY
+        show_hidden = PyCountdownApp.get(LOCAL_SHOW_HIDDEN_KEY)
+    return show_hidden
+
+
 class DisplayClock:
-    pool: list['DisplayClock'] = list()
+    pool: ClockRegistry = ClockRegistry()
+    graph: ClockGraph = ClockGraph()
 
     def __init__(self, clk_id: str, label: str, clock: Clock,
                  formatter: ClockFormatter):
@@ -24,11 +32,12 @@ class DisplayClock:
         self.label = label
         self.clock = clock
         self.formatter = formatter
+        # JSON this clock was parsed from, used to diff reloads
+        self.source: dict = None
         fmt = formatter.time_format
         formatter.time_format = fmt or (TimeFormat.YMDHMS
                                         if clock and clock.is_abs()
                                         else TimeFormat.DHMS)
-        self._cache: tuple[float, ClockThreshold] = None
 
     def copy(self):
         clock = self.clock
@@ -42,10 +51,28 @@ class DisplayClock:
             return clock.display(now_tai, fmt or self.formatter)
         return ""
 
+    def display_sec(self, t: float | None, fmt: ClockFormatter = None):
+        "format a clock time already evaluated for this clock"
+        if self.clock and t is not None:
+            return (fmt or self.formatter).sec_as_fmt_str(t)
+        return ""
+
     @property
     def hidden(self):
         return self.formatter.hidden
 
+    @classmethod
+    def set_pool(cls, pool: list['DisplayClock']):
+        pool = list(pool)
+        cls.pool.reset(pool)
+        cls.graph.rebuild(pool)
+
+    @classmethod
+    def update(cls, dclk: 'DisplayClock'):
+        "must be called after a display clock in the pool is edited in place"
+        cls.pool.update(dclk)
+        cls.graph.update(dclk)
+
     @classmethod
     def get_pool_names(cls):
         return [x.label if x else None for x in cls.pool]
@@ -62,34 +89,21 @@ class DisplayClock:
     def get_valid_pool_ids(cls):
         return [x.clk_id for x in cls.pool if x and x.clock]
 
+    @classmethod
+    def get_shown_dclks(cls, show_hidden: bool = None):
+        "rows of the pool that are displayed, including blank/unresolved ones"
+        show_hidden = get_show_hidden(show_hidden)
+        return [x for x in cls.pool if show_hidden or is_shown(x)]
+
     @classmethod
     def get_idx_for_visible_idx(cls, visible_idx: int,
                                 show_hidden: bool = None):
-        if show_hidden is None:
-            from ...app import PyCountdownApp, LOCAL_SHOW_HIDDEN_KEY
-            show_hidden = PyCountdownApp.get(LOCAL_SHOW_HIDDEN_KEY)
-
-        j = 0
-        for i, x in enumerate(cls.pool):
-            if x and x.hidden and not show_hidden:
-                continue
-            if j == visible_idx:
-                return i
-            j += 1
+        return cls.pool.get_idx_for_row(visible_idx,
+                                        get_show_hidden(show_hidden))
 
     @classmethod
     def get_visible_idx_for_idx(cls, idx: int, show_hidden: bool = None):
-        if show_hidden is None:
-            from ...app import PyCountdownApp, LOCAL_SHOW_HIDDEN_KEY
-            show_hidden = PyCountdownApp.get(LOCAL_SHOW_HIDDEN_KEY)
-
-        j = 0
-        for i, x in enumerate(cls.pool):
-            if x and x.hidden and not show_hidden:
-                continue
-            if i == idx:
-                return j
-            j += 1
+        return cls.pool.get_row_for_idx(idx, get_show_hidden(show_hidden))
 
     @classmethod
     def get_dclock_names_full_list(cls):
@@ -126,9 +140,9 @@ class DisplayClock:
 
     @classmethod
     def get_id_for_clock(cls, clk: Clock):
-        for dclk in cls.pool:
-            if dclk and dclk.clock is clk:
-                return dclk.clk_id
+        dclk = cls.pool.get_dclk_for_clock(clk)
+        if dclk:
+            return dclk.clk_id
         for k, v in DEFAULT_CLOCKS.items():
             if v is clk:
                 return k
@@ -139,96 +153,73 @@ class DisplayClock:
             return Clock(Epoch(DEFAULT_CLOCKS['TAI'], now_tai_sec()))
         if casesafe_key_in_dict(DEFAULT_CLOCKS, clk_id, True):
             return casesafe_dict_get(DEFAULT_CLOCKS, clk_id, None, True)
-        pool_ids = cls.get_pool_ids()
-        if casesafe_value_in_container(pool_ids, clk_id, True):
-            for i, x in enumerate(pool_ids):
-                if casesafe_is_equal(x, clk_id, True):
-                    dclk = cls.pool[i]
-                    return dclk.clock
+        dclk = cls.pool.get_dclk_for_id(clk_id)
+        if dclk:
+            return dclk.clock
 
     @classmethod
     def move_up(cls, subpool: list['DisplayClock']):
-        # get the current indices of subpool
-        currentidx = [cls.pool.index(dclk) for dclk in subpool
-                      if dclk in cls.pool]
+        pool = cls.pool
+        subpool = [x for x in subpool if x in pool]
 
         # get visible indices before the move
-        before_visible = [cls.get_visible_idx_for_idx(i) for i in currentidx]
+        before_visible = [cls.get_visible_idx_for_idx(pool.index(dclk))
+                          for dclk in subpool]
 
         # get the visible index of the topmost item in subpool
         toprow = min(before_visible)
 
-        # get the visible index of the visible item above the subpool topmost
+        # the visible item above the subpool topmost is above every item in
+        # subpool, so its index is the same with the subpool taken out
         above_top_row = max(toprow - 1, 0)
-        insert_idx = cls.get_idx_for_visible_idx(above_top_row)
-
-        # first remove everything in subpool from pool
-        pool = cls.pool
-        for dclk in subpool:
-            if dclk not in pool:
-                continue
-            pool.remove(dclk)
-
-        # insert subpool at insert_idx
-        cls.pool = pool[:insert_idx] + subpool + pool[insert_idx:]
+        pool.move_block(subpool, cls.get_idx_for_visible_idx(above_top_row))
 
         # get visible indices after the move
-        after_visible = [cls.get_visible_idx_for_idx(cls.pool.index(dclk))
-                         for dclk in subpool if dclk in cls.pool]
+        after_visible = [cls.get_visible_idx_for_idx(pool.index(dclk))
+                         for dclk in subpool]
 
         return before_visible, after_visible
 
     @classmethod
     def move_down(cls, subpool: list['DisplayClock']):
         pool = cls.pool
-
-        # get the current indices of subpool
-        currentidx = [cls.pool.index(dclk) for dclk in subpool
-                      if dclk in cls.pool]
+        subpool = [x for x in subpool if x in pool]
 
         # get visible indices before the move
-        before_visible = [cls.get_visible_idx_for_idx(i) for i in currentidx]
-
-        # find the index of the bottommost item in subpool
-        bottomidx = max(currentidx)
-
-        # get the next visible item after the bottommost item in subpool.
-        # nxt is None if we are already at the bottom of the list.
-        from ...app import PyCountdownApp, LOCAL_SHOW_HIDDEN_KEY
-        show_hidden = PyCountdownApp.get(LOCAL_SHOW_HIDDEN_KEY)
-        nxt = None
-        for x in pool[bottomidx + 1:]:
-            if show_hidden or (x and not x.hidden):
-                nxt = x
-                break
-
-        # remove everything in subpool from pool
-        pool = cls.pool
-        for dclk in subpool:
-            if dclk not in pool:
-                continue
-            pool.remove(dclk)
+        before_visible = [cls.get_visible_idx_for_idx(pool.index(dclk))
+                          for dclk in subpool]
 
-        # insert subpool after the next visible item
-        if nxt:
-            insert_idx = pool.index(nxt) + 1
-            cls.pool = pool[:insert_idx] + subpool + pool[insert_idx:]
+        # the next visible item after the bottommost item in subpool.
+        # nxt_idx is None if we are already at the bottom of the list.
+        nxt_idx = cls.get_idx_for_visible_idx(max(before_visible) + 1)
 
-        else:
-            cls.pool = pool + subpool
+        # insert subpool after the next visible item, which comes after every
+        # item in subpool
+        nsub = len(subpool)
+        insert_idx = (len(pool) if nxt_idx is None else nxt_idx + 1) - nsub
+        pool.move_block(subpool, insert_idx)
 
         # get visible indices after the move
-        after_visible = [cls.get_visible_idx_for_idx(cls.pool.index(dclk))
-                         for dclk in subpool if dclk in cls.pool]
+        after_visible = [cls.get_visible_idx_for_idx(pool.index(dclk))
+                         for dclk in subpool]
 
         return before_visible, after_visible
 
     @classmethod
     def duplicate_subpool(cls, subpool: list['DisplayClock']):
-        pool = cls.pool
+        copies: dict[DisplayClock, list[DisplayClock]] = dict()
         for dclk in subpool:
             new_dclk: DisplayClock = dclk.copy()
             clk_id = new_dclk.clk_id
             clk_id = clk_id or '(blank)'
             new_dclk.clk_id = clk_id + '_copy'
-            pool.insert(pool.index(dclk) + 1, new_dclk)
+            # each copy goes right below its original, the last one first
+            copies.setdefault(dclk, list()).insert(0, new_dclk)
+
+        items: list[DisplayClock | None] = list()
+        for dclk in cls.pool:
+            items.append(dclk)
+            if dclk is not None:
+                items.extend(copies.pop(dclk, ()))
+
+        cls.pool.reset(items)
@@ -1,12 +1,19 @@
 from typing import TYPE_CHECKING
+from math import floor
 
 from pyrandyos.utils.time.base_convert import (
-    et_to_tt, tt_to_tai, unix_to_utc, utc_to_tai,
+    et_to_tt, tt_to_tai, unix_to_utc, utc_to_tai, tai_to_utc,
 )
 from pyrandyos.utils.time.fmt import (
     TimeFormat, sec_as_fmt, sec_as_fmt_str, TimeFormatter,
 )
-from pyrandyos.utils.time.rate import BaseClockRate, US_DST
+from pyrandyos.utils.time.rate import (
+    BaseClockRate, US_DST, tai_to_rate as base_tai_to_rate,
+)
+from pyrandyos.utils.time.timezone import (
+    USTimeZone, TZEAS, TZCEN, TZMTN, TZPAC,
+)
+from pyrandyos.utils.time.datetime import utc_sec_to_datetime
 
 if TYPE_CHECKING:
     from .clock import Clock
@@ -15,6 +22,114 @@ _SECS = TimeFormat.S
 _TT_RATE = BaseClockRate.TT
 _TAI_RATE = BaseClockRate.TAI
 _UTC_RATE = BaseClockRate.UTC
+US_TZ = {
+    BaseClockRate.US_ET: TZEAS,
+    BaseClockRate.US_CT: TZCEN,
+    BaseClockRate.US_MT: TZMTN,
+    BaseClockRate.US_PT: TZPAC,
+}
+
+
+def is_us_dst(utc: float, tz: USTimeZone):
+    return bool(tz.dst(utc_sec_to_datetime(utc), is_utc=True))
+
+
+def utc_to_us_local(utc: float, tz: USTimeZone):
+    """
+    Like the pyrandyos conversions, which raise AmbiguousDstError during the
+    first pass of the hour repeated when DST ends.
+    """
+    offset = tz.utcoffset(utc_sec_to_datetime(utc), is_utc=True)
+    return utc + offset.total_seconds()
+
+
+def us_local_to_utc(local: float, tz: USTimeZone, fold: bool = False):
+    """
+    UTC time of US local time `local`.  Local times in the hour repeated
+    when DST ends are read in DST unless `fold`, and local times skipped
+    when DST starts are read in standard time.
+    """
+    std_utc = local - tz.std_offset.total_seconds()
+    dst_utc = std_utc - 3600
+    if is_us_dst(dst_utc, tz) and not (fold and not is_us_dst(std_utc, tz)):
+        return dst_utc
+    return std_utc
+
+
+def next_us_dst_change(utc: float, until_utc: float, tz: USTimeZone):
+    """
+    UTC time of the DST start or end after `utc` and no later than
+    `until_utc`, if any.  US changes fall on whole UTC hours and months
+    apart, so a range of up to a few days holds at most one.
+    """
+    dst = is_us_dst(utc, tz)
+    if is_us_dst(until_utc, tz) == dst:
+        return
+
+    hour = (floor(utc/3600) + 1)*3600
+    while hour < until_utc and is_us_dst(hour, tz) == dst:
+        hour += 3600
+    return hour
+
+
+def next_rate_jump_tai(tai: float, until_tai: float, rate: BaseClockRate):
+    """
+    TAI time after `tai` and no later than `until_tai` at which readings of
+    `rate` jump (a US DST start or end), if any.
+    """
+    tz = US_TZ.get(rate)
+    if tz:
+        utc = next_us_dst_change(tai_to_utc(tai), tai_to_utc(until_tai), tz)
+        if utc is not None:
+            return utc_to_tai(utc)
+
+
+def tai_to_rate(tai: float, rate: BaseClockRate):
+    "`pyrandyos.utils.time.rate.tai_to_rate` that never raises for DST"
+    tz = US_TZ.get(rate)
+    if tz:
+        return utc_to_us_local(tai_to_utc(tai), tz)
+    return base_tai_to_rate(tai, rate)
+
+
+def rate_to_tai_folded(epoch_sec: float, rate: BaseClockRate,
+                       fold: bool = False):
+    """
+    `rate_to_tai` for clock readings rather than user entered epochs: a
+    local time in the repeated hour is read as its first (DST) pass, or its
+    second if `fold`, instead of raising AmbiguousDstError.
+    """
+    tz = US_TZ.get(rate)
+    if tz:
+        return utc_to_tai(us_local_to_utc(epoch_sec, tz, fold))
+    return rate_to_tai(epoch_sec, rate)
+
+
+def rate_to_tai(epoch_sec: float, rate: BaseClockRate, fold: bool = False,
+                fold_known: bool = False):
+    "convert seconds of a base clock rate to TAI seconds"
+    if rate is _TAI_RATE:
+        return epoch_sec
+
+    if rate is BaseClockRate.T_EPH:
+        epoch_sec = et_to_tt(epoch_sec)
+        rate = _TT_RATE
+
+    if rate is _TT_RATE:
+        return tt_to_tai(epoch_sec)
+
+    if rate is BaseClockRate.UNIX:
+        epoch_sec = unix_to_utc(epoch_sec)
+        rate = _UTC_RATE
+
+    if rate in US_DST:
+        epoch_sec = US_DST[rate][0](epoch_sec, fold, fold_known)
+        rate = _UTC_RATE
+
+    if rate is _UTC_RATE:
+        return utc_to_tai(epoch_sec)
+
+    raise ValueError("unknown clock rate")
 
 
 class Epoch:
@@ -64,36 +179,13 @@ class Epoch:
         from .clock import TAI_CLOCK
         epoch_sec = self.epoch_sec
         anchor = anchor or self.clock
-        if anchor.is_abs():  # is effectively a base (may be an offset clock)
-            rate = anchor.rate
-
+        plan = anchor.plan
+        if plan.is_abs:  # is effectively a base (may be an offset clock)
             # clock is at base, convert epoch to tai
-            if rate is _TAI_RATE:
-                return Epoch(TAI_CLOCK, epoch_sec)
-
-            if rate is BaseClockRate.T_EPH:
-                epoch_sec = et_to_tt(epoch_sec)
-                rate = _TT_RATE
-
-            if rate is _TT_RATE:
-                return Epoch(TAI_CLOCK, tt_to_tai(epoch_sec))
-
-            if rate is BaseClockRate.UNIX:
-                epoch_sec = unix_to_utc(epoch_sec)
-                rate = _UTC_RATE
-
-            if rate in US_DST:
-                fold_known = self.fold_known
-                fold = self.fold
-                epoch_sec = US_DST[rate][0](epoch_sec, fold, fold_known)
-                rate = _UTC_RATE
-
-            if rate is _UTC_RATE:
-                return Epoch(TAI_CLOCK, utc_to_tai(epoch_sec))
-
-            raise ValueError("unknown clock rate")
+            return Epoch(TAI_CLOCK, rate_to_tai(epoch_sec, anchor.rate,
+                                                self.fold, self.fold_known))
 
-        return Epoch(TAI_CLOCK, epoch_sec + anchor.epoch.to_tai().epoch_sec)
+        return Epoch(TAI_CLOCK, epoch_sec + plan.epoch_tai)
 
     def plus_seconds(self, dt_sec: float):
         return Epoch(self.clock, self.epoch_sec + dt_sec, self.fold_known,
@@ -1,34 +1,83 @@
 from typing import TYPE_CHECKING
+from bisect import bisect_right
 
-from pyrandyos.gui.qt import QColor
-from pyrandyos.utils.time.fmt import TimeFormat, TimeFormatter
+from pyrandyos.utils.time.fmt import TimeFormat, TimeFormatter, sec_as_fmt_str
+from pyrandyos.utils.time.string import format_number
+from pyrandyos.utils.time.dhms import sec_to_dhms
 
 from .epoch import Epoch
+from .color import RGBColor, parse_color
 if TYPE_CHECKING:
     from .displayclocks import DisplayClock
 
-DEFAULT_COLOR = QColor('white')
-
-
-def parse_color(in_color: str | list[int | float] | QColor):
-    if in_color is None:
-        return
-    if isinstance(in_color, QColor):
-        return in_color
-    if not isinstance(in_color, str):
-        return QColor(*in_color)
-    return QColor(in_color)
+DEFAULT_COLOR = RGBColor(255, 255, 255)
+
+_DHMS = TimeFormat.DHMS
+_FIELD_FMTS = (_DHMS, TimeFormat.YMDHMS, TimeFormat.Y_DOY_HMS)
+
+
+class FormatCache:
+    """
+    Remembers the text left of the seconds field for the minute a clock was
+    last formatted in, so that while only the seconds advance just that field
+    is rendered.  Moving to any other minute (which covers hour, day, month
+    and year rollover) renders the whole string again.
+    """
+    def __init__(self):
+        self.key: tuple[TimeFormat, int] = None
+        self.minute = None
+        self.prefix: str = None
+
+    def clear(self):
+        self.key = None
+        self.minute = None
+        self.prefix = None
+
+    def sec_as_fmt_str(self, t: float, fmt: TimeFormat, digits: int = 0,
+                       zeropad: int = 0):
+        if (fmt not in _FIELD_FMTS or not isinstance(digits, int)
+                or digits < 0):
+            return sec_as_fmt_str(t, fmt, digits, zeropad)
+
+        # split off the seconds exactly the way pyrandyos does
+        if fmt is _DHMS:
+            d, h, m, s, sign = sec_to_dhms(t, digits)
+            minute = (sign, d, h, m)
+        else:
+            scalar = pow(10, digits)
+            minute, stmp = divmod(round(t*scalar) + 43200*scalar, 60*scalar)
+            s = stmp/scalar
+
+        sstr = format_number(s, digits, 2)
+        key = (fmt, digits)
+        if minute == self.minute and key == self.key:
+            return self.prefix + sstr
+
+        txt = sec_as_fmt_str(t, fmt, digits, zeropad)
+        if txt.endswith(sstr):
+            self.key = key
+            self.minute = minute
+            self.prefix = txt[:len(txt) - len(sstr)]
+        else:
+            self.clear()
+
+        return txt
 
 
 class ClockFormatter(TimeFormatter):
     def __init__(self, hidden: bool = False, time_format: TimeFormat = None,
                  digits: int = 0, zeropad: int = 0,
-                 color: str | list[int | float] | QColor = DEFAULT_COLOR,
+                 color: str | list[int | float] | RGBColor = DEFAULT_COLOR,
                  thresh_set: str = None):
         super().__init__(time_format, digits, zeropad)
         self.hidden = hidden
         self.color = parse_color(color) or DEFAULT_COLOR
         self.thresh_set = thresh_set or None
+        self.cache = FormatCache()
+
+    def sec_as_fmt_str(self, t: float):
+        return self.cache.sec_as_fmt_str(t, self.time_format, self.digits,
+                                         self.zeropad)
 
     def copy(self):
         return ClockFormatter(self.hidden,
@@ -38,12 +87,14 @@ class ClockFormatter(TimeFormatter):
                               self.color,
                               self.thresh_set)
 
-    def get_formatting(self, dclock: 'DisplayClock', tai: float):
+    def get_formatting(self, dclock: 'DisplayClock', tai: float,
+                       t: float = None):
         thresh_set = self.thresh_set
         default = self.color or DEFAULT_COLOR
         clock = dclock.clock
         if clock and thresh_set:
-            t = clock.tai_to_clock_time(tai).epoch_sec
+            if t is None:
+                t = clock.tai_to_clock_time(tai).epoch_sec
             thresh = ThresholdSet.pool[thresh_set].get_thresh_for_t(t)
             return thresh.color if thresh else default, thresh
         return default, None
@@ -51,8 +102,8 @@ class ClockFormatter(TimeFormatter):
 
 class ClockThreshold:
     def __init__(self, epoch: Epoch,
-                 color: str | list[int | float] | QColor = DEFAULT_COLOR,
-                 play_alert: bool = False):
+                 color: str | list[int | float] | RGBColor = DEFAULT_COLOR,
+                 play_alert: bool | str = False):
         self.epoch = epoch
         self.color = parse_color(color)
         self.play_alert = play_alert
@@ -62,8 +113,25 @@ class ThresholdSet:
     pool: dict[str, 'ThresholdSet'] = dict()
 
     def __init__(self, thresh_id: str, thresh_list: list[ClockThreshold]):
+        self._sorted: tuple[ClockThreshold, list[float],
+                            list[ClockThreshold]] = None
         self.thresh_id = thresh_id
         self.thresh_list = thresh_list
+        # JSON this set was parsed from, used to diff reloads
+        self.source: list[dict] = None
+
+    @property
+    def thresh_list(self):
+        return self._thresh_list
+
+    @thresh_list.setter
+    def thresh_list(self, value: list[ClockThreshold]):
+        self._thresh_list = value
+        self.invalidate()
+
+    def invalidate(self):
+        "must be called after mutating thresh_list or its thresholds in place"
+        self._sorted = None
 
     def get_sorted_indices_by_t(self) -> list[tuple[int, float]]:
         my_list = self.thresh_list
@@ -83,18 +151,36 @@ class ThresholdSet:
         out = [] if default is None else [default]
         return out + sorted(tmp, key=lambda x: x[1])
 
+    def get_sorted_thresholds(self):
+        "returns the default threshold, sorted times, and matching thresholds"
+        cache = self._sorted
+        if cache is None:
+            my_list = self.thresh_list
+            default = None
+            times: list[float] = list()
+            threshs: list[ClockThreshold] = list()
+            for i, t in self.get_sorted_indices_by_t() or ():
+                if t is None:
+                    default = my_list[i]
+                else:
+                    times.append(t)
+                    threshs.append(my_list[i])
+
+            cache = (default, times, threshs)
+            self._sorted = cache
+
+        return cache
+
     def get_thresh_for_t(self, t: float):
-        idx_list = self.get_sorted_indices_by_t()
-        if not idx_list:
-            return
-        my_list = self.thresh_list
-        thresh = None
-        for i, tcheck in idx_list or ():
-            if tcheck is None or t >= tcheck:
-                thresh = my_list[i]
-            else:
-                return thresh
-        return thresh
+        default, times, threshs = self.get_sorted_thresholds()
+        idx = bisect_right(times, t)
+        return threshs[idx - 1] if idx else default
+
+    def get_next_thresh_t(self, t: float):
+        "clock time of the first threshold after `t`, if any"
+        times = self.get_sorted_thresholds()[1]
+        idx = bisect_right(times, t)
+        return times[idx] if idx < len(times) else None
 
     def get_color_for_t(self, t: float):
         thresh = self.get_thresh_for_t(t)
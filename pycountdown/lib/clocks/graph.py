@@ -0,0 +1,203 @@
+from typing import TYPE_CHECKING, Iterable
+from collections import deque
+
+from .clock import Clock
+if TYPE_CHECKING:
+    from .displayclocks import DisplayClock
+
+
+def get_upstream_clocks(clock: Clock | None):
+    "clocks that `clock` follows or anchors its epoch/ref to"
+    if clock is None:
+        return []
+
+    epoch = clock.epoch
+    ref = clock.ref
+    return [x for x in (clock.follow,
+                        epoch.clock if epoch else None,
+                        ref.clock if ref else None)
+            if x is not None]
+
+
+def depends_on(clocks: Iterable[Clock | None], target: Clock):
+    "whether any of `clocks` is `target` or follows or counts from it"
+    stack = [x for x in clocks if x is not None]
+    seen: set[Clock] = set()
+    while stack:
+        clock = stack.pop()
+        if clock is target:
+            return True
+
+        if clock not in seen:
+            seen.add(clock)
+            stack.extend(get_upstream_clocks(clock))
+
+    return False
+
+
+def has_cycle(clock: Clock | None):
+    "whether `clock` follows or counts from itself, directly or not"
+    return clock is not None and depends_on(get_upstream_clocks(clock), clock)
+
+
+def topo_sort(deps: list[Iterable[int]]):
+    """
+    Kahn's algorithm over nodes `0..len(deps) - 1`, where `deps[i]` lists the
+    nodes that node `i` depends on.  Returns the order in which the nodes can
+    be resolved and the dependency cycles (lists of nodes) that kept the rest
+    of the nodes from being ordered.
+    """
+    n = len(deps)
+    indegree = [0]*n
+    dependents: list[list[int]] = [[] for _ in range(n)]
+    for i, node_deps in enumerate(deps):
+        for j in set(node_deps):
+            indegree[i] += 1
+            dependents[j].append(i)
+
+    queue = deque(i for i in range(n) if not indegree[i])
+    order: list[int] = list()
+    while queue:
+        i = queue.popleft()
+        order.append(i)
+        for k in dependents[i]:
+            indegree[k] -= 1
+            if not indegree[k]:
+                queue.append(k)
+
+    cycles = list()
+    if len(order) < n:
+        cycles = find_cycles(deps, [i for i in range(n) if indegree[i]])
+
+    return order, cycles
+
+
+def find_cycles(deps: list[Iterable[int]], nodes: Iterable[int]):
+    "strongly connected components among `nodes` that form a cycle (Tarjan)"
+    nodes = set(nodes)
+    index: dict[int, int] = dict()
+    low: dict[int, int] = dict()
+    stack: list[int] = list()
+    on_stack: set[int] = set()
+    cycles: list[list[int]] = list()
+    for root in sorted(nodes):
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(deps[root]))]
+        while work:
+            v, children = work[-1]
+            for w in children:
+                if w not in nodes:
+                    continue
+
+                if w not in index:
+                    index[w] = low[w] = len(index)
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(deps[w])))
+                    break
+
+                if w in on_stack:
+                    low[v] = min(low[v], index[w])
+
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    low[u] = min(low[u], low[v])
+
+                if low[v] == index[v]:
+                    scc: list[int] = list()
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        scc.append(w)
+                        if w == v:
+                            break
+
+                    if len(scc) > 1 or v in deps[v]:
+                        cycles.append(sorted(scc))
+
+    return cycles
+
+
+class ClockGraph:
+    """
+    Dependency graph of the DisplayClock pool.  Edges run from each display
+    clock to the display clocks it follows or anchors its epoch/ref to, so an
+    edit only needs to touch the clocks downstream of it.
+    """
+    def __init__(self):
+        self.owners: dict[Clock, 'DisplayClock'] = dict()
+        self.clocks: dict['DisplayClock', Clock] = dict()
+        self.upstream: dict['DisplayClock', set['DisplayClock']] = dict()
+        self.downstream: dict['DisplayClock', set['DisplayClock']] = dict()
+
+    def rebuild(self, pool: Iterable['DisplayClock']):
+        pool = [x for x in pool if x]
+        self.owners = {x.clock: x for x in pool if x.clock}
+        self.clocks = {x: x.clock for x in pool if x.clock}
+        self.upstream = dict()
+        self.downstream = dict()
+        for dclk in pool:
+            self._link(dclk)
+
+    def _link(self, dclk: 'DisplayClock'):
+        owners = self.owners
+        upstream = {owners[x] for x in get_upstream_clocks(dclk.clock)
+                    if x in owners}
+        upstream.discard(dclk)
+        self.upstream[dclk] = upstream
+        downstream = self.downstream
+        downstream.setdefault(dclk, set())
+        for up in upstream:
+            downstream.setdefault(up, set()).add(dclk)
+
+    def _unlink(self, dclk: 'DisplayClock'):
+        downstream = self.downstream
+        for up in self.upstream.pop(dclk, ()):
+            downstream.get(up, set()).discard(dclk)
+
+    def update(self, dclk: 'DisplayClock'):
+        "re-read the edges of a display clock that was added or edited"
+        owners = self.owners
+        old_clock = self.clocks.pop(dclk, None)
+        if old_clock is not None and owners.get(old_clock) is dclk:
+            del owners[old_clock]
+
+        clock = dclk.clock
+        if clock is not None:
+            owners[clock] = dclk
+            self.clocks[dclk] = clock
+
+        self._unlink(dclk)
+        self._link(dclk)
+
+    def remove(self, dclk: 'DisplayClock'):
+        clock = self.clocks.pop(dclk, None)
+        if clock is not None and self.owners.get(clock) is dclk:
+            del self.owners[clock]
+
+        self._unlink(dclk)
+        upstream = self.upstream
+        for down in self.downstream.pop(dclk, ()):
+            upstream.get(down, set()).discard(dclk)
+
+    def get_affected(self, dclks: Iterable['DisplayClock']):
+        "the given display clocks plus everything downstream of them"
+        downstream = self.downstream
+        stack = [x for x in dclks if x]
+        affected: set['DisplayClock'] = set()
+        while stack:
+            dclk = stack.pop()
+            if dclk in affected:
+                continue
+
+            affected.add(dclk)
+            stack.extend(downstream.get(dclk, ()))
+
+        return affected
@@ -1,7 +1,5 @@
 from pyrandyos.utils.json import parse_jsonc
-from pyrandyos.utils.casesafe import (
-    casesafe_dict_get, casesafe_value_in_container, casesafe_is_equal,
-)
+from pyrandyos.utils.casesafe import casesafe_value
 from pyrandyos.utils.time.gregorian import ymdhms_to_sec
 from pyrandyos.utils.time.dhms import dhms_to_sec
 from pyrandyos.utils.time.rate import BaseClockRate
@@ -9,11 +7,14 @@ from pyrandyos.utils.time.fmt import TimeFormat, parse_time_format
 from pyrandyos.utils.time.julian import DAY2SEC
 
 from ...logging import log_error
+from ..tones.constants import BASELINE_VOLUME
+from ..tones.seq import AlertSequence, NoteType
 
 from .clock import Clock, DEFAULT_CLOCKS
 from .displayclocks import DisplayClock
 from .epoch import Epoch
 from .fmt import ClockFormatter, ThresholdSet, ClockThreshold
+from .graph import topo_sort
 from .y_doy_hms import y_doy_hms_to_sec
 
 
@@ -27,6 +28,8 @@ TO_SEC = {
 }
 CLOCK_NOT_FOUND = object()
 CLOCK_UNRESOLVED = object()
+DEFAULT_CLOCK_LOOKUP = {casesafe_value(k, True): v
+                        for k, v in DEFAULT_CLOCKS.items()}
 
 
 def clock_has_problems(clock: Clock | None):
@@ -44,44 +47,72 @@ def handle_clock_problems(clock: Clock | None, json: str):
     return clock_has_problems(clock)
 
 
-def get_clock_by_id(clk_id: str, pool: list[DisplayClock],
-                    id2idx: dict[str, int], label_list: list[str] = None):
+def get_ref_idx(clk_id: str, row_idx: int, lookup: dict[str, int]):
+    "index of the clock row that a reference from row `row_idx` points at"
     if clk_id is None:
         return
 
-    idx = casesafe_dict_get(id2idx, clk_id, None, True)
-    if (idx is None and label_list
-            and casesafe_value_in_container(label_list, clk_id, True)):
-        for i, x in enumerate(label_list):
-            if casesafe_is_equal(x, clk_id, True):
-                idx = i
-                break
+    key = casesafe_value(clk_id, True)
+    idx = lookup.get(key)
+    if idx is not None and idx >= row_idx and key in DEFAULT_CLOCK_LOOKUP:
+        # names shared with a default clock only refer to the clock row if it
+        # is declared earlier in the file; otherwise it is the default clock
+        return
+
+    return idx
+
+
+def get_clock_by_id(clk_id: str, pool: list[DisplayClock], idx: int = None):
+    if clk_id is None:
+        return
 
     if idx is not None:
         dclk = pool[idx]
         if dclk:
             return dclk.clock
 
-    clock = casesafe_dict_get(DEFAULT_CLOCKS, clk_id, CLOCK_NOT_FOUND, True)
+    clock = DEFAULT_CLOCK_LOOKUP.get(casesafe_value(clk_id, True),
+                                     CLOCK_NOT_FOUND)
     if clock is CLOCK_NOT_FOUND and idx is not None:
         return CLOCK_UNRESOLVED
     return clock
 
 
 def extract_clock_ids(data: list[dict]):
+    "returns label_list, id_list, and a case-insensitive id/label lookup"
     label_list: list[str] = list()
     id_list: list[str] = list()
-    id2idx: dict[str, int] = dict()
+    lookup: dict[str, int] = dict()
     for i, row in enumerate(data):
         # blank = row.get('blank')
         label = row.get('label')
         clk_id = row.get('id', label)
         label_list.append(label)
         id_list.append(clk_id)
+        if label:
+            # the first clock with a given label wins
+            lookup.setdefault(casesafe_value(label, True), i)
+
+    for i, clk_id in enumerate(id_list):
         if clk_id:
-            id2idx[clk_id] = i
+            # IDs take precedence over labels
+            lookup[casesafe_value(clk_id, True)] = i
 
-    return label_list, id_list, id2idx
+    return label_list, id_list, lookup
+
+
+def extract_clock_refs(row: dict):
+    "IDs of the clocks a clock row follows or anchors its epoch/ref to"
+    if row.get('blank'):
+        return []
+
+    refs = [row.get('follow')]
+    for key in ('epoch', 'ref'):
+        json_epoch: dict = row.get(key)
+        if json_epoch:
+            refs.append(json_epoch.get('clock'))
+
+    return [x for x in refs if x is not None]
 
 
 def parse_rate(input_rate: str, follow: Clock = None):
@@ -164,7 +195,7 @@ def parse_epoch_time(t: JsonEpochTimeType,
 
 
 def parse_epoch(data: dict, pool: list[DisplayClock] = None,
-                id2idx: dict[str, int] = None, label_list: list[str] = None,
+                lookup: dict[str, int] = None, row_idx: int = None,
                 skip_clock: bool = False):
     if data is None:
         return
@@ -174,7 +205,8 @@ def parse_epoch(data: dict, pool: list[DisplayClock] = None,
 
     else:
         clockname: str = data.get('clock')  # or data.get('anchor')
-        clock = get_clock_by_id(clockname, pool, id2idx, label_list)
+        clock = get_clock_by_id(clockname, pool,
+                                get_ref_idx(clockname, row_idx, lookup))
         if clock_has_problems(clock):
             return clock
 
@@ -202,95 +234,155 @@ def parse_threshold(data: dict):
                           data.get('color'), data.get('play_alert', False))
 
 
+def parse_thresh_set(thresh_id: str, data: list[dict]):
+    tset = ThresholdSet(thresh_id, [parse_threshold(x) for x in data])
+    tset.source = data
+    return tset
+
+
 def parse_thresh_sets(data: dict[str, dict]):
     if data:
-        return {k: ThresholdSet(k, [parse_threshold(x) for x in v])
-                for k, v in data.items()}
+        return {k: parse_thresh_set(k, v) for k, v in data.items()}
 
 
-def parse_clocks_jsonc(data: str | dict):
-    "returns dclk_to_add, thresh_sets"
-    if isinstance(data, str):
-        data: dict = parse_jsonc(data)
+def parse_alert_note(seq_id: str, data: dict | list) -> NoteType:
+    "note as `{freq_hz, dur_s, volume}` or `[freq_hz, dur_s, volume]`"
+    if isinstance(data, dict):
+        data = [data['freq_hz'], data['dur_s'],
+                data.get('volume', BASELINE_VOLUME)]
 
-    from ...app import PyCountdownApp, CLOCKS_SCHEMA_KEY
-    PyCountdownApp.set(CLOCKS_SCHEMA_KEY, data.get('$schema'))
-    thresh_sets = parse_thresh_sets(data.get('threshold_sets'))
+    freq_hz = data[0]
+    if isinstance(freq_hz, list):
+        if not freq_hz:
+            raise ValueError(f"Empty chord in alert sequence {seq_id!r}")
+        freq_hz = tuple(float(x) for x in freq_hz)
 
-    clocks: list[dict] = data['clocks']
+    volume = data[2] if len(data) > 2 else BASELINE_VOLUME
+    return freq_hz, float(data[1]), float(volume)
 
-    # first get names and IDs of all clocks
-    label_list, id_list, id2idx = extract_clock_ids(clocks)
-    ids_to_resolve = list(enumerate(id_list))
-    last_to_resolve = None
-    dclk_to_add: list[DisplayClock] = [None]*len(clocks)
 
-    while ids_to_resolve:
-        if last_to_resolve == ids_to_resolve:
-            log_error(f"Unresolved clocks: {ids_to_resolve}")
-            break
+def parse_alert_seq(seq_id: str, data: list):
+    return AlertSequence(seq_id, [parse_alert_note(seq_id, x) for x in data])
 
-        last_to_resolve = ids_to_resolve.copy()
-        for resolve_tmp in ids_to_resolve.copy():
-            i, clk_id = resolve_tmp
-            row = clocks[i]
-            blank = row.get('blank')
-            label = label_list[i]
-            display_fmt = parse_display(row.get('display')) or ClockFormatter()
-            if blank:
-                ids_to_resolve.remove(resolve_tmp)
-                # if clk_id:
-                dclk_to_add[i] = DisplayClock(clk_id, label, None, display_fmt)
 
-                continue
+def parse_alert_seqs(data: dict[str, list]):
+    """
+    Sequences that fail to parse are logged and left out, so that their
+    thresholds play the default alert instead.
+    """
+    if not data:
+        return
 
-            json_follow = row.get('follow')
-            follow = get_clock_by_id(json_follow, dclk_to_add, id2idx,
-                                     label_list)
-            if handle_clock_problems(follow, json_follow):
-                continue
+    seqs: dict[str, AlertSequence] = dict()
+    for k, v in data.items():
+        try:
+            seqs[k] = parse_alert_seq(k, v)
+        except ValueError as e:
+            log_error(str(e))
 
-            rate = parse_rate(row.get('rate'), follow)
+    return seqs
 
-            json_epoch: dict = row.get('epoch')
-            epoch = parse_epoch(json_epoch, dclk_to_add, id2idx,
-                                label_list)
-            if handle_clock_problems(epoch,
-                                     json_epoch.get('clock') if json_epoch
-                                     else None):
-                continue
 
-            json_ref: dict = row.get('ref')
-            ref = parse_epoch(json_ref, dclk_to_add, id2idx, label_list)
-            if handle_clock_problems(ref,
-                                     json_ref.get('clock') if json_ref
-                                     else None):
-                continue
+def parse_clock(row: dict, label: str, clk_id: str, row_idx: int,
+                pool: list[DisplayClock], lookup: dict[str, int]):
+    "returns None if the clock references cannot be resolved"
+    display_fmt = parse_display(row.get('display')) or ClockFormatter()
+    if row.get('blank'):
+        return DisplayClock(clk_id, label, None, display_fmt)
 
-            # future work
-            offset_sec = None
-            _abs = False
+    json_follow = row.get('follow')
+    follow = get_clock_by_id(json_follow, pool,
+                             get_ref_idx(json_follow, row_idx, lookup))
+    if handle_clock_problems(follow, json_follow):
+        return
 
-            clock = Clock(epoch, ref, follow, rate, offset_sec, _abs)
+    rate = parse_rate(row.get('rate'), follow)
 
-            dclk_to_add[i] = DisplayClock(clk_id, label, clock, display_fmt)
+    json_epoch: dict = row.get('epoch')
+    epoch = parse_epoch(json_epoch, pool, lookup, row_idx)
+    if handle_clock_problems(epoch,
+                             json_epoch.get('clock') if json_epoch else None):
+        return
 
-            ids_to_resolve.remove(resolve_tmp)
+    json_ref: dict = row.get('ref')
+    ref = parse_epoch(json_ref, pool, lookup, row_idx)
+    if handle_clock_problems(ref, json_ref.get('clock') if json_ref else None):
+        return
 
-    return dclk_to_add, thresh_sets
+    # future work
+    offset_sec = None
+    _abs = False
+
+    clock = Clock(epoch, ref, follow, rate, offset_sec, _abs)
+    return DisplayClock(clk_id, label, clock, display_fmt)
+
+
+def parse_clocks_jsonc(data: str | dict):
+    "returns dclk_to_add, thresh_sets, alert_seqs"
+    if isinstance(data, str):
+        data: dict = parse_jsonc(data)
+
+    from ...app import PyCountdownApp, CLOCKS_SCHEMA_KEY
+    PyCountdownApp.set(CLOCKS_SCHEMA_KEY, data.get('$schema'))
+    thresh_sets = parse_thresh_sets(data.get('threshold_sets'))
+    alert_seqs = parse_alert_seqs(data.get('alert_sequences'))
+
+    clocks: list[dict] = data['clocks']
+
+    # first get names and IDs of all clocks and the references between them,
+    # then resolve each clock once, after everything it references
+    label_list, id_list, lookup = extract_clock_ids(clocks)
+    deps = [[j for j in (get_ref_idx(x, i, lookup)
+                         for x in extract_clock_refs(row))
+             if j is not None]
+            for i, row in enumerate(clocks)]
+    order, cycles = topo_sort(deps)
+    for cycle in cycles:
+        log_error("Circular clock references between: "
+                  + ', '.join(repr(id_list[i]) for i in cycle))
+
+    dclk_to_add: list[DisplayClock] = [None]*len(clocks)
+    for i in order:
+        row = clocks[i]
+        dclk = parse_clock(row, label_list[i], id_list[i], i, dclk_to_add,
+                           lookup)
+        if dclk:
+            dclk.source = row
+        dclk_to_add[i] = dclk
+
+    unresolved = [(i, x) for i, x in enumerate(id_list)
+                  if dclk_to_add[i] is None]
+    if unresolved:
+        log_error(f"Unresolved clocks: {unresolved}")
+
+    return dclk_to_add, thresh_sets, alert_seqs
 
 
 def export_clocks_jsonc(dclks: list[DisplayClock],
-                        thresh_sets: dict[str, ThresholdSet]):
+                        thresh_sets: dict[str, ThresholdSet],
+                        alert_seqs: dict[str, AlertSequence] = None):
     from ...app import PyCountdownApp, SCHEMA_KEY, CLOCKS_SCHEMA_KEY
     thresh_items = thresh_sets.items() if thresh_sets else ()
     local_schema = PyCountdownApp.get(f'local.{SCHEMA_KEY}')
-    return {
+    out = {
         "$schema": PyCountdownApp.get(CLOCKS_SCHEMA_KEY, local_schema),
         'threshold_sets': {k: export_threshold_set(v)
                            for k, v in thresh_items},
         'clocks': [export_clock(x) for x in dclks]
     }
+    if alert_seqs:
+        out['alert_sequences'] = {k: export_alert_seq(v)
+                                  for k, v in alert_seqs.items()}
+
+    return out
+
+
+def export_alert_seq(seq: AlertSequence):
+    return [{
+        'freq_hz': list(freq_hz) if isinstance(freq_hz, tuple) else freq_hz,
+        'dur_s': dur_s,
+        'volume': volume,
+    } for freq_hz, dur_s, volume in seq.notes]
 
 
 def export_threshold_set(thrset: ThresholdSet):
@@ -298,7 +390,8 @@ def export_threshold_set(thrset: ThresholdSet):
 
 
 def export_threshold(x: ClockThreshold):
-    out = {'color': x.color.name(), 'play_alert': x.play_alert}
+    out = {'color': x.color.name() if x.color else None,
+           'play_alert': x.play_alert}
     epoch = x.epoch
     if epoch:
         out['epoch'] = export_epoch(epoch)
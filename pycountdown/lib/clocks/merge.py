@@ -0,0 +1,189 @@
+from pyrandyos.utils.casesafe import casesafe_value
+
+from .clock import Clock
+from .epoch import Epoch
+from .displayclocks import DisplayClock
+from .fmt import ThresholdSet
+
+
+class PoolMerge:
+    """
+    Result of merging a freshly parsed clocks file into the live pools.
+    `changed` holds the live display clocks that were added or modified,
+    and `relayout` is set if rows were added, removed, reordered or
+    shown/hidden.
+    """
+    def __init__(self, pool: list[DisplayClock],
+                 thresh_sets: dict[str, ThresholdSet],
+                 changed: set[DisplayClock], relayout: bool):
+        self.pool = pool
+        self.thresh_sets = thresh_sets
+        self.changed = changed
+        self.relayout = relayout
+
+
+def get_merge_key(dclk: DisplayClock):
+    return casesafe_value(dclk.clk_id, True) if dclk.clk_id else None
+
+
+def match_clocks(old_pool: list[DisplayClock],
+                 new_pool: list[DisplayClock]):
+    "pairs new display clocks with live ones by ID, in order of appearance"
+    old_by_key: dict[str, list[DisplayClock]] = dict()
+    for dclk in old_pool:
+        if dclk:
+            old_by_key.setdefault(get_merge_key(dclk), list()).append(dclk)
+
+    matches: dict[DisplayClock, DisplayClock] = dict()
+    for dclk in new_pool:
+        if dclk:
+            candidates = old_by_key.get(get_merge_key(dclk))
+            if candidates:
+                matches[dclk] = candidates.pop(0)
+
+    return matches
+
+
+def remap_epoch(epoch: Epoch | None, clock_map: dict[Clock, Clock]):
+    "`epoch`, or a copy of it that counts from the live clock it references"
+    if epoch and epoch.clock in clock_map:
+        epoch = epoch.copy()
+        epoch.clock = clock_map[epoch.clock]
+    return epoch
+
+
+def remap_clock_refs(clock: Clock, clock_map: dict[Clock, Clock]):
+    "point a newly parsed clock at the live clocks it references"
+    follow = clock.follow
+    if follow in clock_map:
+        clock.follow = clock_map[follow]
+
+    # the setters recompile the clock
+    clock.epoch = remap_epoch(clock.epoch, clock_map)
+    clock.ref = remap_epoch(clock.ref, clock_map)
+
+
+def get_upstream(clock: Clock | None, clock_map: dict[Clock, Clock] = None):
+    if not clock:
+        return
+
+    epoch = clock.epoch
+    ref = clock.ref
+    upstream = (clock.follow, epoch.clock if epoch else None,
+                ref.clock if ref else None)
+    if clock_map:
+        upstream = tuple(clock_map.get(x, x) for x in upstream)
+    return upstream
+
+
+def is_same_clock(old: DisplayClock, new: DisplayClock,
+                  clock_map: dict[Clock, Clock]):
+    if old.source is None or old.source != new.source:
+        return False
+
+    old_up = get_upstream(old.clock)
+    new_up = get_upstream(new.clock, clock_map)
+    if old_up is None or new_up is None:
+        return old_up is new_up
+
+    return all(a is b for a, b in zip(old_up, new_up))
+
+
+def patch_clock(old: DisplayClock, new: DisplayClock,
+                clock_map: dict[Clock, Clock]):
+    "update a live display clock in place from its newly parsed version"
+    old.clk_id = new.clk_id
+    old.label = new.label
+    old.formatter = new.formatter
+    old.source = new.source
+
+    clock = old.clock
+    new_clock = new.clock
+    if clock and new_clock:
+        # these have no setters, so the plan is dropped explicitly
+        clock._abs = new_clock._abs
+        clock._offset_sec = new_clock._offset_sec
+        clock.invalidate()
+        clock.epoch = remap_epoch(new_clock.epoch, clock_map)
+        clock.ref = remap_epoch(new_clock.ref, clock_map)
+        clock.follow = clock_map.get(new_clock.follow, new_clock.follow)
+        clock.rate = new_clock.rate
+
+    else:
+        if new_clock:
+            remap_clock_refs(new_clock, clock_map)
+        old.clock = new_clock
+
+
+def merge_thresh_sets(old_sets: dict[str, ThresholdSet] | None,
+                      new_sets: dict[str, ThresholdSet] | None):
+    "returns the merged threshold sets and the names of those that changed"
+    old_sets = old_sets or dict()
+    new_sets = new_sets or dict()
+    merged: dict[str, ThresholdSet] = dict()
+    changed: set[str] = set(old_sets).difference(new_sets)
+    for name, tset in new_sets.items():
+        live = old_sets.get(name)
+        if live is None:
+            merged[name] = tset
+            changed.add(name)
+            continue
+
+        if live.source is None or live.source != tset.source:
+            live.thresh_list = tset.thresh_list
+            live.source = tset.source
+            changed.add(name)
+
+        merged[name] = live
+
+    return merged, changed
+
+
+def merge_clock_pools(old_pool: list[DisplayClock],
+                      new_pool: list[DisplayClock],
+                      old_sets: dict[str, ThresholdSet] | None,
+                      new_sets: dict[str, ThresholdSet] | None):
+    """
+    Merge a freshly parsed pool into the live one by clock ID.  Unchanged
+    display clocks are kept as they are, changed ones are patched in place,
+    and references are remapped to the live clocks, so that display clock
+    and clock objects (and anything keyed on them) survive the reload.
+    """
+    thresh_sets, changed_sets = merge_thresh_sets(old_sets, new_sets)
+    matches = match_clocks(old_pool, new_pool)
+    clock_map: dict[Clock, Clock] = {new.clock: old.clock
+                                     for new, old in matches.items()
+                                     if new.clock and old.clock}
+
+    pool: list[DisplayClock] = list()
+    changed: set[DisplayClock] = set()
+    relayout = len(old_pool) != len(new_pool)
+    for i, new in enumerate(new_pool):
+        old_row = old_pool[i] if i < len(old_pool) else None
+        if new is None:
+            # unresolved row
+            relayout |= old_row is not None
+            pool.append(new)
+            continue
+
+        old = matches.get(new)
+        if old is None:
+            if new.clock:
+                remap_clock_refs(new.clock, clock_map)
+            changed.add(new)
+            pool.append(new)
+            relayout = True
+            continue
+
+        if not is_same_clock(old, new, clock_map):
+            relayout |= old.hidden != new.hidden
+            patch_clock(old, new, clock_map)
+            changed.add(old)
+
+        elif old.formatter.thresh_set in changed_sets:
+            changed.add(old)
+
+        relayout |= old_row is not old
+        pool.append(old)
+
+    return PoolMerge(pool, thresh_sets, changed, relayout)
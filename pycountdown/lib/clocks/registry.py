@@ -0,0 +1,349 @@
+from typing import TYPE_CHECKING, Iterable
+from collections.abc import MutableSequence
+
+from pyrandyos.utils.casesafe import casesafe_value
+
+from .clock import Clock
+if TYPE_CHECKING:
+    from .displayclocks import DisplayClock
+
+
+def get_id_key(clk_id: str | None):
+    return casesafe_value(clk_id, True)
+
+
+def is_shown(dclk: 'DisplayClock | None'):
+    "blank/unresolved rows are always shown"
+    return dclk is None or not dclk.hidden
+
+
+class FenwickTree:
+    "prefix sums of a list of counts with O(log n) updates and searches"
+    def __init__(self, counts: Iterable[int] = ()):
+        tree = [0] + list(counts)
+        n = len(tree)
+        for i in range(1, n):
+            j = i + (i & -i)
+            if j < n:
+                tree[j] += tree[i]
+
+        self.tree = tree
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def add(self, idx: int, delta: int):
+        tree = self.tree
+        i = idx + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, n: int):
+        "sum of the first `n` counts"
+        tree = self.tree
+        total = 0
+        i = min(n, len(tree) - 1)
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def total(self):
+        return self.prefix_sum(len(self))
+
+    def append(self, count: int):
+        tree = self.tree
+        i = len(tree)
+        # node i sums the counts after index i - lowbit(i) up to its own
+        tree.append(count + self.prefix_sum(i - 1)
+                    - self.prefix_sum(i - (i & -i)))
+
+    def pop(self):
+        "drop the last count; no other node covers it"
+        self.tree.pop()
+
+    def find(self, k: int):
+        "smallest index whose prefix sum through it exceeds `k` (counts >= 0)"
+        tree = self.tree
+        n = len(tree) - 1
+        pos = 0
+        step = 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= k:
+                pos = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return pos if pos < n else None
+
+
+class ClockRegistry(MutableSequence):
+    """
+    The ordered DisplayClock pool, with hash lookups by clock ID (case
+    insensitive), by clock object and by position, and a Fenwick tree of the
+    shown rows to map between pool indices and table rows.
+
+    The indexes are kept up to date as the pool changes:
+    - Appending or removing the last row costs O(log n).
+    - A block move only touches the rows between the old and new places
+      of the block, O(k log n) for k such rows.
+    - Inserting or removing a row elsewhere shifts the positions after it
+      and rebuilds the tree, O(n) like the list operation itself.
+    - Replacing the whole pool (set_pool, duplicate) or assigning rows
+      reindexes everything once, on the next lookup.
+    A display clock edited in place must be passed to `update` so that its
+    ID, clock and hidden flag are re-read.
+
+    A pool holding the same display clock, clock ID or clock object twice
+    is reindexed on every change instead, so that the first of them keeps
+    winning lookups.
+    """
+    def __init__(self, dclks: Iterable['DisplayClock | None'] = ()):
+        self.items: list['DisplayClock | None'] = list(dclks)
+        self.dirty = True
+        self.unique = True
+        self.positions: dict['DisplayClock', int] = dict()
+        self.ids: dict[str, 'DisplayClock'] = dict()
+        self.clock_owners: dict[Clock, 'DisplayClock'] = dict()
+        # (ID key, clock) of every display clock as of the last indexing
+        self.indexed: dict['DisplayClock', tuple[str | None, Clock]] = dict()
+        self.shown_flags: list[bool] = list()
+        self.shown = FenwickTree()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.items!r})'
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, idx: int | slice):
+        return self.items[idx]
+
+    def __setitem__(self, idx: int | slice, value):
+        self.items[idx] = value
+        self.dirty = True
+
+    def __delitem__(self, idx: int | slice):
+        items = self.items
+        if isinstance(idx, slice) or not self.is_indexed():
+            del items[idx]
+            self.dirty = True
+            return
+
+        n = len(items)
+        dclk = items[idx]
+        if idx < 0:
+            idx += n
+        del items[idx]
+        self.unindex_dclk(dclk)
+        del self.shown_flags[idx]
+        if idx == n - 1:
+            self.shown.pop()
+        else:
+            self.shift_positions(idx)
+            self.rebuild_shown()
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, dclk: 'DisplayClock | None'):
+        if dclk is None:
+            return None in self.items
+        return dclk in self.get_positions()
+
+    def insert(self, idx: int, dclk: 'DisplayClock | None'):
+        items = self.items
+        n = len(items)
+        idx = max(min(idx + n if idx < 0 else idx, n), 0)
+        items.insert(idx, dclk)
+        if not self.is_indexed() or not self.index_dclk(dclk, idx):
+            self.dirty = True
+            return
+
+        shown = is_shown(dclk)
+        self.shown_flags.insert(idx, shown)
+        if idx == n:
+            self.shown.append(int(shown))
+        else:
+            self.shift_positions(idx + 1)
+            self.rebuild_shown()
+
+    def index(self, dclk: 'DisplayClock | None', start: int = 0,
+              stop: int = None):
+        if dclk is None or start or stop is not None:
+            return self.items.index(dclk, start,
+                                    len(self.items) if stop is None else stop)
+
+        idx = self.get_positions().get(dclk)
+        if idx is None:
+            raise ValueError(f'{dclk!r} is not in the pool')
+        return idx
+
+    def move_block(self, dclks: list['DisplayClock | None'], idx: int):
+        """
+        Move `dclks` next to each other, in the given order, so that the block
+        starts at `idx` of the pool as it is without them.  Only the rows
+        from the first of the old and new places to the last are touched.
+        """
+        moving = {self.index(x) for x in dclks}
+        if not moving:
+            return
+
+        items = self.items
+        lo = min(min(moving), idx)
+        hi = max(max(moving) + 1, idx + len(dclks))
+        window = [x for i, x in enumerate(items[lo:hi], lo)
+                  if i not in moving]
+        window[idx - lo:idx - lo] = dclks
+        items[lo:hi] = window
+        if not self.is_indexed():
+            self.dirty = True
+            return
+
+        positions = self.positions
+        flags = self.shown_flags
+        tree = self.shown
+        for i, dclk in enumerate(window, lo):
+            if dclk is not None:
+                positions[dclk] = i
+            shown = is_shown(dclk)
+            if shown != flags[i]:
+                flags[i] = shown
+                tree.add(i, 1 if shown else -1)
+
+    def reset(self, dclks: Iterable['DisplayClock | None']):
+        self.items = list(dclks)
+        self.dirty = True
+
+    def is_indexed(self):
+        "whether the indexes are current and can be updated in place"
+        return not self.dirty and self.unique
+
+    def index_dclk(self, dclk: 'DisplayClock | None', idx: int):
+        "add a display clock at `idx`; False if it collides with another"
+        if dclk is None:
+            return True
+
+        key = get_id_key(dclk.clk_id)
+        clock = dclk.clock
+        if (dclk in self.positions or key in self.ids
+                or clock in self.clock_owners):
+            self.unique = False
+            return False
+
+        self.positions[dclk] = idx
+        self.indexed[dclk] = (key, clock)
+        if key is not None:
+            self.ids[key] = dclk
+        if clock is not None:
+            self.clock_owners[clock] = dclk
+        return True
+
+    def unindex_dclk(self, dclk: 'DisplayClock | None'):
+        if dclk is None:
+            return
+
+        del self.positions[dclk]
+        key, clock = self.indexed.pop(dclk)
+        if key is not None:
+            del self.ids[key]
+        if clock is not None:
+            del self.clock_owners[clock]
+
+    def shift_positions(self, start: int):
+        "re-read the positions from `start` on, after rows were shifted"
+        positions = self.positions
+        for i, dclk in enumerate(self.items[start:], start):
+            if dclk is not None:
+                positions[dclk] = i
+
+    def rebuild_shown(self):
+        self.shown = FenwickTree(map(int, self.shown_flags))
+
+    def rebuild(self):
+        self.positions = dict()
+        self.ids = dict()
+        self.clock_owners = dict()
+        self.indexed = dict()
+        self.unique = True
+        items = self.items
+        positions = self.positions
+        ids = self.ids
+        clock_owners = self.clock_owners
+        for i, dclk in enumerate(items):
+            if dclk is None or self.index_dclk(dclk, i):
+                continue
+
+            # the first of any duplicates wins, like a scan would
+            positions.setdefault(dclk, i)
+            key = get_id_key(dclk.clk_id)
+            clock = dclk.clock
+            self.indexed.setdefault(dclk, (key, clock))
+            if key is not None:
+                ids.setdefault(key, dclk)
+            if clock is not None:
+                clock_owners.setdefault(clock, dclk)
+
+        self.shown_flags = [is_shown(x) for x in items]
+        self.rebuild_shown()
+        self.dirty = False
+
+    def get_positions(self):
+        if self.dirty:
+            self.rebuild()
+        return self.positions
+
+    def update(self, dclk: 'DisplayClock'):
+        "re-read a display clock that was edited in place"
+        if self.dirty:
+            return
+
+        idx = self.positions.get(dclk)
+        if idx is None:
+            return
+
+        key, clock = self.indexed[dclk]
+        if key != get_id_key(dclk.clk_id) or clock is not dclk.clock:
+            # its ID or clock changed; reindex on the next lookup
+            self.dirty = True
+            return
+
+        shown = is_shown(dclk)
+        if shown != self.shown_flags[idx]:
+            self.shown_flags[idx] = shown
+            self.shown.add(idx, 1 if shown else -1)
+
+    def get_dclk_for_id(self, clk_id: str):
+        if clk_id is None:
+            return
+
+        self.get_positions()
+        return self.ids.get(get_id_key(clk_id))
+
+    def get_dclk_for_clock(self, clk: Clock):
+        self.get_positions()
+        dclk = self.clock_owners.get(clk)
+        if dclk is not None and dclk.clock is clk:
+            return dclk
+
+    def get_row_for_idx(self, idx: int, show_hidden: bool = False):
+        "table row of pool index `idx`, or None if it is not shown"
+        if not 0 <= idx < len(self.items):
+            return
+        if show_hidden:
+            return idx
+
+        self.get_positions()
+        if self.shown_flags[idx]:
+            return self.shown.prefix_sum(idx)
+
+    def get_idx_for_row(self, row: int, show_hidden: bool = False):
+        "pool index shown at table row `row`, or None past the last row"
+        if not 0 <= row < len(self.items):
+            return
+        if show_hidden:
+            return row
+
+        self.get_positions()
+        return self.shown.find(row)
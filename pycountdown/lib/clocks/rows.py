@@ -0,0 +1,56 @@
+from .displayclocks import DisplayClock
+from .fmt import ClockThreshold, ThresholdSet
+from .batch import ClockBatch
+
+RowType = dict[str, str | dict | None]
+
+
+def get_thresh_info(dclk: DisplayClock, thresh: ClockThreshold | None):
+    "JSON description of the active threshold of `dclk`, if any"
+    if thresh is None:
+        return
+
+    set_id = dclk.formatter.thresh_set
+    tset = ThresholdSet.pool.get(set_id)
+    thresh_list = tset.thresh_list if tset else ()
+    return {
+        'set': set_id,
+        'index': thresh_list.index(thresh) if thresh in thresh_list else None,
+        'alert': thresh.play_alert,
+    }
+
+
+def render_row(dclk: DisplayClock | None, now_tai: float,
+               t: float = None) -> RowType:
+    """
+    JSON-ready state of a display clock row: its formatted time, color and
+    active threshold.  `t` is the clock time if it was already evaluated.
+    """
+    if not dclk:
+        return {'id': None, 'label': '', 'text': '', 'color': None,
+                'thresh': None}
+
+    txt = ''
+    color = None
+    thresh = None
+    clock = dclk.clock
+    if clock:
+        if t is None:
+            t = clock.plan.evaluate(now_tai)
+
+        txt = dclk.display_sec(t)
+        color, thresh = dclk.formatter.get_formatting(dclk, now_tai, t)
+
+    return {
+        'id': dclk.clk_id,
+        'label': dclk.label or '',
+        'text': txt,
+        'color': color.name() if color else None,
+        'thresh': get_thresh_info(dclk, thresh),
+    }
+
+
+def render_rows(batch: ClockBatch, now_tai: float):
+    "rendered state of every row of `batch` from a single instant"
+    return [render_row(dclk, now_tai, t)
+            for dclk, t in zip(batch.dclks, batch.evaluate(now_tai))]
@@ -0,0 +1,113 @@
+from typing import Iterable
+from bisect import bisect_right
+from heapq import heappush, heappop
+from itertools import count
+
+from ...logging import log_debuglow
+from .displayclocks import DisplayClock
+from .fmt import ThresholdSet, ClockThreshold
+
+
+def get_thresh_set(dclk: DisplayClock):
+    thresh_set = dclk.formatter.thresh_set
+    if dclk.clock and thresh_set:
+        return ThresholdSet.pool.get(thresh_set)
+
+
+def get_next_crossing(dclk: DisplayClock, t_clock: float,
+                      after_tai: float = None):
+    """
+    Returns the TAI time and clock time of the first threshold of `dclk` after
+    clock time `t_clock` (read at `after_tai`), or None if there is nothing
+    left to cross or it cannot be mapped back to TAI.
+    """
+    tset = get_thresh_set(dclk)
+    if not tset:
+        return
+
+    _, times, _ = tset.get_sorted_thresholds()
+    idx = bisect_right(times, t_clock)
+    if idx < len(times):
+        t_next = times[idx]
+        try:
+            tai = dclk.clock.plan.clock_to_tai(t_next, after_tai)
+        except ValueError as e:
+            log_debuglow(f'threshold crossing of {dclk.clk_id} not scheduled:'
+                         f' {e!r}')
+            return
+
+        return tai, t_next
+
+
+class ThresholdScheduler:
+    """
+    Priority queue of the TAI times at which display clocks next cross one of
+    their thresholds, so alerts can be fired by a single-shot timer armed for
+    the earliest crossing instead of polling every clock on every tick.
+    """
+    def __init__(self):
+        self.queue: list[tuple[float, int, DisplayClock, float]] = list()
+        self.tokens: dict[DisplayClock, int] = dict()
+        self._counter = count()
+
+    def clear(self):
+        self.queue = list()
+        self.tokens = dict()
+
+    def rebuild(self, dclks: Iterable[DisplayClock], now_tai: float):
+        self.clear()
+        for dclk in dclks:
+            self.schedule(dclk, now_tai)
+
+    def schedule(self, dclk: DisplayClock, now_tai: float):
+        "(re)compute the next crossing of `dclk` after `now_tai`"
+        if not dclk or not get_thresh_set(dclk):
+            self.remove(dclk)
+            return
+
+        self._push(dclk, dclk.clock.plan.evaluate(now_tai), now_tai)
+
+    def _push(self, dclk: DisplayClock, t_clock: float, after_tai: float):
+        # entries superseded by a newer token are dropped when they surface
+        token = next(self._counter)
+        self.tokens[dclk] = token
+        crossing = get_next_crossing(dclk, t_clock, after_tai)
+        if crossing:
+            tai, t_next = crossing
+            heappush(self.queue, (tai, token, dclk, t_next))
+
+    def remove(self, dclk: DisplayClock):
+        self.tokens.pop(dclk, None)
+
+    def _discard_stale(self):
+        queue = self.queue
+        tokens = self.tokens
+        while queue and tokens.get(queue[0][2]) != queue[0][1]:
+            heappop(queue)
+
+    def next_tai(self):
+        "TAI time of the earliest pending crossing, if any"
+        self._discard_stale()
+        queue = self.queue
+        return queue[0][0] if queue else None
+
+    def pop_due(self, now_tai: float):
+        """
+        Pops every crossing at or before `now_tai` and schedules the one after
+        it.  Returns the threshold each crossed clock is now in; a clock that
+        crossed several thresholds at once only reports the last one.
+        """
+        crossed: dict[DisplayClock, ClockThreshold] = dict()
+        queue = self.queue
+        while True:
+            self._discard_stale()
+            if not queue or queue[0][0] > now_tai:
+                break
+
+            tai, _, dclk, t_next = heappop(queue)
+            tset = get_thresh_set(dclk)
+            if tset:
+                crossed[dclk] = tset.get_thresh_for_t(t_next)
+                self._push(dclk, t_next, tai)
+
+        return crossed
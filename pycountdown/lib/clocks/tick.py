@@ -0,0 +1,183 @@
+from typing import Iterable
+from math import floor, ceil
+from heapq import heappush, heappop
+from collections import deque
+
+from pyrandyos.utils.time.fmt import TimeFormat
+
+from ...logging import log_debuglow
+from .displayclocks import DisplayClock
+from .fmt import ThresholdSet
+
+# finer ticks than this are not worth the event loop load
+MAX_TICK_DIGITS = 2
+MIN_STEP_SEC = 10**-MAX_TICK_DIGITS
+LATENESS_SAMPLES = 100
+# render this long after a change so float error cannot land just before it
+CHANGE_MARGIN_SEC = 1e-4
+# seconds per displayed unit of the single-unit formats
+UNIT_SEC = {
+    TimeFormat.M: 60,
+    TimeFormat.H: 3600,
+    TimeFormat.D: 86400,
+}
+
+
+def get_display_step(dclk: DisplayClock):
+    """
+    Clock seconds between changes of the last displayed digit of `dclk`,
+    no finer than MIN_STEP_SEC.
+    """
+    fmt = dclk.formatter
+    digits = fmt.digits if isinstance(fmt.digits, int) else 0
+    return max(UNIT_SEC.get(fmt.time_format, 1)*10**-digits, MIN_STEP_SEC)
+
+
+def get_next_change(dclk: DisplayClock, t: float, now_tai: float,
+                    step: float = None):
+    """
+    TAI time at which the text or color of `dclk` next changes after clock
+    time `t`, read at `now_tai`.  Displayed values are rounded, so they roll
+    over half way between steps, and the sign flips at zero.
+    """
+    step = step or get_display_step(dclk)
+    t_next = (floor(t/step + 0.5) + 0.5)*step
+    if t < 0 < t_next:
+        t_next = 0
+
+    thresh_set = ThresholdSet.pool.get(dclk.formatter.thresh_set)
+    t_thresh = thresh_set.get_next_thresh_t(t) if thresh_set else None
+    if t_thresh is not None:
+        t_next = min(t_next, t_thresh)
+
+    # clock time jumps back when DST ends, so the inverse can be an hour
+    # late; rendering early only draws the same text again
+    plan = dclk.clock.plan
+    tai = min(plan.clock_to_tai(t_next, now_tai), now_tai + t_next - t)
+    if tai <= now_tai:
+        return get_fallback_tai(now_tai)
+
+    # the text also changes when DST starts or ends, whatever the step
+    t_jump = plan.next_jump_tai(now_tai, tai)
+    return (tai if t_jump is None else t_jump) + CHANGE_MARGIN_SEC
+
+
+def get_fallback_tai(now_tai: float):
+    "next whole TAI second, for rows whose next change cannot be computed"
+    return floor(now_tai) + 1 + CHANGE_MARGIN_SEC
+
+
+class TickScheduler:
+    """
+    Arms the single-shot tick timer for exact TAI times instead of running a
+    free 1 s timer at whatever phase it was started, so drift from event loop
+    load is corrected on every tick.  The lateness of every tick is recorded.
+    """
+    def __init__(self):
+        self.due_tai: float = None
+        self.lateness: deque[float] = deque(maxlen=LATENESS_SAMPLES)
+
+    def arm(self, due_tai: float, now_tai: float):
+        "milliseconds to wait for `due_tai`"
+        self.due_tai = due_tai
+        return max(ceil((due_tai - now_tai)*1000), 0)
+
+    def tick(self, now_tai: float):
+        """
+        Record the lateness of a timer tick and return the time to render
+        it at.  A tick that fires a little early renders at its due time.
+        """
+        due = self.due_tai
+        self.due_tai = None
+        if due is None:
+            return now_tai
+
+        self.lateness.append(now_tai - due)
+        return max(now_tai, due)
+
+    def get_lateness_stats(self):
+        "last, mean and max lateness of the recent ticks in seconds"
+        lateness = self.lateness
+        if lateness:
+            return lateness[-1], sum(lateness)/len(lateness), max(lateness)
+
+
+class RefreshScheduler:
+    """
+    Priority queue of the TAI times at which each table row's text next
+    changes.  The step between changes is derived from the format and digits
+    of each clock, and a row is only redrawn when its own value rolls over,
+    so rows sharing a step and phase refresh together: coarse clocks rarely,
+    sub-second clocks as often as they need (down to MIN_STEP_SEC), and a
+    clock whose epoch is not on a whole second still flips on time.
+
+    Only rows passed to `reschedule` are queued, so rows that are not drawn
+    (such as rows scrolled out of view) cost nothing until they are drawn
+    again.  Rescheduling a row that is already queued supersedes its entry.
+    """
+    def __init__(self):
+        self.queue: list[tuple[float, int]] = list()
+        self.due: dict[int, float] = dict()
+        self.dclks: list[DisplayClock | None] = list()
+        self.steps: dict[int, float] = dict()
+
+    def reset(self, dclks: Iterable[DisplayClock | None]):
+        "forget every queued row and start over with the rows `dclks`"
+        self.dclks = list(dclks)
+        self.queue = list()
+        self.due = dict()
+        self.steps = dict()
+
+    def next_tai(self):
+        queue = self.queue
+        due = self.due
+        # drop superseded entries
+        while queue and due.get(queue[0][1]) != queue[0][0]:
+            heappop(queue)
+        return queue[0][0] if queue else None
+
+    def pop_due(self, now_tai: float):
+        "rows whose text has changed by `now_tai`, in table order"
+        queue = self.queue
+        due = self.due
+        rows: list[int] = list()
+        while queue and queue[0][0] <= now_tai:
+            tai, row = heappop(queue)
+            if due.get(row) == tai:
+                del due[row]
+                rows.append(row)
+        return sorted(rows)
+
+    def reschedule(self, row: int, t: float, now_tai: float):
+        """
+        Queue the next change of a row just drawn at clock time `t`, or the
+        next whole second if it cannot be computed.
+        """
+        dclks = self.dclks
+        dclk = dclks[row] if row < len(dclks) else None
+        if t is None or not dclk or not dclk.clock:
+            self.due.pop(row, None)
+            return
+
+        steps = self.steps
+        step = steps.get(row)
+        try:
+            if step is None:
+                step = get_display_step(dclk)
+                steps[row] = step
+
+            tai = get_next_change(dclk, t, now_tai, step)
+        except Exception as e:
+            # one bad clock must not stop the others from ticking
+            log_debuglow(f'next change of row {row} unknown: {e!r}')
+            tai = get_fallback_tai(now_tai)
+
+        self.push(row, tai)
+
+    def retry(self, row: int, now_tai: float):
+        "redraw a row that failed to render again on the next whole second"
+        self.push(row, get_fallback_tai(now_tai))
+
+    def push(self, row: int, tai: float):
+        self.due[row] = tai
+        heappush(self.queue, (tai, row))
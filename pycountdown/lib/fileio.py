@@ -1,7 +1,21 @@
+import os
 from pathlib import Path
 from contextlib import contextmanager
+from tempfile import mkstemp
+from shutil import copymode
+from threading import Thread, Condition
+from time import monotonic, sleep
+from random import random
+from typing import Callable
 
-from ..logging import log_critical
+from pyrandyos.utils.json import jdumps, JsonDataType
+
+from ..logging import log_critical, log_debuglow
+
+RETRY_FIRST_SEC = 0.25
+RETRY_MAX_SEC = 8
+RETRY_DEADLINE_SEC = 60
+RETRY_JITTER = 0.5
 
 
 @contextmanager
@@ -12,13 +26,202 @@ def safe_file_io(file: Path):
         log_critical(f'File {file} not found or unreachable')
 
 
-@contextmanager
-def safe_file_io_retry(file: Path):
-    success = False
-    while not success:
+class RetryPolicy:
+    """
+    Exponential backoff with jitter: retry `n` waits `first_sec*2**(n - 1)`
+    seconds, capped at `max_sec` and shortened by up to `jitter` of itself at
+    random so that clients of the same share do not retry in lockstep.  No
+    retry is started that would begin more than `deadline_sec` after the
+    first attempt.
+    """
+    def __init__(self, first_sec: float = RETRY_FIRST_SEC,
+                 max_sec: float = RETRY_MAX_SEC,
+                 deadline_sec: float = RETRY_DEADLINE_SEC,
+                 jitter: float = RETRY_JITTER):
+        self.first_sec = first_sec
+        self.max_sec = max_sec
+        self.deadline_sec = deadline_sec
+        self.jitter = jitter
+
+    def get_delay(self, attempt: int):
+        "seconds to wait before retry number `attempt`, counting from 1"
+        delay = min(self.first_sec*2**(attempt - 1), self.max_sec)
+        return delay*(1 - self.jitter*random())
+
+
+def safe_file_io_retry(file: Path, func: Callable[[], None],
+                       policy: RetryPolicy = None,
+                       wait: Callable[[float], None] = sleep):
+    """
+    Call `func` until it stops raising OSError, waiting between attempts as
+    `policy` says.  Returns None on success, or the last error once the
+    deadline has passed.  This blocks for as long as the file stays
+    unreachable, so it belongs on a worker thread; `wait` does the waiting.
+    """
+    policy = policy or RetryPolicy()
+    deadline = monotonic() + policy.deadline_sec
+    attempt = 0
+    while True:
         try:
-            yield
-        except (FileNotFoundError, OSError):
-            log_critical(f'File {file} not found or unreachable')
-        else:
-            success = True
+            func()
+            return
+
+        except OSError as e:
+            attempt += 1
+            delay = policy.get_delay(attempt)
+            if monotonic() + delay > deadline:
+                log_debuglow(f'File {file} still unreachable after '
+                             f'{attempt} attempts, giving up: {e}')
+                return e
+
+            log_debuglow(f'File {file} not found or unreachable, retry '
+                         f'{attempt} in {delay:.2f} s: {e}')
+            wait(delay)
+
+
+def save_json_atomic(file: Path, data: JsonDataType):
+    """
+    Save `data` like `save_json`, but to a temp file next to `file` that is
+    then renamed over it, so that readers never see a partly written file.
+    Returns the mtime of the saved file, as written by us: a later change
+    by someone else will not have it.
+    """
+    # write through symlinks instead of replacing them with a regular file
+    file = Path(file).resolve()
+    fd, tmp = mkstemp(prefix=f'.{file.name}.', suffix='.tmp',
+                      dir=file.parent)
+    try:
+        with open(fd, 'w') as f:
+            f.write(jdumps(data, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+
+        if file.exists():
+            copymode(file, tmp)
+        # renaming keeps the mtime
+        mtime = os.stat(tmp).st_mtime
+        os.replace(tmp, file)
+
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+    return mtime
+
+
+class JsonWriteBehind:
+    """
+    Saves JSON files on a worker thread.  A save replaces any save of the
+    same file that has not started yet, so a burst of edits is written once
+    with the latest data.  The data handed to `save` must not be mutated
+    afterwards.
+
+    An unreachable file is retried according to `policy`, and a newer save
+    of it takes over the retries.  The worker thread logs nothing above
+    debug level (GUI log handlers are not thread safe) and touches no state
+    outside the writer: the retry and the errors of failed saves are
+    reported by `get_status`, and the mtimes of finished saves by
+    `pop_saved`, for the caller's thread to act on.
+    """
+    def __init__(self, policy: RetryPolicy = None):
+        self.policy = policy or RetryPolicy()
+        self.cond = Condition()
+        self.queued: dict[Path, JsonDataType] = dict()
+        self.writing: Path = None
+        self.writing_data: JsonDataType = None
+        self.writing_mtime: float = None
+        self.retry_at: float = None
+        self.errors: dict[Path, Exception] = dict()
+        self.saved: dict[Path, float] = dict()
+        self.thread: Thread = None
+
+    def save(self, file: Path | str, data: JsonDataType):
+        with self.cond:
+            self.queued[Path(file)] = data
+            thread = self.thread
+            if thread is None or not thread.is_alive():
+                thread = Thread(target=self.run, name='JsonWriteBehind',
+                                daemon=True)
+                self.thread = thread
+                thread.start()
+
+            self.cond.notify_all()
+
+    def is_pending(self, file: Path | str):
+        file = Path(file)
+        with self.cond:
+            return file in self.queued or file == self.writing
+
+    def get_status(self):
+        """
+        The file being retried (or None), the seconds until its next
+        attempt, and the error of the last save of each file that failed.
+        """
+        with self.cond:
+            retry_at = self.retry_at
+            if retry_at is None:
+                return None, None, dict(self.errors)
+
+            return (self.writing, max(retry_at - monotonic(), 0),
+                    dict(self.errors))
+
+    def pop_saved(self):
+        "mtime of each file saved since the last call"
+        with self.cond:
+            saved = self.saved
+            self.saved = dict()
+            return saved
+
+    def flush(self, timeout: float = None):
+        "wait for every queued save to be written; False on timeout"
+        with self.cond:
+            return self.cond.wait_for(
+                lambda: not self.queued and self.writing is None, timeout)
+
+    def run(self):
+        cond = self.cond
+        queued = self.queued
+        while True:
+            with cond:
+                cond.wait_for(lambda: queued)
+                file = next(iter(queued))
+                self.writing_data = queued.pop(file)
+                self.writing = file
+
+            error = None
+            try:
+                error = safe_file_io_retry(
+                    file, lambda: self.write(file), self.policy,
+                    lambda sec: self.wait_retry(file, sec))
+
+            except Exception as e:
+                error = e
+
+            finally:
+                with cond:
+                    if error:
+                        self.errors[file] = error
+                    else:
+                        self.errors.pop(file, None)
+                        # recorded before the save stops counting as pending
+                        self.saved[file] = self.writing_mtime
+
+                    self.writing = None
+                    self.writing_data = None
+                    self.writing_mtime = None
+                    self.retry_at = None
+                    cond.notify_all()
+
+    def write(self, file: Path):
+        self.writing_mtime = save_json_atomic(file, self.writing_data)
+
+    def wait_retry(self, file: Path, sec: float):
+        "wait for the next attempt, picking up any newer save of `file`"
+        cond = self.cond
+        queued = self.queued
+        with cond:
+            self.retry_at = monotonic() + sec
+            cond.notify_all()
+            cond.wait_for(lambda: file in queued, sec)
+            if file in queued:
+                self.writing_data = queued.pop(file)
@@ -0,0 +1,42 @@
+from json import dumps, loads
+
+EVENTS_PATH = '/events'
+SNAPSHOT_PATH = '/snapshot'
+
+
+def format_sse(event: str, data: dict):
+    return f'event: {event}\ndata: {dumps(data)}\n\n'.encode()
+
+
+class SSEParser:
+    """
+    Incremental parser for the server-sent event streams written by
+    `format_sse`.  Feed it bytes as they arrive and it returns the complete
+    (event, data) pairs, with the JSON data decoded.  Comments (heartbeats)
+    are skipped.
+    """
+    def __init__(self):
+        self.buffer = b''
+
+    def reset(self):
+        self.buffer = b''
+
+    def feed(self, chunk: bytes):
+        buffer = (self.buffer + chunk).replace(b'\r\n', b'\n')
+        *blocks, self.buffer = buffer.split(b'\n\n')
+        events: list[tuple[str, dict]] = list()
+        for block in blocks:
+            event = 'message'
+            data: list[str] = list()
+            for line in block.decode().split('\n'):
+                field, _, value = line.partition(':')
+                value = value[1:] if value.startswith(' ') else value
+                if field == 'event':
+                    event = value
+                elif field == 'data':
+                    data.append(value)
+
+            if data:
+                events.append((event, loads('\n'.join(data))))
+
+        return events
@@ -0,0 +1,137 @@
+from pathlib import Path
+from hashlib import sha1
+from collections import OrderedDict
+
+from ...logging import log_warning, log_debuglow
+from .gen import generate_tone_sequence, PCM_FORMAT
+
+ToneSeqType = tuple[tuple[float, float, float], ...]
+WaveformKeyType = tuple[ToneSeqType, int, float, str]
+
+DEFAULT_MAX_BYTES = 32*2**20
+PCM_SUFFIX = '.pcm'
+# part of the cached file names; bump whenever the generators change their
+# output, so that audio rendered by an older version is not played
+WAVEFORM_CACHE_VERSION = 1
+
+
+class WaveformCache:
+    """
+    LRU cache of rendered tone sequences keyed by (sequence, sample rate,
+    volume, sample format), bounded by the total size of the buffers.  If a
+    `cache_dir` is given, rendered PCM is also kept there so that it does not
+    need to be synthesized again on the next start.  The files there are
+    bounded by the same size, evicting the least recently used (by mtime,
+    which is refreshed whenever a file is loaded) first.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 cache_dir: Path | str = None):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.entries: OrderedDict[WaveformKeyType, bytes] = OrderedDict()
+        self.nbytes = 0
+
+    @staticmethod
+    def make_key(seq: ToneSeqType, sample_rate_hz: int,
+                 volume: float) -> WaveformKeyType:
+        return (tuple(map(tuple, seq)), int(sample_rate_hz), float(volume),
+                PCM_FORMAT)
+
+    def get(self, seq: ToneSeqType, sample_rate_hz: int = 48000,
+            volume: float = 1):
+        key = self.make_key(seq, sample_rate_hz, volume)
+        entries = self.entries
+        data = entries.get(key)
+        if data is not None:
+            entries.move_to_end(key)
+            return data
+
+        data = self.load(key)
+        if data is None:
+            data = generate_tone_sequence(*key[:3])
+            self.save(key, data)
+
+        self.put(key, data)
+        return data
+
+    def put(self, key: WaveformKeyType, data: bytes):
+        entries = self.entries
+        old = entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= len(old)
+
+        entries[key] = data
+        self.nbytes += len(data)
+        # always keep the newest entry, even if it alone is over the bound
+        while self.nbytes > self.max_bytes and len(entries) > 1:
+            _, evicted = entries.popitem(last=False)
+            self.nbytes -= len(evicted)
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def get_cache_path(self, key: WaveformKeyType):
+        cache_dir = self.cache_dir
+        if cache_dir:
+            versioned = (WAVEFORM_CACHE_VERSION, key)
+            name = sha1(repr(versioned).encode()).hexdigest()
+            return cache_dir/f'{name}{PCM_SUFFIX}'
+
+    def load(self, key: WaveformKeyType):
+        path = self.get_cache_path(key)
+        if path and path.exists():
+            try:
+                data = path.read_bytes()
+            except OSError as e:
+                log_warning(f'Could not read cached alert audio {path}: {e}')
+            else:
+                log_debuglow(f'loaded cached alert audio {path}')
+                try:
+                    path.touch()
+                except OSError:
+                    pass
+                return data
+
+    def save(self, key: WaveformKeyType, data: bytes):
+        path = self.get_cache_path(key)
+        if not path:
+            return
+
+        tmp = path.with_suffix('.tmp')
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        except OSError as e:
+            log_warning(f'Could not cache alert audio to {path}: {e}')
+            return
+
+        self.prune(path)
+
+    def prune(self, keep: Path = None):
+        "delete the least recently used files over the bound, except `keep`"
+        files: list[tuple[float, int, Path]] = list()
+        try:
+            for path in self.cache_dir.glob(f'*{PCM_SUFFIX}'):
+                stat = path.stat()
+                files.append((stat.st_mtime, stat.st_size, path))
+        except OSError as e:
+            log_warning(f'Could not list cached alert audio: {e}')
+            return
+
+        total = sum(x[1] for x in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+
+            if path == keep:
+                continue
+
+            try:
+                path.unlink()
+            except OSError as e:
+                log_debuglow(f'could not evict cached alert audio {path}: {e}')
+            else:
+                log_debuglow(f'evicted cached alert audio {path}')
+                total -= size
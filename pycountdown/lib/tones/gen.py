@@ -1,12 +1,63 @@
 from struct import pack
 from math import sin, pi
+from typing import Iterable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 PACK_FMT = '<h'  # LE, signed 16-bit
+NP_DTYPE = '<i2'  # LE, signed 16-bit
+PCM_FORMAT = 's16le'  # mono
 BITRATE = 16
 MAXVAL = 2**(BITRATE - 1) - 1
 
 
+def generate_tone_array(freq_hz: float = 440,
+                        dur_s: float = 0.5,
+                        sample_rate_hz: int = 48000,
+                        volume: float = 0.5,
+                        fade_dur_s: float = .005):
+    """
+    NumPy version of `generate_tone` returning the int16 samples.  The
+    operations are done in the same order so the samples are identical.
+    """
+    total = int(sample_rate_hz*dur_s)
+    fade = int(sample_rate_hz*fade_dur_s)
+    ampl = MAXVAL*volume
+    twopifreq_smplrt = 2*pi*freq_hz/sample_rate_hz
+
+    i = np.arange(total, dtype=np.float64)
+    wave = (ampl
+            * np.minimum(i/fade, 1)
+            * np.minimum((total - i)/fade, 1)
+            * np.sin(twopifreq_smplrt*i))
+    # casting truncates toward zero like int()
+    return wave.astype(NP_DTYPE)
+
+
+def generate_tone_py(freq_hz: float = 440,
+                     dur_s: float = 0.5,
+                     sample_rate_hz: int = 48000,
+                     volume: float = 0.5,
+                     fade_dur_s: float = .005):
+    "pure Python version of `generate_tone`"
+    total = int(sample_rate_hz*dur_s)
+    fade = int(sample_rate_hz*fade_dur_s)
+    # tail = total - fade
+    ampl = MAXVAL*volume
+    twopifreq_smplrt = 2*pi*freq_hz/sample_rate_hz
+
+    return b''.join(pack(PACK_FMT,
+                         int(ampl
+                             * min(i/fade, 1)
+                             * min((total - i)/fade, 1)
+                             * sin(twopifreq_smplrt*i)))
+                    for i in range(total))
+
+
 def generate_tone(freq_hz: float = 440,
                   dur_s: float = 0.5,
                   sample_rate_hz: int = 48000,
@@ -15,15 +66,83 @@ def generate_tone(freq_hz: float = 440,
     """
     Generate a sine wave tone with fade in/out to prevent pops.
     """
+    if np is None or not int(sample_rate_hz*fade_dur_s):
+        return generate_tone_py(freq_hz, dur_s, sample_rate_hz, volume,
+                                fade_dur_s)
+
+    return generate_tone_array(freq_hz, dur_s, sample_rate_hz, volume,
+                               fade_dur_s).tobytes()
+
+
+def generate_chord_array(freqs_hz: tuple[float, ...],
+                         dur_s: float = 0.5,
+                         sample_rate_hz: int = 48000,
+                         volume: float = 0.5,
+                         fade_dur_s: float = .005):
+    "NumPy version of `generate_chord` returning the int16 samples"
     total = int(sample_rate_hz*dur_s)
     fade = int(sample_rate_hz*fade_dur_s)
-    # tail = total - fade
     ampl = MAXVAL*volume
-    twopifreq_smplrt = 2*pi*freq_hz/sample_rate_hz
+    twopi_smplrt = 2*pi/sample_rate_hz
+
+    i = np.arange(total, dtype=np.float64)
+    wave = (ampl
+            * np.minimum(i/fade, 1)
+            * np.minimum((total - i)/fade, 1)
+            * (sum(np.sin(twopi_smplrt*f*i) for f in freqs_hz)
+               / len(freqs_hz)))
+    return wave.astype(NP_DTYPE)
+
+
+def generate_chord_py(freqs_hz: tuple[float, ...],
+                      dur_s: float = 0.5,
+                      sample_rate_hz: int = 48000,
+                      volume: float = 0.5,
+                      fade_dur_s: float = .005):
+    "pure Python version of `generate_chord`"
+    total = int(sample_rate_hz*dur_s)
+    fade = int(sample_rate_hz*fade_dur_s)
+    ampl = MAXVAL*volume
+    twopi_smplrt = 2*pi/sample_rate_hz
+    nfreqs = len(freqs_hz)
 
     return b''.join(pack(PACK_FMT,
                          int(ampl
                              * min(i/fade, 1)
                              * min((total - i)/fade, 1)
-                             * sin(twopifreq_smplrt*i)))
+                             * (sum(sin(twopi_smplrt*f*i) for f in freqs_hz)
+                                / nfreqs)))
                     for i in range(total))
+
+
+def generate_chord(freqs_hz: tuple[float, ...],
+                   dur_s: float = 0.5,
+                   sample_rate_hz: int = 48000,
+                   volume: float = 0.5,
+                   fade_dur_s: float = .005):
+    """
+    Generate several sine waves played together, each at an equal share of
+    `volume`, with the same fade in/out as `generate_tone`.
+    """
+    if np is None or not int(sample_rate_hz*fade_dur_s):
+        return generate_chord_py(freqs_hz, dur_s, sample_rate_hz, volume,
+                                 fade_dur_s)
+
+    return generate_chord_array(freqs_hz, dur_s, sample_rate_hz, volume,
+                                fade_dur_s).tobytes()
+
+
+def generate_tone_sequence(seq: Iterable[tuple[float | tuple[float, ...],
+                                               float, float]],
+                           sample_rate_hz: int = 48000,
+                           volume: float = 1):
+    """
+    Concatenated tones of (freq_hz, dur_s, volume) scaled by `volume`.  A
+    tuple of frequencies plays a chord.
+    """
+    return b''.join(generate_chord(freq_hz, dur_s, sample_rate_hz,
+                                   volume*vol)
+                    if isinstance(freq_hz, tuple)
+                    else generate_tone(freq_hz, dur_s, sample_rate_hz,
+                                       volume*vol)
+                    for freq_hz, dur_s, vol in seq)
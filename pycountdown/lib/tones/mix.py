@@ -0,0 +1,112 @@
+from sys import byteorder
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .gen import NP_DTYPE, MAXVAL
+
+SAMPLE_BYTES = 2
+MINVAL = -MAXVAL - 1
+
+
+class ToneVoice:
+    "one rendered alert being played back by a `ToneMixer`"
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    @property
+    def started(self):
+        return self.pos > 0
+
+    @property
+    def done(self):
+        return self.pos >= len(self.data)
+
+    def read(self, nbytes: int):
+        pos = self.pos
+        chunk = self.data[pos:pos + nbytes]
+        self.pos = pos + len(chunk)
+        return chunk
+
+
+class ToneMixer:
+    """
+    Sums any number of overlapping 16-bit mono PCM buffers into one stream,
+    clipping the result to the sample range.  An alert added again before
+    the mixer has started playing it is only played once, so identical
+    alerts fired on the same tick do not stack up in volume.
+    """
+    def __init__(self):
+        self.voices: list[ToneVoice] = list()
+        # bytes of silence mixed since the last voice finished
+        self.silence = 0
+
+    @property
+    def idle(self):
+        return not self.voices
+
+    def add(self, data: bytes):
+        "returns False if an identical alert is already waiting to play"
+        if not data:
+            return False
+
+        for voice in self.voices:
+            if not voice.started and voice.data == data:
+                return False
+
+        self.voices.append(ToneVoice(data))
+        return True
+
+    def clear(self):
+        self.voices.clear()
+
+    def mix(self, nbytes: int):
+        "next `nbytes` of the mixed stream, padded with silence"
+        nbytes -= nbytes % SAMPLE_BYTES
+        voices = self.voices
+        chunks = [x.read(nbytes) for x in voices]
+        self.voices = [x for x in voices if not x.done]
+        chunks = [x for x in chunks if x]
+        if not chunks:
+            self.silence += nbytes
+            return bytes(nbytes)
+
+        self.silence = 0
+
+        if len(chunks) == 1:
+            chunk = chunks[0]
+            return chunk + bytes(nbytes - len(chunk))
+
+        if np is not None:
+            return mix_chunks_array(chunks, nbytes)
+        return mix_chunks_py(chunks, nbytes)
+
+
+def mix_chunks_array(chunks: list[bytes], nbytes: int):
+    "NumPy version of `mix_chunks_py`"
+    total = np.zeros(nbytes//SAMPLE_BYTES, dtype=np.int32)
+    for chunk in chunks:
+        samples = np.frombuffer(chunk, dtype=NP_DTYPE)
+        total[:len(samples)] += samples
+
+    return np.clip(total, MINVAL, MAXVAL).astype(NP_DTYPE).tobytes()
+
+
+def mix_chunks_py(chunks: list[bytes], nbytes: int):
+    "sum 16-bit LE sample buffers of up to `nbytes` each, clipping the sum"
+    total = [0]*(nbytes//SAMPLE_BYTES)
+    for chunk in chunks:
+        samples = array('h', chunk)
+        if byteorder == 'big':
+            samples.byteswap()
+        for i, x in enumerate(samples):
+            total[i] += x
+
+    out = array('h', (min(max(x, MINVAL), MAXVAL) for x in total))
+    if byteorder == 'big':
+        out.byteswap()
+    return out.tobytes()
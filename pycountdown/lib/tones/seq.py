@@ -0,0 +1,37 @@
+from typing import Iterable
+
+from ...logging import log_warning
+from .constants import ALERT_SEQ
+
+NoteType = tuple[float | tuple[float, ...], float, float]
+
+
+class AlertSequence:
+    """
+    Named tone sequence that thresholds can play instead of the default
+    alert.  Notes are (freq_hz, dur_s, volume) with a tuple of frequencies
+    for a chord.
+    """
+    pool: dict[str, 'AlertSequence'] = dict()
+
+    def __init__(self, seq_id: str, notes: Iterable[NoteType]):
+        self.seq_id = seq_id
+        self.notes: tuple[NoteType, ...] = tuple(notes)
+
+    @classmethod
+    def get_notes(cls, play_alert: bool | str):
+        "tone sequence to play for a threshold's `play_alert` value"
+        if isinstance(play_alert, str):
+            seq = cls.pool.get(play_alert)
+            if seq:
+                return seq.notes
+
+            log_warning(f"Alert sequence not found: {play_alert!r}, "
+                        "playing the default alert")
+
+        return ALERT_SEQ
+
+    @classmethod
+    def get_all_notes(cls):
+        "the default alert and every named sequence"
+        return [ALERT_SEQ] + [x.notes for x in cls.pool.values()]
@@ -0,0 +1,302 @@
+import sys
+from json import dumps
+from time import monotonic
+from queue import Queue, Empty, Full
+from threading import Thread, Lock, Event
+from argparse import ArgumentParser
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+from pyrandyos.utils.time.now import now_tai_sec
+
+from .app import PyCountdownApp, CLOCKS_FILE_CHECK_SEC_KEY
+from .logging import (
+    log_func_call, log_info, log_warning, log_debuglow, log_exc,
+)
+from .lib.clocks.displayclocks import DisplayClock
+from .lib.clocks.batch import ClockBatch
+from .lib.clocks.rows import RowType, render_rows
+from .lib.clocks.json import export_alert_seq
+from .lib.tones.seq import AlertSequence
+from .lib.sse import format_sse, EVENTS_PATH, SNAPSHOT_PATH
+from .stream import (
+    add_clock_args, init_clocks, load_clocks, sleep_until_next_tick,
+)
+
+SERVE_CMD = 'serve'
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8642
+HEARTBEAT_SEC = 15
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+class Subscriber:
+    "queue of encoded events for one connected client"
+    def __init__(self):
+        self.queue: Queue[bytes | None] = Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.closed = Event()
+
+    def put(self, event: bytes | None):
+        "returns False if the client has fallen too far behind"
+        try:
+            self.queue.put_nowait(event)
+        except Full:
+            return False
+        return True
+
+    def get(self, timeout: float = None):
+        "next event, or None once the subscriber is closed"
+        if self.closed.is_set():
+            return
+
+        event = self.queue.get(timeout=timeout)
+        return None if self.closed.is_set() else event
+
+    def close(self):
+        "discard pending events and tell the client to hang up"
+        self.closed.set()
+        queue = self.queue
+        try:
+            while True:
+                queue.get_nowait()
+        except Empty:
+            pass
+
+        # wake up a writer waiting for an event; one that is not waiting
+        # sees `closed` before it writes anything else
+        try:
+            queue.put_nowait(None)
+        except Full:
+            pass
+
+
+class ClockPublisher:
+    """
+    Evaluates the shown clocks once per tick and publishes the rows that
+    changed to every subscriber as server-sent events.  A subscriber first
+    receives a `snapshot` of all rows, then `delta` events of
+    `[row, state]` pairs, and another `snapshot` if the clocks file is
+    reloaded.  Clients that fall behind are disconnected so that they
+    reconnect and start over from a snapshot.
+    """
+    def __init__(self, clocks_file: Path = None, rate: float = 1,
+                 show_hidden: bool = None):
+        self.clocks_file = clocks_file
+        self.rate = rate
+        self.show_hidden = show_hidden
+        self.lock = Lock()
+        self.stopped = Event()
+        self.subscribers: set[Subscriber] = set()
+        self.batch = ClockBatch()
+        self.rows: list[RowType] = list()
+        # named alerts the rows refer to, which clients cannot look up
+        self.alert_seqs: dict[str, list[dict]] = dict()
+        self.seq = 0
+        self.tai: float = None
+        self.mtime = self.get_mtime()
+        self.thread: Thread = None
+        self.reset_rows()
+
+    def get_mtime(self):
+        clocks_file = self.clocks_file
+        try:
+            return clocks_file.stat().st_mtime if clocks_file else None
+        except OSError:
+            return
+
+    def reset_rows(self):
+        "start over from the current pool; the next tick sends a snapshot"
+        batch = self.batch
+        batch.set_dclks(DisplayClock.get_shown_dclks(self.show_hidden))
+        now = now_tai_sec()
+        with self.lock:
+            self.rows = render_rows(batch, now)
+            self.alert_seqs = {k: export_alert_seq(v)
+                               for k, v in AlertSequence.pool.items()}
+            self.tai = now
+            self.seq += 1
+            self.broadcast(format_sse('snapshot', self.get_snapshot()))
+
+    def get_snapshot(self):
+        return {'seq': self.seq, 'tai': self.tai, 'rows': self.rows,
+                'alert_sequences': self.alert_seqs}
+
+    def subscribe(self):
+        "returns a new subscriber and the snapshot it starts from"
+        sub = Subscriber()
+        with self.lock:
+            self.subscribers.add(sub)
+            return sub, format_sse('snapshot', self.get_snapshot())
+
+    def unsubscribe(self, sub: Subscriber):
+        with self.lock:
+            self.subscribers.discard(sub)
+
+    def broadcast(self, event: bytes):
+        "must hold the lock"
+        for sub in tuple(self.subscribers):
+            if not sub.put(event):
+                log_warning('Dropping a clock subscriber that fell behind')
+                self.subscribers.discard(sub)
+                sub.close()
+
+    def tick(self):
+        now = now_tai_sec()
+        rows = render_rows(self.batch, now)
+        with self.lock:
+            old = self.rows
+            changed = [[i, row] for i, (row, old_row)
+                       in enumerate(zip(rows, old)) if row != old_row]
+            self.rows = rows
+            self.tai = now
+            if changed:
+                self.seq += 1
+                self.broadcast(format_sse('delta', {'seq': self.seq,
+                                                    'tai': now,
+                                                    'rows': changed}))
+
+    def check_clocks_file(self):
+        mtime = self.get_mtime()
+        if mtime is not None and mtime != self.mtime:
+            self.mtime = mtime
+            log_info(f'Reloading clocks file {self.clocks_file}')
+            load_clocks(self.clocks_file)
+            self.reset_rows()
+
+    def run(self):
+        period = 1/self.rate
+        check_sec = PyCountdownApp.get(CLOCKS_FILE_CHECK_SEC_KEY, 10)
+        next_check = monotonic() + check_sec
+        while not self.stopped.is_set():
+            sleep_until_next_tick(period)
+            try:
+                if check_sec and monotonic() >= next_check:
+                    next_check = monotonic() + check_sec
+                    self.check_clocks_file()
+
+                self.tick()
+            except Exception as e:
+                # keep serving the last good state
+                log_exc(e)
+
+    def start(self):
+        thread = Thread(target=self.run, name='ClockPublisher', daemon=True)
+        self.thread = thread
+        thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        with self.lock:
+            for sub in self.subscribers:
+                sub.close()
+            self.subscribers.clear()
+
+
+class ClockRequestHandler(BaseHTTPRequestHandler):
+    server: 'ClockServer'
+
+    def log_message(self, format: str, *args):
+        log_debuglow(f'{self.address_string()} {format % args}')
+
+    def send_common_headers(self, content_type: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == SNAPSHOT_PATH:
+            self.send_snapshot()
+        elif path == EVENTS_PATH:
+            self.send_events()
+        else:
+            self.send_error(404)
+
+    def send_snapshot(self):
+        publisher = self.server.publisher
+        with publisher.lock:
+            body = dumps(publisher.get_snapshot()).encode()
+
+        self.send_common_headers('application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self):
+        publisher = self.server.publisher
+        sub, snapshot = publisher.subscribe()
+        try:
+            self.send_common_headers('text/event-stream')
+            self.end_headers()
+            wfile = self.wfile
+            wfile.write(snapshot)
+            wfile.flush()
+            while True:
+                try:
+                    event = sub.get(HEARTBEAT_SEC)
+                except Empty:
+                    event = b': ping\n\n'
+
+                if event is None:
+                    break
+
+                wfile.write(event)
+                wfile.flush()
+
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+        finally:
+            publisher.unsubscribe(sub)
+
+
+class ClockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], publisher: ClockPublisher):
+        self.publisher = publisher
+        super().__init__(address, ClockRequestHandler)
+
+
+def parse_serve_args(args: list[str]):
+    parser = ArgumentParser(
+        prog=f'pycountdown {SERVE_CMD}',
+        description="Publish the shown clocks to many displays over HTTP. "
+        f"{EVENTS_PATH} is a server-sent event stream of changed rows and "
+        f"{SNAPSHOT_PATH} returns the current rows.",
+    )
+    add_clock_args(parser)
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on (default: {DEFAULT_PORT})")
+    opts = parser.parse_args(args)
+    if opts.rate <= 0:
+        parser.error('rate must be positive')
+
+    return opts
+
+
+@log_func_call
+def main_serve(args: list[str] = None):
+    opts = parse_serve_args(sys.argv[2:] if args is None else args)
+    clocks_file = init_clocks(opts)
+    if not clocks_file:
+        return 1
+
+    publisher = ClockPublisher(clocks_file, opts.rate, opts.show_hidden)
+    server = ClockServer((opts.host, opts.port), publisher)
+    host, port = server.server_address[:2]
+    log_info(f'Serving clocks on http://{host}:{port}{EVENTS_PATH}')
+    publisher.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.stop()
+        server.server_close()
+
+    return 0
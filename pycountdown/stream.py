@@ -0,0 +1,113 @@
+import sys
+from math import ceil
+from time import time, sleep
+from json import dumps
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from typing import TextIO
+
+from pyrandyos.utils.json import load_jsonc
+from pyrandyos.utils.time.now import now_tai_sec
+
+from .app import PyCountdownApp
+from .logging import log_func_call, log_error
+from .lib.clocks.json import parse_clocks_jsonc
+from .lib.clocks.displayclocks import DisplayClock
+from .lib.clocks.fmt import ThresholdSet
+from .lib.clocks.batch import ClockBatch
+from .lib.clocks.rows import render_rows
+from .lib.tones.seq import AlertSequence
+
+STREAM_CMD = 'stream'
+
+
+def add_clock_args(parser: ArgumentParser):
+    "arguments shared by the headless commands"
+    parser.add_argument('config', nargs='?',
+                        help="global config file, as for the GUI")
+    parser.add_argument('-f', '--clocks-file', type=Path,
+                        help="clocks file to use instead of the configured "
+                        "one")
+    parser.add_argument('-r', '--rate', type=float, default=1,
+                        help="updates per second, aligned to whole seconds "
+                        "(default: 1)")
+    parser.add_argument('--show-hidden', action='store_true', default=None,
+                        help="include hidden clocks")
+
+
+def parse_stream_args(args: list[str]):
+    parser = ArgumentParser(
+        prog=f'pycountdown {STREAM_CMD}',
+        description="Print the shown clocks as JSON lines without the GUI.",
+    )
+    add_clock_args(parser)
+    parser.add_argument('--once', action='store_true',
+                        help="print a single line right away and exit")
+    opts = parser.parse_args(args)
+    if opts.rate <= 0:
+        parser.error('rate must be positive')
+
+    return opts
+
+
+def load_clocks(clocks_file: Path):
+    "replace the pools with the contents of `clocks_file`"
+    clocks_jsonc = load_jsonc(clocks_file)
+    clk_pool, thresh_pool, alert_seqs = parse_clocks_jsonc(clocks_jsonc)
+    DisplayClock.set_pool(clk_pool)
+    ThresholdSet.pool = thresh_pool or dict()
+    AlertSequence.pool = alert_seqs or dict()
+
+
+def init_clocks(opts: Namespace):
+    """
+    Initialize the app config and load the clocks file from parsed
+    `add_clock_args` arguments.  Returns the clocks file path, or None if
+    there is no file to load.
+    """
+    PyCountdownApp.init_main(opts.config)
+    clocks_file = opts.clocks_file or PyCountdownApp.get_clocks_file_path()
+    if not clocks_file or not Path(clocks_file).exists():
+        log_error(f'Clocks file not found: {clocks_file}')
+        return
+
+    load_clocks(clocks_file)
+    return Path(clocks_file)
+
+
+def sleep_until_next_tick(period_sec: float):
+    "sleep until the next multiple of `period_sec` since the Unix epoch"
+    now = time()
+    sleep(max(ceil(now/period_sec)*period_sec - now, 0))
+
+
+def write_tick(batch: ClockBatch, out: TextIO = None):
+    out = out or sys.stdout
+    now = now_tai_sec()
+    line = dumps({'tai': now, 'clocks': render_rows(batch, now)})
+    out.write(line + '\n')
+    out.flush()
+
+
+@log_func_call
+def main_stream(args: list[str] = None):
+    """
+    Headless counterpart of the GUI: evaluates the shown clocks from the
+    clocks file and prints one JSON object per tick to stdout.
+    """
+    opts = parse_stream_args(sys.argv[2:] if args is None else args)
+    if not init_clocks(opts):
+        return 1
+
+    batch = ClockBatch(DisplayClock.get_shown_dclks(opts.show_hidden))
+    if opts.once:
+        write_tick(batch)
+        return 0
+
+    period = 1/opts.rate
+    try:
+        while True:
+            sleep_until_next_tick(period)
+            write_tick(batch)
+    except (KeyboardInterrupt, BrokenPipeError):
+        return 0
@@ -1,7 +1,13 @@
 from unittest import TestCase, main as utmain, TextTestRunner, mock
 import sys
-from os import environ
+from os import environ, utime
 from pathlib import Path
+from io import StringIO
+from json import dumps, loads
+from tempfile import TemporaryDirectory
+from threading import Thread
+from http.client import HTTPConnection
+from subprocess import run
 
 HERE = Path(__file__).expanduser().resolve().parent
 REPOROOT = HERE.parent
@@ -15,12 +21,1248 @@ from _pycountdown_testing import (  # noqa: E402
     ENV_PYCOUNTDOWN_UNITTEST_ACTIVE,
 )
 
+# mid-hour, so that only the seconds change over the next tick
+T0 = 3600*300000 + 900.25
+CLOCKS_JSONC = {
+    'clocks': [
+        {'label': 'Now', 'follow': 'TAI'},
+        {'blank': True},
+        {'label': 'Hours', 'follow': 'TAI', 'display': {'format': 'H'}},
+    ],
+    'alert_sequences': {
+        'beep': [{'freq_hz': 440, 'dur_s': 0.1, 'volume': 0.5}],
+    },
+}
+
+
+def init_app():
+    from pycountdown.app import PyCountdownApp
+    PyCountdownApp.init_parse_config({})
+
+
+def write_clocks_file(test: TestCase, data: dict = CLOCKS_JSONC):
+    tmpdir = TemporaryDirectory()
+    test.addCleanup(tmpdir.cleanup)
+    clocks_file = Path(tmpdir.name)/'clocks.jsonc'
+    clocks_file.write_text(dumps(data))
+    return clocks_file
+
 
 @mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
 class TestPyCountdown(TestCase):
     def test_import(self):
         import pycountdown  # noqa: F401
 
+    def test_headless_engine(self):
+        # in a fresh interpreter, so that what other tests imported does not
+        # matter
+        code = ('import sys, pycountdown.lib.clocks.json, pycountdown.stream,'
+                ' pycountdown.server; '
+                "assert 'PySide2' not in sys.modules")
+        env = dict(environ, PYTHONPATH=str(REPOROOT))
+        proc = run([sys.executable, '-c', code], env=env, capture_output=True,
+                   text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+        from pycountdown.lib.clocks.color import parse_color
+        self.assertEqual(parse_color('Red').name(), '#ff0000')
+        self.assertEqual(parse_color([0, 128, 255]).name(), '#0080ff')
+        self.assertIsNone(parse_color(''))
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestClockPublisher(TestCase):
+    def setUp(self):
+        init_app()
+        from pycountdown.stream import load_clocks
+        self.clocks_file = write_clocks_file(self)
+        load_clocks(self.clocks_file)
+
+    def start_server(self):
+        from pycountdown.server import ClockPublisher, ClockServer
+        with mock.patch('pycountdown.server.now_tai_sec', return_value=T0):
+            publisher = ClockPublisher(self.clocks_file, show_hidden=False)
+
+        server = ClockServer(('127.0.0.1', 0), publisher)
+        thread = Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            publisher.stop()
+            server.shutdown()
+            server.server_close()
+
+        self.addCleanup(stop)
+        return publisher, server.server_address[1]
+
+    def test_snapshot(self):
+        from pycountdown.lib.sse import SNAPSHOT_PATH
+        _, port = self.start_server()
+        conn = HTTPConnection('127.0.0.1', port, timeout=5)
+        self.addCleanup(conn.close)
+        conn.request('GET', SNAPSHOT_PATH)
+        resp = conn.getresponse()
+        self.assertEqual(resp.status, 200)
+        snapshot = loads(resp.read())
+        self.assertEqual(snapshot['tai'], T0)
+        self.assertEqual([x['label'] for x in snapshot['rows']],
+                         ['Now', '', 'Hours'])
+        self.assertEqual(snapshot['rows'][0]['text'], '2034-03-23 12:15:00')
+        self.assertIn('beep', snapshot['alert_sequences'])
+
+    def test_events(self):
+        from pycountdown.lib.sse import SSEParser, EVENTS_PATH
+        publisher, port = self.start_server()
+        conn = HTTPConnection('127.0.0.1', port, timeout=5)
+        self.addCleanup(conn.close)
+        conn.request('GET', EVENTS_PATH)
+        resp = conn.getresponse()
+        self.assertEqual(resp.getheader('Content-Type'), 'text/event-stream')
+        parser = SSEParser()
+
+        def next_event():
+            events = list()
+            while not events:
+                events = parser.feed(resp.read1(4096))
+            self.assertEqual(len(events), 1)
+            return events[0]
+
+        event, snapshot = next_event()
+        self.assertEqual(event, 'snapshot')
+        self.assertEqual(len(snapshot['rows']), 3)
+
+        with mock.patch('pycountdown.server.now_tai_sec',
+                        return_value=T0 + 1):
+            publisher.tick()
+
+        event, delta = next_event()
+        self.assertEqual(event, 'delta')
+        self.assertEqual(delta['seq'], snapshot['seq'] + 1)
+        # the blank row and the hours did not change
+        self.assertEqual([row for row, _ in delta['rows']], [0])
+        self.assertEqual(delta['rows'][0][1]['text'], '2034-03-23 12:15:01')
+
+        # stopping the publisher ends the stream
+        publisher.stop()
+        self.assertEqual(resp.read(), b'')
+
+    def test_subscriber_close(self):
+        from pycountdown.server import Subscriber, SUBSCRIBER_QUEUE_SIZE
+        sub = Subscriber()
+        self.assertTrue(sub.put(b'a'))
+        self.assertEqual(sub.get(0), b'a')
+        for _ in range(SUBSCRIBER_QUEUE_SIZE):
+            self.assertTrue(sub.put(b'b'))
+        self.assertFalse(sub.put(b'c'))
+
+        # pending events are dropped, even from a full queue
+        sub.close()
+        self.assertIsNone(sub.get(0))
+        self.assertTrue(sub.put(b'd'))
+        self.assertIsNone(sub.get(0))
+
+    def test_subscriber_close_waiting(self):
+        from pycountdown.server import Subscriber
+        sub = Subscriber()
+        events = list()
+        thread = Thread(target=lambda: events.append(sub.get(5)))
+        thread.start()
+        sub.close()
+        thread.join(5)
+        self.assertEqual(events, [None])
+
+    def test_sse_parser(self):
+        from pycountdown.lib.sse import SSEParser, format_sse
+        parser = SSEParser()
+        data = format_sse('delta', {'seq': 2, 'rows': [[0, {'text': 'x'}]]})
+        self.assertEqual(parser.feed(b': ping\n\n' + data[:10]), [])
+        self.assertEqual(parser.feed(data[10:].replace(b'\n', b'\r\n')),
+                         [('delta', {'seq': 2, 'rows': [[0, {'text': 'x'}]]})])
+        self.assertEqual(parser.feed(b'data: {"a": 1}\n\n'),
+                         [('message', {'a': 1})])
+        parser.feed(b'event: delta\n')
+        parser.reset()
+        self.assertEqual(parser.feed(b'data: 1\n\n'), [('message', 1)])
+
+    def test_stream_once(self):
+        from pycountdown.stream import main_stream
+        out = StringIO()
+        stream = 'pycountdown.stream'
+        with mock.patch('sys.stdout', out), \
+                mock.patch(f'{stream}.now_tai_sec', return_value=T0), \
+                mock.patch(f'{stream}.PyCountdownApp.init_main'):
+            self.assertEqual(main_stream(['--once', '-f',
+                                          str(self.clocks_file)]), 0)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        tick = loads(lines[0])
+        self.assertEqual(tick['tai'], T0)
+        self.assertEqual([x['text'] for x in tick['clocks']],
+                         ['2034-03-23 12:15:00', '', '300000'])
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestClockGraph(TestCase):
+    def assert_ordered(self, deps: list[list[int]], order: list[int]):
+        self.assertEqual(sorted(order), list(range(len(deps))))
+        for i, node_deps in enumerate(deps):
+            for j in node_deps:
+                self.assertLess(order.index(j), order.index(i))
+
+    def test_topo_sort_chain(self):
+        from pycountdown.lib.clocks.graph import topo_sort
+        deps = [[1], [2], []]
+        order, cycles = topo_sort(deps)
+        self.assertEqual(order, [2, 1, 0])
+        self.assertEqual(cycles, [])
+
+    def test_topo_sort_diamond(self):
+        from pycountdown.lib.clocks.graph import topo_sort
+        deps = [[1, 2], [3], [3], [], [0, 3, 3]]
+        order, cycles = topo_sort(deps)
+        self.assert_ordered(deps, order)
+        self.assertEqual(cycles, [])
+
+    def test_topo_sort_cycle(self):
+        from pycountdown.lib.clocks.graph import topo_sort
+        # 3 depends on the cycle and 4 on itself; 5 is free
+        deps = [[1], [2], [0], [0], [4], []]
+        order, cycles = topo_sort(deps)
+        self.assertEqual(order, [5])
+        self.assertEqual(cycles, [[0, 1, 2], [4]])
+
+    def test_find_cycles(self):
+        from pycountdown.lib.clocks.graph import find_cycles
+        deps = [[1], [0], [3], [4], [2], [0, 2]]
+        self.assertEqual(find_cycles(deps, range(6)), [[0, 1], [2, 3, 4]])
+        # only the given nodes are searched
+        self.assertEqual(find_cycles(deps, [2, 3, 4]), [[2, 3, 4]])
+        self.assertEqual(find_cycles(deps, [0, 2, 3]), [])
+
+    def test_parse_cycles(self):
+        init_app()
+        from pycountdown.lib.clocks.json import parse_clocks_jsonc
+        data = {'clocks': [
+            {'label': 'X', 'follow': 'Y'},
+            {'label': 'Y', 'epoch': {'t': 1, 'clock': 'Z'}},
+            {'label': 'Z', 'follow': 'X'},
+            {'label': 'W', 'follow': 'X'},
+            {'label': 'S', 'follow': 'S'},
+            {'label': 'A', 'follow': 'B'},
+            {'label': 'B', 'follow': 'TAI'},
+        ]}
+        pool, _, _ = parse_clocks_jsonc(data)
+        self.assertEqual([x.label if x else None for x in pool],
+                         [None, None, None, None, None, 'A', 'B'])
+        self.assertIs(pool[5].clock.follow, pool[6].clock)
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestClockRegistry(TestCase):
+    def setUp(self):
+        init_app()
+        from pycountdown.lib.clocks.clock import Clock
+        from pycountdown.lib.clocks.fmt import ClockFormatter
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        self.dclks = [DisplayClock(x, x.upper(), Clock(),
+                                   ClockFormatter(hidden=x in 'bd'))
+                      for x in 'abcdef']
+        a, b, c, d, e, f = self.dclks
+        DisplayClock.set_pool([a, b, None, c, d, e, None, f])
+
+    def assert_rows(self):
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        from pycountdown.lib.clocks.registry import is_shown
+        pool = DisplayClock.pool
+        for show_hidden in (False, True):
+            rows = [i for i, x in enumerate(pool)
+                    if show_hidden or is_shown(x)]
+            for row, idx in enumerate(rows):
+                self.assertEqual(
+                    DisplayClock.get_idx_for_visible_idx(row, show_hidden),
+                    idx)
+            self.assertIsNone(
+                DisplayClock.get_idx_for_visible_idx(len(rows), show_hidden))
+            for idx in range(len(pool)):
+                self.assertEqual(
+                    DisplayClock.get_visible_idx_for_idx(idx, show_hidden),
+                    rows.index(idx) if idx in rows else None)
+
+    def assert_indexed(self):
+        "the indexes kept up to date match ones built from scratch"
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        from pycountdown.lib.clocks.registry import ClockRegistry
+        pool = DisplayClock.pool
+        fresh = ClockRegistry(pool)
+        fresh.rebuild()
+        self.assertFalse(pool.dirty)
+        self.assertEqual(pool.positions, fresh.positions)
+        self.assertEqual(pool.ids, fresh.ids)
+        self.assertEqual(pool.clock_owners, fresh.clock_owners)
+        self.assertEqual(pool.shown_flags, fresh.shown_flags)
+        self.assertEqual(pool.shown.tree, fresh.shown.tree)
+        self.assert_rows()
+
+    def test_incremental(self):
+        from pycountdown.lib.clocks.clock import Clock
+        from pycountdown.lib.clocks.fmt import ClockFormatter
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        a, b, c, d, e, f = self.dclks
+        g, h = (DisplayClock(x, x.upper(), Clock(),
+                             ClockFormatter(hidden=x == 'h'))
+                for x in 'gh')
+        pool = DisplayClock.pool
+        pool.get_positions()
+        for op in (lambda: pool.append(g),
+                   lambda: pool.append(h),
+                   lambda: pool.append(None),
+                   lambda: pool.move_block([c], 0),
+                   lambda: pool.move_block([a, f], 6),
+                   lambda: DisplayClock.move_down([c]),
+                   lambda: DisplayClock.move_up([g]),
+                   lambda: pool.pop(),
+                   lambda: pool.insert(2, None),
+                   lambda: pool.remove(b),
+                   lambda: pool.insert(-1, b),
+                   lambda: pool.pop(0)):
+            op()
+            self.assert_indexed()
+
+        self.assertEqual(len(pool), 10)
+        self.assertIs(pool.get_dclk_for_id('G'), g)
+        self.assertIs(pool.get_dclk_for_clock(h.clock), h)
+
+    def test_duplicate_ids(self):
+        from pycountdown.lib.clocks.clock import Clock
+        from pycountdown.lib.clocks.fmt import ClockFormatter
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        a = self.dclks[0]
+        a2 = DisplayClock('A', 'A2', Clock(), ClockFormatter())
+        pool = DisplayClock.pool
+        # the first clock with an ID wins, wherever the second one goes
+        pool.insert(0, a2)
+        self.assertIs(pool.get_dclk_for_id('a'), a2)
+        pool.move_block([a2], 3)
+        self.assertIs(pool.get_dclk_for_id('a'), a)
+        del pool[0]
+        self.assertIs(pool.get_dclk_for_id('a'), a2)
+        self.assert_rows()
+
+    def test_fenwick_tree(self):
+        from pycountdown.lib.clocks.registry import FenwickTree
+        counts = [1, 0, 1, 1, 0, 0, 1, 0, 1]
+        tree = FenwickTree(counts)
+        self.assertEqual(len(tree), len(counts))
+        for n in range(len(counts) + 1):
+            self.assertEqual(tree.prefix_sum(n), sum(counts[:n]))
+        self.assertEqual([tree.find(k) for k in range(6)],
+                         [0, 2, 3, 6, 8, None])
+        tree.add(1, 1)
+        tree.add(3, -1)
+        self.assertEqual(tree.total(), 5)
+        self.assertEqual([tree.find(k) for k in range(6)],
+                         [0, 1, 2, 6, 8, None])
+        self.assertIsNone(FenwickTree().find(0))
+
+        # appending and popping keep the tree as if built at once
+        counts[1:4] = [1, 1, 0]
+        for count in (1, 0, 1, 1, 0):
+            counts.append(count)
+            tree.append(count)
+            self.assertEqual(tree.tree, FenwickTree(counts).tree)
+        while counts:
+            counts.pop()
+            tree.pop()
+            self.assertEqual(tree.tree, FenwickTree(counts).tree)
+
+    def test_hide(self):
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        a, b, c, d, e, f = self.dclks
+        self.assert_rows()
+        for dclk, hidden in ((a, True), (f, True), (b, False), (a, False)):
+            dclk.formatter.hidden = hidden
+            DisplayClock.update(dclk)
+            self.assert_rows()
+
+    def test_move(self):
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        a, b, c, d, e, f = self.dclks
+        self.assert_rows()
+        # c moves above the blank, staying below the hidden b
+        self.assertEqual(DisplayClock.move_up([c]), ([2], [1]))
+        self.assertEqual(list(DisplayClock.pool),
+                         [a, b, c, None, d, e, None, f])
+        self.assert_rows()
+        self.assertEqual(DisplayClock.move_down([a, c]), ([0, 1], [1, 2]))
+        self.assertEqual(list(DisplayClock.pool),
+                         [b, None, a, c, d, e, None, f])
+        self.assert_rows()
+        DisplayClock.pool.move_block([f, b], 3)
+        self.assertEqual(list(DisplayClock.pool),
+                         [None, a, c, f, b, d, e, None])
+        self.assert_rows()
+
+    def test_duplicate(self):
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        a, b, c, d, e, f = self.dclks
+        self.assert_rows()
+        DisplayClock.duplicate_subpool([b, e])
+        pool = DisplayClock.pool
+        self.assertEqual([x.clk_id if x else None for x in pool],
+                         ['a', 'b', 'b_copy', None, 'c', 'd', 'e', 'e_copy',
+                          None, 'f'])
+        self.assertTrue(pool[2].hidden)
+        self.assert_rows()
+
+    def test_remove(self):
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        a, b, c, d, e, f = self.dclks
+        pool = DisplayClock.pool
+        self.assert_rows()
+        pool.remove(c)
+        self.assert_rows()
+        del pool[0]
+        self.assert_rows()
+        pool.remove(None)
+        self.assertEqual(list(pool), [b, d, e, None, f])
+        self.assert_rows()
+        self.assertIsNone(pool.get_dclk_for_id('C'))
+        self.assertIs(pool.get_dclk_for_id('E'), e)
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestMergeClockPools(TestCase):
+    def setUp(self):
+        init_app()
+
+    def parse(self, clocks: list[dict]):
+        from pycountdown.lib.clocks.json import parse_clocks_jsonc
+        pool, thresh_sets, _ = parse_clocks_jsonc({'clocks': clocks})
+        return pool, thresh_sets
+
+    def test_merge(self):
+        from pycountdown.lib.clocks.merge import merge_clock_pools
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        old_pool, old_sets = self.parse([
+            {'label': 'A', 'follow': 'TAI'},
+            {'label': 'B', 'follow': 'A', 'display': {'digits': 1}},
+            {'label': 'C', 'epoch': {'t': 0, 'clock': 'A'}},
+        ])
+        a, b, c = old_pool
+        a_clock, b_clock = a.clock, b.clock
+        selected = [a, b]
+
+        # B is modified, C removed and D added
+        new_pool, new_sets = self.parse([
+            {'label': 'A', 'follow': 'TAI'},
+            {'label': 'B', 'follow': 'A', 'display': {'digits': 2}},
+            {'label': 'D', 'follow': 'B'},
+        ])
+        d = new_pool[2]
+        merge = merge_clock_pools(old_pool, new_pool, old_sets, new_sets)
+        self.assertEqual(merge.pool, [a, b, d])
+        self.assertEqual(merge.changed, {b, d})
+        self.assertTrue(merge.relayout)
+        self.assertNotIn(c, merge.pool)
+
+        # the selected rows are found again by display clock
+        DisplayClock.set_pool(merge.pool)
+        self.assertEqual([DisplayClock.pool.index(x) for x in selected],
+                         [0, 1])
+
+        # clocks are patched in place and new ones follow the live ones
+        self.assertIs(a.clock, a_clock)
+        self.assertIs(b.clock, b_clock)
+        self.assertEqual(b.formatter.digits, 2)
+        self.assertIs(b_clock.follow, a_clock)
+        self.assertIs(d.clock.follow, b_clock)
+
+    def test_merge_recompiles(self):
+        from pycountdown.lib.clocks.merge import merge_clock_pools
+        old_pool, old_sets = self.parse([
+            {'label': 'A', 'epoch': {'t': T0, 'clock': 'TAI'}},
+            {'label': 'B', 'epoch': {'t': 5, 'clock': 'A'}},
+            {'label': 'C', 'epoch': {'t': 0, 'clock': 'A'}},
+        ])
+        a, b, c = old_pool
+        self.assertEqual(c.clock.plan.evaluate(T0 + 10), 10)
+        self.assertEqual(b.clock.plan.evaluate(T0 + 10), 5)
+
+        # A now counts from 2 s later
+        new_pool, new_sets = self.parse([
+            {'label': 'A', 'epoch': {'t': T0 + 2, 'clock': 'TAI'}},
+            {'label': 'B', 'epoch': {'t': 6, 'clock': 'A'}},
+            {'label': 'C', 'epoch': {'t': 0, 'clock': 'A'}},
+        ])
+        new_epoch = new_pool[1].clock.epoch
+        merge = merge_clock_pools(old_pool, new_pool, old_sets, new_sets)
+        self.assertEqual(merge.pool, [a, b, c])
+        self.assertEqual(merge.changed, {a, b})
+        # the unchanged C counts from the recompiled A
+        self.assertEqual(c.clock.plan.evaluate(T0 + 10), 8)
+        self.assertEqual(b.clock.plan.evaluate(T0 + 10), 2)
+        self.assertIs(b.clock.epoch.clock, a.clock)
+        # the parsed epoch was copied, not pointed at the live clock
+        self.assertIs(new_epoch.clock, new_pool[0].clock)
+
+    def test_merge_unchanged(self):
+        from pycountdown.lib.clocks.merge import merge_clock_pools
+        clocks = [
+            {'label': 'A', 'follow': 'TAI'},
+            {'blank': True},
+            {'label': 'B', 'follow': 'A'},
+        ]
+        old_pool, old_sets = self.parse(clocks)
+        new_pool, new_sets = self.parse(clocks)
+        merge = merge_clock_pools(old_pool, new_pool, old_sets, new_sets)
+        self.assertEqual(merge.pool, old_pool)
+        self.assertTrue(all(x is y for x, y in zip(merge.pool, old_pool)))
+        self.assertEqual(merge.changed, set())
+        self.assertFalse(merge.relayout)
+
+    def test_merge_reorder(self):
+        from pycountdown.lib.clocks.merge import merge_clock_pools
+        old_pool, old_sets = self.parse([
+            {'label': 'A', 'follow': 'TAI'},
+            {'label': 'B', 'follow': 'TAI'},
+        ])
+        new_pool, new_sets = self.parse([
+            {'label': 'b', 'follow': 'TAI'},
+            {'label': 'A', 'follow': 'TAI', 'display': {'hidden': True}},
+        ])
+        a, b = old_pool
+        merge = merge_clock_pools(old_pool, new_pool, old_sets, new_sets)
+        # IDs match case insensitively, and the label is updated
+        self.assertEqual(merge.pool, [b, a])
+        self.assertEqual(b.label, 'b')
+        self.assertTrue(a.hidden)
+        self.assertEqual(merge.changed, {a, b})
+        self.assertTrue(merge.relayout)
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestFormatCache(TestCase):
+    def assert_matches(self, times: list[float]):
+        from pyrandyos.utils.time.fmt import TimeFormat, sec_as_fmt_str
+        from pycountdown.lib.clocks.fmt import FormatCache
+        for fmt in TimeFormat:
+            for digits in (0, 1, 3):
+                for zeropad in (0, 3):
+                    cache = FormatCache()
+                    for t in times:
+                        self.assertEqual(
+                            cache.sec_as_fmt_str(t, fmt, digits, zeropad),
+                            sec_as_fmt_str(t, fmt, digits, zeropad),
+                            (t, fmt, digits, zeropad))
+
+    def test_ticks(self):
+        # a tick every 0.37 s across several minute rollovers
+        self.assert_matches([T0 + 0.37*i for i in range(500)])
+
+    def test_negative(self):
+        # counting up through zero, including rounding to -0
+        self.assert_matches([-125 + 0.37*i for i in range(700)]
+                            + [-0.0004, -0.04, -0.4, 0.0004])
+
+    def test_rollover(self):
+        # midnight of 2001-01-01 and the end of a day, with seconds that
+        # round up into the next minute
+        year = -43200 + 366*86400
+        self.assert_matches([t + dt for t in (year, year + 86400/2, 3599.5)
+                             for dt in (-61, -60.5, -1, -0.4996, -0.04, 0,
+                                        0.0004, 0.5, 59.9996, 60)])
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestFileRetry(TestCase):
+    def test_backoff(self):
+        from pycountdown.lib.fileio import RetryPolicy
+        policy = RetryPolicy(0.25, 8, 60, 0)
+        self.assertEqual([policy.get_delay(n) for n in range(1, 9)],
+                         [0.25, 0.5, 1, 2, 4, 8, 8, 8])
+
+    def test_backoff_jitter(self):
+        from pycountdown.lib.fileio import RetryPolicy
+        policy = RetryPolicy(0.25, 8, 60, 0.5)
+        for n, delay in ((1, 0.25), (3, 1), (10, 8)):
+            with mock.patch('pycountdown.lib.fileio.random', return_value=0):
+                self.assertEqual(policy.get_delay(n), delay)
+            with mock.patch('pycountdown.lib.fileio.random',
+                            return_value=1):
+                self.assertEqual(policy.get_delay(n), delay/2)
+            for _ in range(20):
+                self.assertTrue(delay/2 <= policy.get_delay(n) <= delay)
+
+    def retry(self, fails: int):
+        from pycountdown.lib.fileio import RetryPolicy, safe_file_io_retry
+        now = [0.0]
+        waits: list[float] = list()
+        calls: list[int] = list()
+
+        def wait(sec: float):
+            waits.append(sec)
+            now[0] += sec
+
+        def func():
+            calls.append(len(calls))
+            if len(calls) <= fails:
+                raise OSError('unreachable')
+
+        with mock.patch('pycountdown.lib.fileio.monotonic',
+                        lambda: now[0]):
+            err = safe_file_io_retry(Path('clocks.jsonc'), func,
+                                     RetryPolicy(1, 4, 10, 0), wait)
+
+        return err, waits, len(calls)
+
+    def test_retry(self):
+        err, waits, ncalls = self.retry(2)
+        self.assertIsNone(err)
+        self.assertEqual(waits, [1, 2])
+        self.assertEqual(ncalls, 3)
+
+    def test_retry_deadline(self):
+        # the retry after 1 + 2 + 4 s would start after the 10 s deadline
+        err, waits, ncalls = self.retry(100)
+        self.assertIsInstance(err, OSError)
+        self.assertEqual(waits, [1, 2, 4])
+        self.assertEqual(ncalls, 4)
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestSaveJsonAtomic(TestCase):
+    def setUp(self):
+        self.file = write_clocks_file(self)
+        self.dir = self.file.parent
+
+    def assert_intact(self):
+        self.assertEqual(loads(self.file.read_text()), CLOCKS_JSONC)
+        self.assertEqual([x.name for x in self.dir.iterdir()],
+                         [self.file.name])
+
+    def test_save(self):
+        from pycountdown.lib.fileio import save_json_atomic
+        data = {'clocks': []}
+        mtime = save_json_atomic(self.file, data)
+        self.assertEqual(loads(self.file.read_text()), data)
+        self.assertEqual(self.file.stat().st_mtime, mtime)
+        self.assertEqual([x.name for x in self.dir.iterdir()],
+                         [self.file.name])
+
+    def test_save_unserializable(self):
+        from pycountdown.lib.fileio import save_json_atomic
+        with self.assertRaises(TypeError):
+            save_json_atomic(self.file, {'clocks': [object()]})
+        self.assert_intact()
+
+    def test_save_rename_fails(self):
+        from pycountdown.lib.fileio import save_json_atomic
+        with mock.patch('pycountdown.lib.fileio.os.replace',
+                        side_effect=OSError('unreachable')):
+            with self.assertRaises(OSError):
+                save_json_atomic(self.file, {'clocks': []})
+        self.assert_intact()
+
+    def test_save_symlink(self):
+        from pycountdown.lib.fileio import save_json_atomic
+        link = self.dir/'link.jsonc'
+        link.symlink_to(self.file.name)
+        data = {'clocks': []}
+        save_json_atomic(link, data)
+        self.assertTrue(link.is_symlink())
+        self.assertEqual(loads(self.file.read_text()), data)
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestAlertSequences(TestCase):
+    SEQS = {
+        'beep': [{'freq_hz': 440, 'dur_s': 0.1, 'volume': 0.5}],
+        'chime': [[880, 0.2], [[440, 660], 0.3, 0.25], [0, 0.1, 0]],
+    }
+
+    def test_parse(self):
+        from pycountdown.lib.clocks.json import parse_alert_seqs
+        from pycountdown.lib.tones.constants import BASELINE_VOLUME
+        seqs = parse_alert_seqs(self.SEQS)
+        self.assertEqual(list(seqs), ['beep', 'chime'])
+        self.assertEqual(seqs['beep'].notes, ((440, 0.1, 0.5),))
+        self.assertEqual(seqs['chime'].notes,
+                         ((880, 0.2, BASELINE_VOLUME),
+                          ((440.0, 660.0), 0.3, 0.25),
+                          (0, 0.1, 0)))
+        self.assertIsNone(parse_alert_seqs(None))
+
+    def test_parse_empty_chord(self):
+        from pycountdown.lib.clocks.json import parse_alert_seqs
+        data = dict(self.SEQS, bad=[[440, 0.1], [[], 0.2]])
+        with mock.patch('pycountdown.lib.clocks.json.log_error') as log:
+            seqs = parse_alert_seqs(data)
+        self.assertEqual(list(seqs), ['beep', 'chime'])
+        log.assert_called_once()
+        self.assertIn("'bad'", log.call_args.args[0])
+
+    def test_export(self):
+        from pycountdown.lib.clocks.json import (
+            parse_alert_seqs, export_alert_seq, parse_alert_seq,
+        )
+        for seq in parse_alert_seqs(self.SEQS).values():
+            data = loads(dumps(export_alert_seq(seq)))
+            self.assertEqual(parse_alert_seq(seq.seq_id, data).notes,
+                             seq.notes)
+
+    def test_round_trip(self):
+        init_app()
+        from pycountdown.lib.clocks.json import (
+            parse_clocks_jsonc, export_clocks_jsonc,
+        )
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        pool, thresh_sets, seqs = parse_clocks_jsonc(
+            dict(CLOCKS_JSONC, alert_sequences=self.SEQS))
+        DisplayClock.set_pool(pool)
+        data = loads(dumps(export_clocks_jsonc(pool, thresh_sets, seqs)))
+        _, _, seqs2 = parse_clocks_jsonc(data)
+        self.assertEqual({k: v.notes for k, v in seqs2.items()},
+                         {k: v.notes for k, v in seqs.items()})
+
+
+# 2025-11-02 07:00 UTC, when US Central time falls back from 02:00 CDT to
+# 01:00 CST
+FALLBACK_TAI = 815338837.0
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestRefreshScheduler(TestCase):
+    def setUp(self):
+        init_app()
+
+    def make_dclk(self, clock, time_format: str = 'S', digits: int = 0,
+                  thresh_set: str = None):
+        from pyrandyos.utils.time.fmt import TimeFormat
+        from pycountdown.lib.clocks.fmt import ClockFormatter
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        fmt = ClockFormatter(False, TimeFormat[time_format], digits,
+                             thresh_set=thresh_set)
+        return DisplayClock('x', 'X', clock, fmt)
+
+    def make_countdown(self, epoch_tai: float, **kwargs):
+        "clock reading 0 at `epoch_tai`"
+        from pycountdown.lib.clocks.clock import Clock, DEFAULT_CLOCKS
+        from pycountdown.lib.clocks.epoch import Epoch
+        clock = Clock(Epoch(DEFAULT_CLOCKS['TAI'], epoch_tai))
+        return self.make_dclk(clock, **kwargs)
+
+    def assert_next(self, dclk, now_tai: float, expected_tai: float):
+        from pycountdown.lib.clocks.tick import (
+            get_next_change, CHANGE_MARGIN_SEC,
+        )
+        t = dclk.clock.plan.evaluate(now_tai)
+        self.assertAlmostEqual(get_next_change(dclk, t, now_tai),
+                               expected_tai + CHANGE_MARGIN_SEC, places=6)
+
+    def test_display_step(self):
+        from pyrandyos.utils.time.fmt import TimeFormat
+        from pycountdown.lib.clocks.tick import (
+            get_display_step, MIN_STEP_SEC,
+        )
+        dclk = self.make_countdown(T0)
+        for time_format, digits, step in (('S', 0, 1), ('S', 1, 0.1),
+                                          ('DHMS', 2, 0.01),
+                                          ('S', 6, MIN_STEP_SEC),
+                                          ('M', 0, 60), ('H', 1, 360),
+                                          ('D', 0, 86400)):
+            dclk.formatter.time_format = TimeFormat[time_format]
+            dclk.formatter.digits = digits
+            self.assertAlmostEqual(get_display_step(dclk), step)
+
+    def test_rounding_rollover(self):
+        # values are rounded, so they change half way between steps
+        dclk = self.make_countdown(T0)
+        self.assert_next(dclk, T0, T0 + 0.5)
+        self.assert_next(dclk, T0 + 0.25, T0 + 0.5)
+        self.assert_next(dclk, T0 + 0.5, T0 + 1.5)
+        self.assert_next(dclk, T0 + 1.2, T0 + 1.5)
+        dclk = self.make_countdown(T0, digits=1)
+        self.assert_next(dclk, T0 + 0.22, T0 + 0.25)
+        dclk = self.make_countdown(T0, time_format='M')
+        self.assert_next(dclk, T0 + 29, T0 + 30)
+        self.assert_next(dclk, T0 + 30, T0 + 90)
+
+    def test_sign_flip(self):
+        # -20 s shows as -0 minutes and 10 s as 0, but the sign flips at 0
+        dclk = self.make_countdown(T0, time_format='M')
+        self.assert_next(dclk, T0 - 20, T0)
+        self.assert_next(dclk, T0 - 40, T0 - 30)
+        self.assert_next(dclk, T0, T0 + 30)
+
+    def test_threshold_cap(self):
+        from pycountdown.lib.clocks.fmt import ThresholdSet, ClockThreshold
+        from pycountdown.lib.clocks.epoch import Epoch
+        tset = ThresholdSet('t', [ClockThreshold(Epoch(None, -5), 'Red'),
+                                  ClockThreshold(Epoch(None, -3), 'Blue')])
+        with mock.patch.dict(ThresholdSet.pool, {'t': tset}):
+            dclk = self.make_countdown(T0, time_format='M', thresh_set='t')
+            self.assert_next(dclk, T0 - 20, T0 - 5)
+            self.assert_next(dclk, T0 - 5, T0 - 3)
+            self.assert_next(dclk, T0 - 3, T0)
+
+            # a threshold off the step phase, which is not found again once
+            # it is reached
+            dclk = self.make_countdown(T0 - 2.5, thresh_set='t')
+            self.assert_next(dclk, T0 - 8, T0 - 7.5)
+            self.assert_next(dclk, T0 - 7.5, T0 - 7)
+
+    def test_dst_fold(self):
+        from pycountdown.lib.clocks.clock import DEFAULT_CLOCKS
+        dclk = self.make_dclk(DEFAULT_CLOCKS['US CT'], 'YMDHMS')
+        # first pass of the repeated hour, and the jump back to 01:00:00
+        self.assert_next(dclk, FALLBACK_TAI - 1800.25, FALLBACK_TAI - 1799.5)
+        self.assert_next(dclk, FALLBACK_TAI - 0.25, FALLBACK_TAI)
+        # second pass, which the DST reading would place an hour early
+        self.assert_next(dclk, FALLBACK_TAI + 0.25, FALLBACK_TAI + 0.5)
+        self.assert_next(dclk, FALLBACK_TAI + 1799.75,
+                         FALLBACK_TAI + 1800.5)
+        self.assert_next(dclk, FALLBACK_TAI + 3599.75,
+                         FALLBACK_TAI + 3600.5)
+
+        # coarser steps change at the jump too
+        dclk = self.make_dclk(DEFAULT_CLOCKS['US CT'], 'H')
+        self.assert_next(dclk, FALLBACK_TAI - 60, FALLBACK_TAI)
+        self.assert_next(dclk, FALLBACK_TAI, FALLBACK_TAI + 1800)
+
+        # and when DST starts, 2025-03-09 08:00 UTC
+        spring_tai = FALLBACK_TAI - 238*86400 + 3600
+        self.assert_next(dclk, spring_tai - 60, spring_tai)
+        self.assert_next(dclk, spring_tai, spring_tai + 1800)
+
+    def test_fallback(self):
+        from pycountdown.lib.clocks.tick import (
+            get_next_change, get_fallback_tai, CHANGE_MARGIN_SEC,
+        )
+        self.assertEqual(get_fallback_tai(T0), T0 + 0.75 + CHANGE_MARGIN_SEC)
+        # a change that is already past is drawn on the next second
+        dclk = self.make_countdown(T0)
+        self.assertEqual(get_next_change(dclk, -10, T0),
+                         get_fallback_tai(T0))
+
+    def test_tick_scheduler(self):
+        from pycountdown.lib.clocks.tick import TickScheduler
+        sched = TickScheduler()
+        self.assertIsNone(sched.get_lateness_stats())
+        self.assertEqual(sched.tick(T0), T0)
+        self.assertIsNone(sched.get_lateness_stats())
+
+        self.assertEqual(sched.arm(T0 + 0.5, T0), 500)
+        self.assertEqual(sched.arm(T0 + 0.5004, T0), 501)
+        self.assertEqual(sched.arm(T0 - 1, T0), 0)
+
+        # a tick that fires early renders at its due time
+        sched.arm(T0 + 1, T0)
+        self.assertEqual(sched.tick(T0 + 0.998), T0 + 1)
+        sched.arm(T0 + 2, T0 + 1)
+        self.assertEqual(sched.tick(T0 + 2.25), T0 + 2.25)
+        last, mean, worst = sched.get_lateness_stats()
+        self.assertAlmostEqual(last, 0.25)
+        self.assertAlmostEqual(mean, 0.124)
+        self.assertAlmostEqual(worst, 0.25)
+        # the due time is used once
+        self.assertEqual(sched.tick(T0 + 1), T0 + 1)
+
+    def test_refresh_scheduler(self):
+        from pycountdown.lib.clocks.tick import (
+            RefreshScheduler, get_fallback_tai, CHANGE_MARGIN_SEC,
+        )
+        m = CHANGE_MARGIN_SEC
+        sec = self.make_countdown(T0)
+        minute = self.make_countdown(T0, time_format='M')
+        sched = RefreshScheduler()
+        sched.reset([sec, None, minute, sec])
+        self.assertIsNone(sched.next_tai())
+
+        sched.reschedule(0, -10, T0 - 10)
+        sched.reschedule(1, 0, T0 - 10)
+        sched.reschedule(2, -10, T0 - 10)
+        sched.reschedule(3, None, T0 - 10)
+        self.assertEqual(sched.next_tai(), T0 - 9.5 + m)
+        self.assertEqual(sched.pop_due(T0 - 9.6), [])
+        self.assertEqual(sched.pop_due(T0 - 9.5 + m), [0])
+
+        # rescheduling supersedes the queued entry
+        sched.reschedule(0, -9.5, T0 - 9.5)
+        sched.reschedule(2, -0.5, T0 - 0.5)
+        sched.reschedule(0, -9, T0 - 9)
+        self.assertEqual(sched.next_tai(), T0 - 8.5 + m)
+        self.assertEqual(sched.pop_due(T0 - 8), [0])
+        self.assertEqual(sched.pop_due(T0 - 8), [])
+        # the minute row next changes sign
+        self.assertEqual(sched.next_tai(), T0 + m)
+
+        # rows queued together come out in table order
+        sched.reschedule(3, -1, T0 - 1)
+        sched.retry(0, T0 - 1)
+        self.assertEqual(sched.pop_due(T0), [0, 3])
+
+        # a row whose next change fails is retried on the next second
+        with mock.patch('pycountdown.lib.clocks.tick.get_next_change',
+                        side_effect=ValueError):
+            sched.reschedule(2, 0.25, T0 + 0.25)
+        self.assertEqual(sched.next_tai(), get_fallback_tai(T0 + 0.25))
+
+        sched.reset([sec])
+        self.assertIsNone(sched.next_tai())
+        sched.reschedule(5, 0, T0)
+        self.assertIsNone(sched.next_tai())
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+@mock.patch('pycountdown.lib.tones.cache.generate_tone_sequence',
+            side_effect=lambda seq, rate, vol: bytes(4))
+class TestWaveformCache(TestCase):
+    SEQS = [((440 + 10*i, 0.1, 0.5),) for i in range(3)]
+
+    def setUp(self):
+        self.tmpdir = TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.cache_dir = Path(self.tmpdir.name)/'alert_cache'
+
+    def make_cache(self, cache_dir: Path = None):
+        from pycountdown.lib.tones.cache import WaveformCache
+        return WaveformCache(10, cache_dir)
+
+    def get_files(self, cache, seqs):
+        return [cache.get_cache_path(cache.make_key(x, 48000, 1))
+                for x in seqs]
+
+    def test_memory_lru(self, gen: mock.Mock):
+        s1, s2, s3 = self.SEQS
+        cache = self.make_cache()
+        cache.get(s1)
+        cache.get(s2)
+        cache.get(s1)
+        self.assertEqual(gen.call_count, 2)
+
+        # s2 is the least recently used
+        cache.get(s3)
+        self.assertEqual([x[0] for x in cache.entries], [s1, s3])
+        self.assertEqual(cache.nbytes, 8)
+        cache.get(s2)
+        self.assertEqual(gen.call_count, 4)
+        self.assertEqual([x[0] for x in cache.entries], [s3, s2])
+
+        # the newest entry is kept even if it alone is over the bound
+        key = cache.make_key(s1, 48000, 1)
+        cache.put(key, bytes(20))
+        self.assertEqual(list(cache.entries), [key])
+        self.assertEqual(cache.nbytes, 20)
+
+    def test_disk(self, gen: mock.Mock):
+        s1, s2, s3 = self.SEQS
+        cache = self.make_cache(self.cache_dir)
+        cache.get(s1)
+        cache.get(s2)
+        f1, f2, f3 = self.get_files(cache, self.SEQS)
+        self.assertTrue(f1.exists() and f2.exists())
+        utime(f1, (1000, 1000))
+        utime(f2, (2000, 2000))
+
+        # a new cache loads s1 from disk, which makes s2 the oldest file
+        cache = self.make_cache(self.cache_dir)
+        self.assertEqual(cache.get(s1), bytes(4))
+        self.assertEqual(gen.call_count, 2)
+        cache.get(s3)
+        self.assertEqual(gen.call_count, 3)
+        self.assertEqual(sorted(self.cache_dir.iterdir()), sorted([f1, f3]))
+
+    def test_disk_version(self, gen: mock.Mock):
+        s1 = self.SEQS[0]
+        cache = self.make_cache(self.cache_dir)
+        cache.get(s1)
+        path = self.get_files(cache, [s1])[0]
+        with mock.patch('pycountdown.lib.tones.cache.WAVEFORM_CACHE_VERSION',
+                        -1):
+            self.assertNotEqual(self.get_files(cache, [s1])[0], path)
+            self.make_cache(self.cache_dir).get(s1)
+        self.assertEqual(gen.call_count, 2)
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestClockBatch(TestCase):
+    def setUp(self):
+        init_app()
+        from pycountdown.lib.clocks.json import parse_clocks_jsonc
+        self.pool, _, _ = parse_clocks_jsonc({'clocks': [
+            {'label': 'TAI', 'follow': 'TAI'},
+            {'label': 'UTC', 'follow': 'UTC'},
+            {'blank': True},
+            {'label': 'CT', 'follow': 'US CT'},
+            {'label': 'CT2', 'follow': 'US CT'},
+            {'label': 'L', 'epoch': {'t': T0 + 0.1, 'clock': 'TAI'}},
+            {'label': 'L2', 'epoch': {'t': 7.3, 'clock': 'L'}},
+            {'label': 'GPS', 'follow': 'GPST'},
+        ]})
+        # an unresolved row
+        self.pool.append(None)
+
+    def assert_matches(self, batch, now_tai: float):
+        expected = [dclk.clock.plan.evaluate(now_tai)
+                    if dclk and dclk.clock else None
+                    for dclk in batch.dclks]
+        self.assertEqual(batch.evaluate(now_tai), expected)
+        rows = [8, 0, 6, 3, 3, 2]
+        self.assertEqual(batch.evaluate(now_tai, rows),
+                         [expected[i] for i in rows])
+
+    def test_evaluate(self):
+        from pycountdown.lib.clocks.batch import ClockBatch
+        batch = ClockBatch(self.pool)
+        self.assertIsNone(batch.dclks[8])
+        for now_tai in (T0, T0 + 0.37, -T0, FALLBACK_TAI - 0.5,
+                        FALLBACK_TAI + 0.5):
+            self.assert_matches(batch, now_tai)
+
+    def test_evaluate_py(self):
+        from pycountdown.lib.clocks.batch import ClockBatch
+        with mock.patch('pycountdown.lib.clocks.batch.np', None):
+            batch = ClockBatch(self.pool)
+            self.assertIsNone(batch.groups.arrays)
+            for now_tai in (T0, FALLBACK_TAI + 0.5):
+                self.assert_matches(batch, now_tai)
+
+    def test_empty(self):
+        from pycountdown.lib.clocks.batch import ClockBatch
+        batch = ClockBatch()
+        self.assertEqual(batch.evaluate(T0), [])
+        self.assertEqual(batch.evaluate(T0, []), [])
+
+
+def make_thresh_set(thresh_id: str, times: list[float | None]):
+    "threshold set with a threshold at each clock time, named by its index"
+    from pycountdown.lib.clocks.fmt import ThresholdSet, ClockThreshold
+    from pycountdown.lib.clocks.epoch import Epoch
+    return ThresholdSet(thresh_id, [
+        ClockThreshold(None if t is None else Epoch(None, t),
+                       play_alert=str(i))
+        for i, t in enumerate(times)])
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestThresholdScheduler(TestCase):
+    def setUp(self):
+        init_app()
+        from pycountdown.lib.clocks.fmt import ThresholdSet
+        patcher = mock.patch.dict(ThresholdSet.pool, {
+            't': make_thresh_set('t', [-10, -5, 0]),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_countdown(self, epoch_tai: float):
+        from pycountdown.lib.clocks.clock import Clock, DEFAULT_CLOCKS
+        from pycountdown.lib.clocks.epoch import Epoch
+        from pycountdown.lib.clocks.fmt import ClockFormatter
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        clock = Clock(Epoch(DEFAULT_CLOCKS['TAI'], epoch_tai))
+        return DisplayClock('x', 'X', clock, ClockFormatter(thresh_set='t'))
+
+    def pop_due(self, sched, now_tai: float):
+        return {k: v.play_alert for k, v in sched.pop_due(now_tai).items()}
+
+    def test_crossings(self):
+        from pycountdown.lib.clocks.sched import ThresholdScheduler
+        a = self.make_countdown(T0)
+        b = self.make_countdown(T0 + 3)
+        sched = ThresholdScheduler()
+        sched.rebuild([a, b, None], T0 - 20)
+        self.assertEqual(sched.next_tai(), T0 - 10)
+        self.assertEqual(self.pop_due(sched, T0 - 10.5), {})
+        self.assertEqual(self.pop_due(sched, T0 - 10), {a: '0'})
+        self.assertEqual(sched.next_tai(), T0 - 7)
+        self.assertEqual(self.pop_due(sched, T0 - 6), {b: '0'})
+
+        # a crossed both -5 and 0, b only -5; the last one is reported
+        self.assertEqual(self.pop_due(sched, T0 + 1), {a: '2', b: '1'})
+        self.assertEqual(sched.next_tai(), T0 + 3)
+        self.assertEqual(self.pop_due(sched, T0 + 3), {b: '2'})
+        self.assertIsNone(sched.next_tai())
+
+    def test_superseded(self):
+        from pycountdown.lib.clocks.sched import ThresholdScheduler
+        a = self.make_countdown(T0)
+        b = self.make_countdown(T0 + 3)
+        sched = ThresholdScheduler()
+        sched.rebuild([a, b], T0 - 20)
+
+        # rescheduling after the first threshold drops the old entry
+        sched.schedule(a, T0 - 8)
+        self.assertEqual(sched.next_tai(), T0 - 7)
+        self.assertEqual(self.pop_due(sched, T0 - 6), {b: '0'})
+        self.assertEqual(self.pop_due(sched, T0 - 5), {a: '1'})
+
+        # as does removing the clock or its threshold set
+        sched.remove(a)
+        self.assertEqual(self.pop_due(sched, T0 + 1), {b: '1'})
+        b.formatter.thresh_set = None
+        sched.schedule(b, T0 + 1)
+        self.assertIsNone(sched.next_tai())
+        self.assertEqual(sched.queue, [])
+
+    def test_dst_fold(self):
+        from pycountdown.lib.clocks.clock import DEFAULT_CLOCKS
+        from pycountdown.lib.clocks.fmt import ClockFormatter, ThresholdSet
+        from pycountdown.lib.clocks.displayclocks import DisplayClock
+        from pycountdown.lib.clocks.sched import ThresholdScheduler
+        ct = DEFAULT_CLOCKS['US CT']
+        # 01:30 local time, which is read twice
+        t = ct.plan.evaluate(FALLBACK_TAI + 1800)
+        ThresholdSet.pool['ct'] = make_thresh_set('ct', [t])
+        dclk = DisplayClock('ct', 'CT', ct, ClockFormatter(thresh_set='ct'))
+        sched = ThresholdScheduler()
+        sched.schedule(dclk, FALLBACK_TAI - 3600)
+        self.assertEqual(sched.next_tai(), FALLBACK_TAI - 1800)
+        self.assertEqual(self.pop_due(sched, FALLBACK_TAI - 1800),
+                         {dclk: '0'})
+        # the threshold is crossed again in the second pass
+        sched.schedule(dclk, FALLBACK_TAI)
+        self.assertEqual(sched.next_tai(), FALLBACK_TAI + 1800)
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestThresholdSet(TestCase):
+    def get_thresh(self, tset, t: float):
+        thresh = tset.get_thresh_for_t(t)
+        return thresh.play_alert if thresh else None
+
+    def test_thresh_for_t(self):
+        tset = make_thresh_set('t', [0, -10, None, -5, -5])
+        # before the first threshold, the default one applies
+        self.assertEqual(self.get_thresh(tset, -11), '2')
+        # a threshold applies from its own time on
+        self.assertEqual(self.get_thresh(tset, -10), '1')
+        self.assertEqual(self.get_thresh(tset, -5.001), '1')
+        # of thresholds at the same time, the last one listed wins
+        self.assertEqual(self.get_thresh(tset, -5), '4')
+        self.assertEqual(self.get_thresh(tset, 0), '0')
+        self.assertEqual(self.get_thresh(tset, 1e9), '0')
+
+        tset = make_thresh_set('t', [0])
+        self.assertIsNone(self.get_thresh(tset, -1))
+        self.assertIsNone(self.get_thresh(make_thresh_set('t', []), 0))
+
+    def test_next_thresh_t(self):
+        tset = make_thresh_set('t', [0, -10, None, -5, -5])
+        self.assertEqual(tset.get_next_thresh_t(-11), -10)
+        # a threshold just reached is not next
+        self.assertEqual(tset.get_next_thresh_t(-10), -5)
+        self.assertEqual(tset.get_next_thresh_t(-5), 0)
+        self.assertIsNone(tset.get_next_thresh_t(0))
+        self.assertIsNone(make_thresh_set('t', [None]).get_next_thresh_t(0))
+
+    def test_invalidate(self):
+        from pycountdown.lib.clocks.fmt import ClockThreshold
+        from pycountdown.lib.clocks.epoch import Epoch
+        tset = make_thresh_set('t', [0, -10])
+        self.assertEqual(tset.get_next_thresh_t(-11), -10)
+        tset.thresh_list = tset.thresh_list + [
+            ClockThreshold(Epoch(None, -20), play_alert='2')]
+        self.assertEqual(tset.get_next_thresh_t(-21), -20)
+        tset.thresh_list[2].epoch.epoch_sec = -15
+        tset.invalidate()
+        self.assertEqual(tset.get_next_thresh_t(-21), -15)
+        self.assertEqual(self.get_thresh(tset, -12), '2')
+
+
+def pcm(*samples: int):
+    from array import array
+    data = array('h', samples)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestToneMixer(TestCase):
+    def test_mix(self):
+        from pycountdown.lib.tones.mix import ToneMixer
+        mixer = ToneMixer()
+        self.assertTrue(mixer.idle)
+        self.assertEqual(mixer.mix(4), bytes(4))
+        self.assertEqual(mixer.silence, 4)
+
+        self.assertTrue(mixer.add(pcm(1000, 2000, 30000, -30000, 5)))
+        self.assertTrue(mixer.add(pcm(1000, -3000, 10000, -10000)))
+        self.assertFalse(mixer.idle)
+        # odd byte counts are rounded down to whole samples
+        self.assertEqual(mixer.mix(9), pcm(2000, -1000, 32767, -32768))
+        self.assertEqual(mixer.silence, 0)
+        # the shorter voice is done; the rest is padded with silence
+        self.assertEqual(mixer.mix(6), pcm(5, 0, 0))
+        self.assertTrue(mixer.idle)
+        self.assertEqual(mixer.mix(2), bytes(2))
+
+    def test_dedup(self):
+        from pycountdown.lib.tones.mix import ToneMixer
+        mixer = ToneMixer()
+        data = pcm(100, 200, 300)
+        self.assertFalse(mixer.add(b''))
+        self.assertTrue(mixer.add(data))
+        # the same alert fired again on the same tick plays once
+        self.assertFalse(mixer.add(data))
+        self.assertTrue(mixer.add(pcm(1, 2, 3)))
+        self.assertEqual(mixer.mix(2), pcm(101))
+        # once it is playing, it may start over on top of itself
+        self.assertTrue(mixer.add(data))
+        self.assertEqual(mixer.mix(4), pcm(202 + 100, 303 + 200))
+        mixer.clear()
+        self.assertTrue(mixer.idle)
+
+    def test_mix_chunks(self):
+        from random import Random
+        from pycountdown.lib.tones import mix
+        if mix.np is None:
+            self.skipTest('numpy is not installed')
+
+        rnd = Random(0)
+        chunks = [pcm(*(rnd.randint(-32768, 32767) for _ in range(n)))
+                  for n in (100, 37, 100, 0)]
+        self.assertEqual(mix.mix_chunks_array(chunks, 200),
+                         mix.mix_chunks_py(chunks, 200))
+
+
+@mock.patch.dict(environ, {ENV_PYCOUNTDOWN_UNITTEST_ACTIVE: '1'})
+class TestToneGen(TestCase):
+    TONES = [
+        (440, 0.1, 48000, 0.5),
+        (880.5, 0.0731, 44100, 1),
+        (0, 0.05, 48000, 0.5),
+        (12345.6, 0.02, 8000, 0.1),
+    ]
+
+    def setUp(self):
+        from pycountdown.lib.tones import gen
+        if gen.np is None:
+            self.skipTest('numpy is not installed')
+
+    def test_tone(self):
+        from pycountdown.lib.tones.gen import (
+            generate_tone_array, generate_tone_py, generate_tone,
+        )
+        for args in self.TONES:
+            data = generate_tone_py(*args)
+            self.assertEqual(len(data), 2*int(args[2]*args[1]))
+            self.assertEqual(generate_tone_array(*args).tobytes(), data,
+                             args)
+            self.assertEqual(generate_tone(*args), data)
+
+    def test_chord(self):
+        from pycountdown.lib.tones.gen import (
+            generate_chord_array, generate_chord_py,
+        )
+        for freqs in ((440,), (440, 660), (261.63, 329.63, 392.0)):
+            for args in self.TONES:
+                self.assertEqual(
+                    generate_chord_array(freqs, *args[1:]).tobytes(),
+                    generate_chord_py(freqs, *args[1:]), (freqs, args))
+
 
 if __name__ == '__main__':
     ttr = TextTestRunner(stream=sys.stdout,